@@ -0,0 +1,122 @@
+"""
+ Compares the time taken to read worksheets with each installed Excel engine,
+ from the test workbook and from a large synthetic workbook.
+
+ Run from the util-lib directory with:
+
+    python benchmarks/excel_engine_benchmark.py [number of synthetic rows]
+"""
+
+import os
+import sys
+import tempfile
+import timeit
+from pathlib import Path
+from typing import Callable
+
+import pandas as pd
+from openpyxl import Workbook  # type: ignore[import-untyped]
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from util_lib.workbook import WorkbookSession, available_excel_engines  # noqa: E402
+
+VALID_WORKBOOK = (
+    Path(__file__).parents[1]
+    / "tests"
+    / "resources"
+    / "dataframe_test"
+    / "valid_workbook.xlsx"
+)
+NUM_REPEATS = 3
+
+
+def write_synthetic_workbook(
+    file_path: str, num_rows: int, num_columns: int = 20
+) -> None:
+    """
+    Write a workbook with a title block, a header row and num_rows rows of
+    numbers and text below it, like a NISRA table but larger.
+    """
+    workbook = Workbook(write_only=True)
+    worksheet = workbook.create_sheet("Table 1")
+    worksheet.append(["Synthetic weekly deaths"])
+    worksheet.append(["Source: generated"])
+    worksheet.append([])
+    worksheet.append([f"Column {column}" for column in range(num_columns)])
+    for row in range(num_rows):
+        worksheet.append(
+            [row]
+            + [row * column for column in range(1, num_columns - 1)]
+            + [f"Note {row % 7}"]
+        )
+    workbook.save(file_path)
+
+
+def _best_of(function: Callable[[], object]) -> float:
+    return min(timeit.repeat(function, number=1, repeat=NUM_REPEATS))
+
+
+def _read_sheets_in_one_session(
+    file_path: str, engine: str, reads: list[tuple[str, int, int | None, str | None]]
+) -> None:
+    with WorkbookSession(file_path, engine=engine) as workbook:
+        for sheet_name, skiprows, nrows, usecols in reads:
+            workbook.read(sheet_name, skiprows, nrows, usecols)
+
+
+def benchmark_engine(
+    engine: str, file_path: str, sheet_name: str, skiprows: int
+) -> dict[str, float]:
+    """
+    :return: The best time, in seconds, of each way of reading the workbook.
+    """
+    reads: list[tuple[str, int, int | None, str | None]] = [
+        (sheet_name, skiprows, None, None),
+        (sheet_name, skiprows, 100, "A:C"),
+        (sheet_name, skiprows, None, "B:D"),
+    ]
+    return {
+        "read_excel, whole sheet": _best_of(
+            lambda: pd.read_excel(  # type: ignore[call-overload]
+                file_path, sheet_name=sheet_name, skiprows=skiprows, engine=engine
+            )
+        ),
+        "streamed, 100 rows of A:C": _best_of(
+            lambda: WorkbookSession(file_path, cache_size=0, engine=engine).read(
+                sheet_name, skiprows, 100, "A:C"
+            )
+        ),
+        "session, 3 ranges": _best_of(
+            lambda: _read_sheets_in_one_session(file_path, engine, reads)
+        ),
+    }
+
+
+def main(num_synthetic_rows: int) -> None:
+    engines = available_excel_engines()
+    print(f"Engines: {', '.join(engines)}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        synthetic_workbook = os.path.join(directory, "synthetic.xlsx")
+        write_synthetic_workbook(synthetic_workbook, num_synthetic_rows)
+
+        for title, file_path, sheet_name, skiprows in [
+            ("valid_workbook.xlsx, Table 3", str(VALID_WORKBOOK), "Table 3", 3),
+            (
+                f"synthetic workbook, {num_synthetic_rows} rows",
+                synthetic_workbook,
+                "Table 1",
+                3,
+            ),
+        ]:
+            print(f"\n{title} (best of {NUM_REPEATS}, seconds)")
+            for engine in engines:
+                for case, seconds in benchmark_engine(
+                    engine, file_path, sheet_name, skiprows
+                ).items():
+                    print(f"  {engine:<10} {case:<28} {seconds:8.3f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 50_000)
@@ -0,0 +1,93 @@
+"""
+ Compares fill_zeros with the object-based implementation it replaced, filling
+ every column of a weekly table spanning several years.
+
+ Run from the util-lib directory with:
+
+    python benchmarks/fill_zeros_benchmark.py [number of years]
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from util_lib.dataframe import fill_zeros  # noqa: E402
+
+NUM_REPEATS = 5
+NUM_COUNT_COLUMNS = 12
+NUM_MEAN_COLUMNS = 4
+
+
+def weekly_df(num_years: int) -> DataFrame:
+    """
+    One row per week with counts and means, about a third of which are zero
+    as in weeks not yet reported.
+    """
+    num_weeks = 52 * num_years
+    rng = np.random.default_rng(0)
+    reported = rng.random((num_weeks, NUM_COUNT_COLUMNS + NUM_MEAN_COLUMNS)) > 0.3
+    data = {
+        f"Count {column}": np.where(
+            reported[:, column], rng.integers(1, 500, num_weeks), 0
+        )
+        for column in range(NUM_COUNT_COLUMNS)
+    }
+    data.update(
+        {
+            f"Mean {column}": np.where(
+                reported[:, NUM_COUNT_COLUMNS + column],
+                rng.random(num_weeks) * 500,
+                0.0,
+            )
+            for column in range(NUM_MEAN_COLUMNS)
+        }
+    )
+    return pd.DataFrame(data)
+
+
+def fill_zeros_through_objects(input_df: DataFrame, column: str) -> DataFrame:
+    """
+    The implementation fill_zeros replaced.
+    """
+    output_df = input_df.copy()
+    output_df[column] = (
+        output_df[column].infer_objects().replace(0, pd.NA).ffill().fillna(0)
+    )
+    return output_df
+
+
+def fill_each_column(input_df: DataFrame) -> DataFrame:
+    for column in input_df.columns:
+        input_df = fill_zeros_through_objects(input_df, column)
+    return input_df
+
+
+def main(num_years: int) -> None:
+    for scale in (1, 100):
+        input_df = pd.concat([weekly_df(num_years)] * scale, ignore_index=True)
+        columns = list(input_df.columns)
+        cases = {
+            "through objects, per column": lambda: fill_each_column(input_df),
+            "NumPy, per column": lambda: [
+                fill_zeros(input_df=input_df, column=column) for column in columns
+            ],
+            "NumPy, all columns": lambda: fill_zeros(input_df=input_df, column=columns),
+        }
+
+        print(
+            f"\n{len(input_df)} rows, {len(columns)} columns "
+            f"(best of {NUM_REPEATS}, milliseconds)"
+        )
+        for case, function in cases.items():
+            seconds = min(timeit.repeat(function, number=1, repeat=NUM_REPEATS))
+            print(f"  {case:<28} {seconds * 1000:8.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
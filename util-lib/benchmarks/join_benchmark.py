@@ -0,0 +1,79 @@
+"""
+ Compares joining weekly series to deaths data with a pd.merge call for each,
+ as inner_join_with does, with key indexes built once and joined with
+ join_all.
+
+ Run from the util-lib directory with:
+
+    python benchmarks/join_benchmark.py [number of years]
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from util_lib.join import JoinIndex, join_all  # noqa: E402
+
+NUM_REPEATS = 5
+NUM_SERIES = 8
+JOIN_KEY = "Week Ending Date"
+
+
+def weekly_series(num_years: int, name: str, num_weeks_missing: int = 0) -> DataFrame:
+    """
+    One value a week from 2020, sorted by week ending date, with the last
+    num_weeks_missing weeks left out.
+    """
+    num_weeks = 52 * num_years - num_weeks_missing
+    return pd.DataFrame(
+        {
+            JOIN_KEY: pd.date_range("2020-01-03", periods=num_weeks, freq="7D"),
+            name: np.arange(num_weeks, dtype=np.float64),
+        }
+    )
+
+
+def merge_each(input_df: DataFrame, series_dfs: list[DataFrame]) -> DataFrame:
+    for series_df in series_dfs:
+        input_df = pd.merge(input_df, series_df, on=JOIN_KEY, how="inner")
+    return input_df
+
+
+def main(num_years: int) -> None:
+    deaths_df = weekly_series(num_years, "Deaths")
+    series_dfs = [
+        weekly_series(num_years, f"Series {series}", num_weeks_missing=series % 2)
+        for series in range(NUM_SERIES)
+    ]
+    join_indexes = [JoinIndex(series_df, JOIN_KEY) for series_df in series_dfs]
+    shuffled_df = deaths_df.sample(frac=1, random_state=0)
+
+    cases = {
+        "pd.merge, each series": lambda: merge_each(deaths_df, series_dfs),
+        "join_all, sorted": lambda: join_all(deaths_df, join_indexes),
+        "join_all, unsorted": lambda: join_all(shuffled_df, join_indexes),
+        "join_all, building indexes": lambda: join_all(
+            deaths_df, [JoinIndex(series_df, JOIN_KEY) for series_df in series_dfs]
+        ),
+    }
+
+    pd.testing.assert_frame_equal(
+        join_all(deaths_df, join_indexes), merge_each(deaths_df, series_dfs)
+    )
+    print(
+        f"\n{len(deaths_df)} weeks joined to {NUM_SERIES} series "
+        f"(best of {NUM_REPEATS}, milliseconds)"
+    )
+    for case, function in cases.items():
+        seconds = min(timeit.repeat(function, number=10, repeat=NUM_REPEATS)) / 10
+        print(f"  {case:<32} {seconds * 1000:8.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,94 @@
+"""
+ Compares add_week_ending_date with the row-by-row implementation it replaced,
+ on weekly data spanning several years.
+
+ Run from the util-lib directory with:
+
+    python benchmarks/week_ending_date_benchmark.py [number of years]
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+import pandas as pd
+from pandas import DataFrame
+
+sys.path.insert(0, str(Path(__file__).parents[1] / "src"))
+
+from util_lib.dataframe import COMBINED_WEEK_ENDING, add_week_ending_date  # noqa: E402
+from util_lib.primitive import remove_timestamp  # noqa: E402
+
+NUM_REPEATS = 5
+COLUMN = "Week Ends (Friday)"
+
+
+def weekly_df(num_years: int) -> DataFrame:
+    """
+    One row per week from 2020, with week endings written as NISRA does: the
+    combined week of March 2020 as a range, some weeks as timestamps and the
+    rest as dates.
+    """
+    week_endings = pd.date_range("2020-01-03", periods=52 * num_years, freq="7D")
+    return pd.DataFrame(
+        {
+            COLUMN: [
+                (
+                    COMBINED_WEEK_ENDING
+                    if week_ending == pd.Timestamp("2020-03-20")
+                    else (
+                        week_ending.strftime("%Y-%m-%d %H:%M:%S")
+                        if position % 2
+                        else week_ending.strftime("%Y-%m-%d")
+                    )
+                )
+                for position, week_ending in enumerate(week_endings)
+            ],
+            "Deaths": range(52 * num_years),
+        }
+    )
+
+
+def add_week_ending_date_by_row(input_df: DataFrame, default_date: str) -> DataFrame:
+    """
+    The implementation add_week_ending_date replaced.
+    """
+
+    def calculate_week_ending_date(week_ending: str) -> str:
+        if week_ending == COMBINED_WEEK_ENDING:
+            return default_date
+        if len(week_ending) > 10:
+            return remove_timestamp(week_ending)
+        return week_ending
+
+    output_df = input_df.copy()
+    output_df["Week Ending Date"] = output_df[COLUMN].apply(calculate_week_ending_date)
+    return output_df
+
+
+def main(num_years: int) -> None:
+    for scale in (1, 100):
+        input_df = pd.concat([weekly_df(num_years)] * scale, ignore_index=True)
+        cases = {
+            "row by row": lambda: add_week_ending_date_by_row(input_df, "2020-03-20"),
+            "vectorized": lambda: add_week_ending_date(
+                input_df=input_df,
+                default_date="2020-03-20",
+                existing_week_end_date_col_name=COLUMN,
+            ),
+            "vectorized, datetime64": lambda: add_week_ending_date(
+                input_df=input_df,
+                default_date="2020-03-20",
+                existing_week_end_date_col_name=COLUMN,
+                as_datetime=True,
+            ),
+        }
+
+        print(f"\n{len(input_df)} rows (best of {NUM_REPEATS}, milliseconds)")
+        for case, function in cases.items():
+            seconds = min(timeit.repeat(function, number=1, repeat=NUM_REPEATS))
+            print(f"  {case:<24} {seconds * 1000:8.2f}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
@@ -0,0 +1,175 @@
+"""
+ Content-addressed storage of raw source files.
+
+ Every file added to a blob store is kept once under its digest, however many
+ names it is added under, so earlier versions of a source workbook remain
+ available for reprocessing after a newer version has been downloaded. A small
+ index file records the history of digests added under each name, and the
+ digest, size and modification time of every file checked out of the store,
+ so the hash of an unmodified checked-out file never has to be recomputed.
+"""
+
+import json
+import os
+import shutil
+import threading
+from typing import Any, Dict
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+BLOB_INDEX_FILE_NAME = "index.json"
+BLOB_OBJECTS_DIRECTORY_NAME = "objects"
+
+
+def _file_signature(file_path: str) -> Dict[str, int]:
+    file_stat = os.stat(file_path)
+    return {"size": file_stat.st_size, "mtime_ns": file_stat.st_mtime_ns}
+
+
+class BlobStore:
+    """
+    A directory of files named by the digest of their content.
+
+    The layout is
+
+        <directory>/index.json
+        <directory>/objects/<first two digest characters>/<digest>
+    """
+
+    def __init__(self, directory: str, hash_algorithm: str = "sha256") -> None:
+        """
+        :param directory: The store's directory. It is created if it does not exist.
+        :param hash_algorithm: Hash algorithm that names the stored files. An
+            existing store keeps the algorithm it was created with.
+        :raises ValueError: If an existing store uses a different algorithm.
+        """
+        self.directory = directory
+        self._index_path = os.path.join(directory, BLOB_INDEX_FILE_NAME)
+        self._lock = threading.Lock()
+
+        if os.path.exists(self._index_path):
+            with open(self._index_path, "r", encoding="UTF-8") as file:
+                self._index: Dict[str, Any] = json.load(file)
+        else:
+            self._index = {"hash_algorithm": hash_algorithm, "names": {}, "files": {}}
+
+        if self._index["hash_algorithm"] != hash_algorithm:
+            raise ValueError(
+                f"Blob store '{directory}' uses {self._index['hash_algorithm']}, "
+                f"not {hash_algorithm}."
+            )
+
+    @property
+    def hash_algorithm(self) -> str:
+        return str(self._index["hash_algorithm"])
+
+    def blob_path(self, digest: str) -> str:
+        """
+        :return: Path at which the content with the given digest is stored.
+        """
+        return os.path.join(
+            self.directory, BLOB_OBJECTS_DIRECTORY_NAME, digest[:2], digest
+        )
+
+    def __contains__(self, digest: str) -> bool:
+        return os.path.exists(self.blob_path(digest))
+
+    def names(self) -> list[str]:
+        """
+        :return: Every name that content has been added under, in sorted order.
+        """
+        return sorted(self._index["names"])
+
+    def history(self, name: str) -> list[str]:
+        """
+        :return: Digests of the content added under a name, oldest first.
+            Consecutive additions of the same content are recorded once.
+        """
+        return list(self._index["names"].get(name, []))
+
+    def latest(self, name: str) -> str | None:
+        """
+        :return: Digest of the content most recently added under a name, or
+            None if nothing has been.
+        """
+        history = self._index["names"].get(name)
+        return history[-1] if history else None
+
+    def add(self, file_path: str, name: str, file_hash: str) -> str:
+        """
+        Move a file into the store. If content with the same digest is already
+        stored, the file is deleted instead.
+
+        :param file_path: The file to add. It no longer exists afterwards.
+        :param name: Name to record the content under, e.g. its destination path.
+        :param file_hash: The file's digest, already calculated with the
+            store's hash algorithm.
+        :return: Path of the stored content.
+        """
+        blob_path = self.blob_path(file_hash)
+        with self._lock:
+            if os.path.exists(blob_path):
+                os.remove(file_path)
+            else:
+                os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+                os.replace(file_path, blob_path)
+                logger.info(f"Stored {name} as {file_hash}")
+
+            history = self._index["names"].setdefault(name, [])
+            if not history or history[-1] != file_hash:
+                history.append(file_hash)
+            self._write_index()
+        return blob_path
+
+    def checkout(self, digest: str, to_path: str) -> None:
+        """
+        Copy stored content to a path and remember its digest, so that
+        known_hash can return it without reading the copy.
+
+        :raises KeyError: If no content with the digest is stored.
+        """
+        blob_path = self.blob_path(digest)
+        if not os.path.exists(blob_path):
+            raise KeyError(f"No blob with digest {digest} in '{self.directory}'")
+
+        temp_path = to_path + ".checkout"
+        shutil.copyfile(blob_path, temp_path)
+        os.replace(temp_path, to_path)
+        self.record_file_hash(to_path, digest)
+
+    def record_file_hash(self, file_path: str, file_hash: str) -> None:
+        """
+        Remember the digest of a file together with its size and modification
+        time.
+        """
+        with self._lock:
+            self._index["files"][os.path.abspath(file_path)] = {
+                "hash": file_hash,
+                **_file_signature(file_path),
+            }
+            self._write_index()
+
+    def known_hash(self, file_path: str) -> str | None:
+        """
+        :return: The recorded digest of a file, or None if none is recorded or
+            the file's size or modification time has changed since.
+        """
+        recorded = self._index["files"].get(os.path.abspath(file_path))
+        if recorded is None or not os.path.exists(file_path):
+            return None
+        if _file_signature(file_path) != {
+            "size": recorded["size"],
+            "mtime_ns": recorded["mtime_ns"],
+        }:
+            return None
+        return str(recorded["hash"])
+
+    def _write_index(self) -> None:
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = self._index_path + ".tmp"
+        with open(temp_path, "w", encoding="UTF-8") as file:
+            json.dump(self._index, file, indent=2, sort_keys=True)
+            file.write("\n")
+        os.replace(temp_path, self._index_path)
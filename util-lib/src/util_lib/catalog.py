@@ -0,0 +1,281 @@
+"""
+ Catalog of versioned dataset snapshots.
+
+ Snapshots are indexed by dataset name and the period they are current to
+ (their 'as of' period) in a prebuilt JSON manifest. Resolving the latest
+ snapshot, or the snapshot for a given period, is a dictionary lookup against
+ the manifest rather than a scan of the data directory, and the row count and
+ column schema of every snapshot are recorded so they can be inspected without
+ loading any data.
+"""
+
+import bisect
+import glob
+import json
+import os
+import re
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, Dict
+
+import pyarrow as pa
+from pandas import DataFrame
+
+from util_lib.store import DATASET_FILE_EXTENSION, read_dataset
+import logging
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE_NAME = "manifest.json"
+LATEST = "latest"
+
+# Dataset names mapped to the file name patterns of their snapshots. Each pattern
+# captures a 'year' and one of 'week', 'month', 'month_name' or 'quarter'.
+NISRA_SNAPSHOT_PATTERNS: Dict[str, str] = {
+    "weekly_deaths": r"^AllDeathsUpTo(?P<year>\d{4})Week(?P<week>\d{1,2})$",
+    "weekly_deaths_and_stats": r"^AllDeathsUpAndStatsTo(?P<year>\d{4})Week(?P<week>\d{1,2})$",
+    "monthly_births": r"^AllBirthsUpTo(?:Month(?P<month>\d{1,2})|(?P<month_name>[A-Z][a-z]+))(?P<year>\d{4})$",
+    "deaths_by_cause": r"^DeathsByCauseUpToQ(?P<quarter>[1-4])(?P<year>\d{4})$",
+    "monthly_disability_registrations": r"^MonthlyDisabilityRegistrations(?P<month_name>[A-Z][a-z]+)(?P<year>\d{4})$",
+    "cumulative_injections": r"^CumulativeInjectionsUpTo(?:\d{1,2})?(?P<month_name>[A-Z][a-z]+)(?P<year>\d{4})$",
+}
+
+
+@dataclass(frozen=True)
+class Snapshot:
+    """
+    A single version of a dataset as recorded in the manifest.
+    """
+
+    dataset: str
+    as_of: str
+    path: str
+    num_rows: int
+    columns: Dict[str, str]
+
+
+def week_period(year: int, week: int) -> str:
+    """
+    Format a registration week as a sortable period, e.g. '2024-W09'.
+    """
+    return f"{year:04d}-W{week:02d}"
+
+
+def month_period(year: int, month: int) -> str:
+    """
+    Format a month as a sortable period, e.g. '2024-02'.
+    """
+    return f"{year:04d}-{month:02d}"
+
+
+def quarter_period(year: int, quarter: int) -> str:
+    """
+    Format a quarter as a sortable period, e.g. '2022-Q4'.
+    """
+    return f"{year:04d}-Q{quarter}"
+
+
+def _month_from_name(month_name: str) -> int:
+    for month_format in ("%b", "%B"):
+        try:
+            return datetime.strptime(month_name, month_format).month
+        except ValueError:
+            continue
+    raise ValueError(f"Unrecognised month name: {month_name}")
+
+
+def period_from_match(groups: Dict[str, str | None]) -> str:
+    """
+    Derive the 'as of' period from the named groups of a snapshot file name match.
+
+    :param groups: Named groups captured by one of the snapshot patterns.
+    :return: The period in week, month or quarter form.
+    """
+    year = int(str(groups["year"]))
+
+    if groups.get("week"):
+        return week_period(year, int(str(groups["week"])))
+    if groups.get("month"):
+        return month_period(year, int(str(groups["month"])))
+    if groups.get("month_name"):
+        return month_period(year, _month_from_name(str(groups["month_name"])))
+    if groups.get("quarter"):
+        return quarter_period(year, int(str(groups["quarter"])))
+
+    raise ValueError(f"No period could be derived from: {groups}")
+
+
+def read_dataset_schema(dataset_path: str) -> tuple[int, Dict[str, str]]:
+    """
+    Read the row count and column dtypes of a dataset file from its metadata
+    without materialising any of the data.
+
+    :param dataset_path: Path to the dataset file.
+    :return: The number of rows and a mapping of column name to dtype name.
+    """
+    with pa.memory_map(dataset_path, "r") as source:
+        reader = pa.ipc.open_file(source)
+        schema = reader.schema
+        num_rows = sum(
+            reader.get_batch(index).num_rows
+            for index in range(reader.num_record_batches)
+        )
+
+    pandas_metadata = schema.pandas_metadata or {}
+    index_columns = [
+        column
+        for column in pandas_metadata.get("index_columns", [])
+        if isinstance(column, str)
+    ]
+    if pandas_metadata:
+        columns = {
+            column["name"]: column["numpy_type"]
+            for column in pandas_metadata["columns"]
+            if column["field_name"] not in index_columns
+        }
+    else:
+        columns = {field.name: str(field.type) for field in schema}
+
+    return num_rows, columns
+
+
+def build_manifest(
+    directory: str, patterns: Dict[str, str] | None = None
+) -> Dict[str, Any]:
+    """
+    Index the dataset files below a directory by dataset name and period.
+
+    :param directory: The data directory to index. Snapshot paths in the
+        manifest are recorded relative to it.
+    :param patterns: Dataset names mapped to snapshot file name patterns.
+        Defaults to the NISRA snapshot patterns.
+    :return: The manifest.
+    :raises ValueError: If two files are snapshots of the same dataset for the
+        same period, e.g. 'AllBirthsUpToFeb2023' and 'AllBirthsUpToMonth22023'.
+    """
+    compiled_patterns = {
+        dataset: re.compile(pattern)
+        for dataset, pattern in (patterns or NISRA_SNAPSHOT_PATTERNS).items()
+    }
+    datasets: Dict[str, Dict[str, Any]] = {}
+
+    dataset_paths = sorted(
+        glob.glob(
+            os.path.join(directory, "**", f"*{DATASET_FILE_EXTENSION}"),
+            recursive=True,
+        )
+    )
+    for dataset_path in dataset_paths:
+        file_stem = os.path.splitext(os.path.basename(dataset_path))[0]
+
+        for dataset, pattern in compiled_patterns.items():
+            match = pattern.match(file_stem)
+            if match is None:
+                continue
+
+            period = period_from_match(match.groupdict())
+            snapshots = datasets.setdefault(dataset, {"snapshots": {}})["snapshots"]
+            if period in snapshots:
+                raise ValueError(
+                    f"Both {snapshots[period]['path']} and "
+                    f"{os.path.relpath(dataset_path, directory)} are the "
+                    f"'{dataset}' snapshot for {period}."
+                )
+
+            num_rows, columns = read_dataset_schema(dataset_path)
+            snapshots[period] = {
+                "path": os.path.relpath(dataset_path, directory),
+                "num_rows": num_rows,
+                "columns": columns,
+            }
+            break
+
+    for dataset_entry in datasets.values():
+        dataset_entry["snapshots"] = dict(sorted(dataset_entry["snapshots"].items()))
+        dataset_entry[LATEST] = max(dataset_entry["snapshots"])
+
+    return {"datasets": dict(sorted(datasets.items()))}
+
+
+def write_manifest(manifest: Dict[str, Any], manifest_path: str) -> None:
+    with open(manifest_path, "w", encoding="UTF-8") as file:
+        json.dump(manifest, file, indent=2)
+        file.write("\n")
+
+
+class DatasetCatalog:
+    """
+    Resolves dataset snapshots from a prebuilt manifest.
+    """
+
+    def __init__(self, manifest_path: str) -> None:
+        with open(manifest_path, "r", encoding="UTF-8") as file:
+            self._datasets: Dict[str, Any] = json.load(file)["datasets"]
+        self._data_directory = os.path.dirname(manifest_path)
+        self._sorted_periods: Dict[str, list[str]] = {}
+
+    def datasets(self) -> list[str]:
+        return list(self._datasets)
+
+    def periods(self, dataset: str) -> list[str]:
+        """
+        List the periods for which the dataset has a snapshot, oldest first.
+        """
+        if dataset not in self._sorted_periods:
+            self._sorted_periods[dataset] = sorted(
+                self._dataset_entry(dataset)["snapshots"]
+            )
+        return self._sorted_periods[dataset]
+
+    def resolve(self, dataset: str, as_of: str = LATEST) -> Snapshot:
+        """
+        Resolve a dataset snapshot without loading it.
+
+        :param dataset: The dataset name.
+        :param as_of: 'latest' or a period such as '2023-W34'. When there is no
+            snapshot for the exact period, the most recent snapshot before it is
+            returned.
+        :return: The snapshot's location and schema.
+        :raises KeyError: If the dataset is unknown or has no snapshot on or
+            before the period.
+        """
+        dataset_entry = self._dataset_entry(dataset)
+        snapshots = dataset_entry["snapshots"]
+
+        period = dataset_entry[LATEST] if as_of == LATEST else as_of
+        if period not in snapshots:
+            periods = self.periods(dataset)
+            position = bisect.bisect_right(periods, period)
+            if position == 0:
+                raise KeyError(
+                    f"Dataset '{dataset}' has no snapshot on or before '{as_of}'."
+                )
+            period = periods[position - 1]
+
+        snapshot = snapshots[period]
+        return Snapshot(
+            dataset=dataset,
+            as_of=period,
+            path=os.path.join(self._data_directory, snapshot["path"]),
+            num_rows=snapshot["num_rows"],
+            columns=snapshot["columns"],
+        )
+
+    def load(self, dataset: str, as_of: str = LATEST) -> DataFrame:
+        return read_dataset(self.resolve(dataset, as_of).path)
+
+    def _dataset_entry(self, dataset: str) -> Dict[str, Any]:
+        try:
+            dataset_entry: Dict[str, Any] = self._datasets[dataset]
+        except KeyError as exc:
+            raise KeyError(f"Dataset '{dataset}' is not in the catalog.") from exc
+        return dataset_entry
+
+
+if __name__ == "__main__":
+    for directory_to_index in sys.argv[1:]:
+        write_manifest(
+            build_manifest(directory_to_index),
+            os.path.join(directory_to_index, MANIFEST_FILE_NAME),
+        )
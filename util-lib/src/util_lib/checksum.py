@@ -0,0 +1,184 @@
+"""
+ Convenience functions for hashing files in bulk and verifying directories
+ against a checksum manifest.
+
+ Files are hashed with hashlib.file_digest where it is available, and from a
+ memory map otherwise, so no Python-level loop runs per chunk. Both release the
+ GIL while hashing, so many files are hashed in parallel on a thread pool.
+"""
+
+import hashlib
+import json
+import mmap
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+CHECKSUM_MANIFEST_FILE_NAME = "checksums.json"
+
+
+def hash_file(file_path: str, hash_algorithm: str = "sha256") -> str:
+    """
+    Calculate the hash of a file.
+
+    :param file_path: Path to the file.
+    :param hash_algorithm: Hash algorithm to use.
+    :return: Hexadecimal hash string.
+    """
+    with open(file_path, "rb") as file:
+        if hasattr(hashlib, "file_digest"):
+            return hashlib.file_digest(file, hash_algorithm).hexdigest()
+
+        hash_func = hashlib.new(hash_algorithm)
+        if os.fstat(file.fileno()).st_size > 0:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                hash_func.update(mapped_file)
+        return hash_func.hexdigest()
+
+
+def hash_files(
+    file_paths: Iterable[str],
+    hash_algorithm: str = "sha256",
+    max_workers: int | None = None,
+) -> Dict[str, str]:
+    """
+    Calculate the hashes of many files in parallel.
+
+    :param file_paths: Paths to the files.
+    :param hash_algorithm: Hash algorithm to use.
+    :param max_workers: The maximum number of files hashed at once. Defaults to
+        ThreadPoolExecutor's default.
+    :return: Each path mapped to its hexadecimal hash, in the order given.
+    """
+    file_paths = list(file_paths)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        file_hashes = executor.map(
+            lambda file_path: hash_file(file_path, hash_algorithm), file_paths
+        )
+        return dict(zip(file_paths, file_hashes))
+
+
+def _list_files(directory: str, excluded_file_names: Iterable[str]) -> list[str]:
+    excluded = set(excluded_file_names)
+    relative_paths = []
+    for parent, directories, file_names in os.walk(directory):
+        directories.sort()
+        for file_name in sorted(file_names):
+            if file_name not in excluded:
+                relative_paths.append(
+                    os.path.relpath(os.path.join(parent, file_name), directory)
+                )
+    return relative_paths
+
+
+def build_checksum_manifest(
+    directory: str,
+    hash_algorithm: str = "sha256",
+    max_workers: int | None = None,
+) -> Dict[str, Any]:
+    """
+    Hash every file below a directory.
+
+    :param directory: The directory to hash.
+    :param hash_algorithm: Hash algorithm to use.
+    :param max_workers: The maximum number of files hashed at once.
+    :return: A manifest of the form
+        {'hash_algorithm': ..., 'files': {relative path: {'size': ..., 'hash': ...}}}
+        with paths separated by '/'. A checksum manifest already in the
+        directory is not included.
+    """
+    relative_paths = _list_files(directory, [CHECKSUM_MANIFEST_FILE_NAME])
+    file_hashes = hash_files(
+        [os.path.join(directory, path) for path in relative_paths],
+        hash_algorithm,
+        max_workers,
+    )
+    return {
+        "hash_algorithm": hash_algorithm,
+        "files": {
+            relative_path.replace(os.sep, "/"): {
+                "size": os.path.getsize(file_path),
+                "hash": file_hash,
+            }
+            for relative_path, (file_path, file_hash) in zip(
+                relative_paths, file_hashes.items()
+            )
+        },
+    }
+
+
+def write_checksum_manifest(
+    directory: str, manifest_path: str = "", max_workers: int | None = None
+) -> str:
+    """
+    Hash every file below a directory and write the manifest as JSON.
+
+    :param directory: The directory to hash.
+    :param manifest_path: Where to write the manifest. Defaults to
+        CHECKSUM_MANIFEST_FILE_NAME in the directory.
+    :param max_workers: The maximum number of files hashed at once.
+    :return: The manifest path.
+    """
+    manifest_path = manifest_path or os.path.join(
+        directory, CHECKSUM_MANIFEST_FILE_NAME
+    )
+    manifest = build_checksum_manifest(directory, max_workers=max_workers)
+    with open(manifest_path, "w", encoding="UTF-8") as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+        file.write("\n")
+    logger.info(f"Wrote checksums of {len(manifest['files'])} files to {manifest_path}")
+    return manifest_path
+
+
+def verify_checksum_manifest(
+    directory: str, manifest_path: str = "", max_workers: int | None = None
+) -> list[str]:
+    """
+    Check every file listed in a checksum manifest against the file now in the
+    directory. Files whose size differs are reported without being hashed;
+    the rest are hashed in parallel.
+
+    :param directory: The directory to verify.
+    :param manifest_path: The manifest. Defaults to CHECKSUM_MANIFEST_FILE_NAME
+        in the directory.
+    :param max_workers: The maximum number of files hashed at once.
+    :return: Relative paths of the files that are missing or differ from the
+        manifest, in sorted order. Files not listed in the manifest are ignored.
+    """
+    manifest_path = manifest_path or os.path.join(
+        directory, CHECKSUM_MANIFEST_FILE_NAME
+    )
+    with open(manifest_path, "r", encoding="UTF-8") as file:
+        manifest = json.load(file)
+
+    failed_paths = []
+    paths_to_hash = {}
+    for relative_path, expected in manifest["files"].items():
+        file_path = os.path.join(directory, *relative_path.split("/"))
+        if (
+            not os.path.isfile(file_path)
+            or os.path.getsize(file_path) != expected["size"]
+        ):
+            failed_paths.append(relative_path)
+        else:
+            paths_to_hash[file_path] = relative_path
+
+    file_hashes = hash_files(paths_to_hash, manifest["hash_algorithm"], max_workers)
+    for file_path, file_hash in file_hashes.items():
+        relative_path = paths_to_hash[file_path]
+        if file_hash != manifest["files"][relative_path]["hash"]:
+            failed_paths.append(relative_path)
+
+    for relative_path in sorted(failed_paths):
+        logger.warning(f"{relative_path} does not match {manifest_path}")
+    return sorted(failed_paths)
+
+
+if __name__ == "__main__":
+    for directory_to_hash in sys.argv[1:]:
+        write_checksum_manifest(directory_to_hash)
@@ -2,15 +2,30 @@
 Dataframe convenience functions for manipulation and validation.
 """
 
-from typing import Dict, Callable, Any
+from concurrent.futures import ProcessPoolExecutor
+from functools import wraps
+from typing import Dict, Callable, Any, Literal, Mapping
+import numpy as np
 import pandas as pd
 from pandas import DataFrame
 
-from util_lib.primitive import remove_timestamp
+from util_lib.dtypes import choose_string_dtype, log_memory_report
+from util_lib.error import WorksheetReadError
+from util_lib.primitive import remove_timestamps
+from util_lib.workbook import WorkbookSession
+from util_lib.worksheet_cache import WorksheetCache
 import logging
 
 logger = logging.getLogger(__name__)
 
+WEEK_ENDING_DATE_COLUMN = "Week Ending Date"
+# The one week whose end NISRA gives as a range rather than a date.
+COMBINED_WEEK_ENDING = "19 Mar 2020 to 20 Mar 2020"
+
+# How convert_obj_to_string holds strings: as Python strings, as categoricals,
+# as Arrow strings, or as whichever of the last two suits each column.
+STRING_DTYPE_MODES = ("str", "category", "string[pyarrow]", "auto")
+
 pd.set_option("future.no_silent_downcasting", True)
 
 
@@ -24,61 +39,153 @@ def mutate_safely(function: Callable) -> Any:
     assigning to the index or column attributes and modifying the values directly in the dataframe.
 
     The purpose of this function is to perform the mutating functions idempotently by mutating
-    local deep copies of dataframes and returning new copies back to the caller.
+    local copies of dataframes and returning new copies back to the caller.
+
+    While pandas Copy-on-Write is enabled, as applications enable it at start-up, the local
+    copy is shallow: it shares every column with the caller's dataframe and only the columns
+    the function modifies are copied, so neither dataframe can see changes made to the other.
+    Otherwise the local copy is a deep copy.
 
     We use Python decorators to adopt this pattern without polluting our core functions. We
     decorate any function with @mutate_safely and write a function that mutates the given
-    dataframe directly without returning it.
+    dataframe directly without returning it. The undecorated function remains available as
+    the decorated function's __wrapped__ attribute.
     """
 
+    @wraps(function)
     def mutate(input_df: DataFrame, **params: Any) -> DataFrame:
-        tmp_df: DataFrame = input_df.copy()
+        tmp_df: DataFrame = input_df.copy(
+            deep=pd.options.mode.copy_on_write is not True
+        )
         function(tmp_df, **params)
         return tmp_df
 
     return mutate
 
 
+def _fill_zeros_in_block(block: np.ndarray) -> np.ndarray:
+    missing = block == 0
+    if block.dtype.kind == "f":
+        missing |= np.isnan(block)
+    # The row of the last value at or above each cell that is not missing, or -1 if there is
+    # none, so each run of missing values takes the value that precedes it.
+    source_rows = np.where(missing, -1, np.arange(len(block))[:, np.newaxis])
+    np.maximum.accumulate(source_rows, axis=0, out=source_rows)
+    filled = np.take_along_axis(block, np.maximum(source_rows, 0), axis=0)
+    filled[source_rows < 0] = 0
+    return filled
+
+
 @mutate_safely
-def fill_zeros(input_df: DataFrame, column: str) -> pd.DataFrame:
+def fill_zeros(input_df: DataFrame, column: str | list[str]) -> pd.DataFrame:
     """
-    Walks through a pandas dataframe column and sets any zero values to the previous non-zero value in the column.
+    Walks through one or more pandas dataframe columns and sets any zero or missing values to the
+    previous non-zero value in the column. Values before the first non-zero value become zero.
+
+    Integer and float columns keep their dtype. Columns of the same dtype are filled together in
+    one NumPy array. Other columns, such as object columns, are filled one at a time by pandas.
 
     Args:
         input_df (pandas.DataFrame): The dataframe to modify.
-        column (str): The name of the column to modify.
+        column (str or list[str]): The column or columns to modify.
 
     Returns:
         A new dataframe with forward-filled values in
-        the column.
+        the columns.
+
+    Raises:
+        KeyError: If a column does not exist.
     """
-    input_df[column] = (
-        input_df[column].infer_objects().replace(0, pd.NA).ffill().fillna(0)
-    )
+    columns = [column] if isinstance(column, str) else list(column)
+
+    columns_by_dtype: Dict[np.dtype, list[str]] = {}
+    for column_name in columns:
+        dtype = input_df[column_name].dtype
+        if isinstance(dtype, np.dtype) and dtype.kind in "iuf":
+            columns_by_dtype.setdefault(dtype, []).append(column_name)
+        else:
+            input_df[column_name] = (
+                input_df[column_name]
+                .infer_objects()
+                .replace(0, pd.NA)
+                .ffill()
+                .fillna(0)
+            )
+
+    for same_dtype_columns in columns_by_dtype.values():
+        input_df[same_dtype_columns] = _fill_zeros_in_block(
+            input_df[same_dtype_columns].to_numpy()
+        )
     return input_df
 
 
+def _convert_to_strings(values: pd.Series, dtype_mode: str) -> pd.Series:
+    strings = values.astype(str)
+    if dtype_mode == "str":
+        return strings
+    if dtype_mode == "auto":
+        dtype_mode = choose_string_dtype(strings)
+    return strings.astype(pd.api.types.pandas_dtype(dtype_mode))
+
+
 @mutate_safely
-def convert_obj_to_string(input_df: DataFrame) -> DataFrame:
+def convert_obj_to_string(input_df: DataFrame, dtype_mode: str = "str") -> DataFrame:
+    """
+    Converts every object column to strings.
+
+    Args:
+        input_df (pandas.DataFrame): The dataframe to modify.
+        dtype_mode (str, optional): How the strings are held. 'str', the default, keeps them as
+            Python strings in object columns. 'category' and 'string[pyarrow]' convert every column
+            to that dtype, and 'auto' chooses between them for each column with
+            choose_string_dtype. Except with 'str', the memory saved is logged.
+
+    Returns:
+        A new dataframe with the object columns converted.
+
+    Raises:
+        ValueError: If dtype_mode is not one of STRING_DTYPE_MODES.
+    """
+    if dtype_mode not in STRING_DTYPE_MODES:
+        raise ValueError(
+            f"Unknown dtype_mode '{dtype_mode}'. Expected one of {STRING_DTYPE_MODES}."
+        )
+
     object_columns = list(input_df.select_dtypes(include="object").columns)
+    before_df = input_df[object_columns]
 
     for object_column in object_columns:
-        input_df[object_column] = input_df[object_column].astype(str)
+        input_df[object_column] = _convert_to_strings(
+            input_df[object_column], dtype_mode
+        )
 
+    if dtype_mode != "str":
+        log_memory_report(before_df, input_df[object_columns])
     return input_df
 
 
-def read_worksheet_into_df(file_specification: Dict[str, str | int]) -> DataFrame:
+def read_worksheet_into_df(
+    file_specification: Mapping[str, Any],
+    workbook: WorkbookSession | None = None,
+    cache: WorksheetCache | None = None,
+    engine: str | None = None,
+) -> DataFrame:
     """
     Reads data from an Excel worksheet into a pandas DataFrame.
 
     Args:
-        file_specification (Dict[str, str or int]): A dictionary containing the following keys:
+        file_specification (Mapping[str, Any]): A mapping containing the following keys:
             'dest_filepath' (str): The file path of the Excel file.
             'worksheet_name' (str): The name of the worksheet to read.
             'num_rows_from_top_to_ignore' (int, optional): The number of rows to skip from the top. Default is 0.
             'num_rows_to_read' (int, optional): The number of rows to read. Default is None (read all rows).
             'column_range_to_read' (str, optional): The range of columns to read. Default is None (read all columns).
+        workbook (WorkbookSession, optional): An open session on the Excel file to read from, so that
+            reading several worksheets or ranges from the file parses it only once.
+        cache (WorksheetCache, optional): A cache to return the worksheet from if it has been read
+            from the same workbook content before, and to add it to otherwise.
+        engine (str, optional): The Excel engine to read with when no workbook session is given.
+            Default is the fastest installed, as chosen by select_excel_engine.
 
     Returns:
         pd.DataFrame: A pandas DataFrame containing the data from the specified worksheet.
@@ -88,23 +195,21 @@ def read_worksheet_into_df(file_specification: Dict[str, str | int]) -> DataFram
         ValueError: If the specified worksheet name is invalid or the column range is invalid.
     """
     try:
-        # Set default values for optional parameters
-        num_rows_from_top_to_ignore: int = int(
-            file_specification.get("num_rows_from_top_to_ignore", 0)
-        )
-        num_rows_to_read: int = int(file_specification.get("num_rows_to_read", 0))
-        column_range_to_read: str = str(
-            file_specification.get("column_range_to_read", "")
-        )
-
-        worksheet_df = pd.read_excel(
-            file_specification["dest_filepath"],
-            sheet_name=file_specification["worksheet_name"],
-            skiprows=num_rows_from_top_to_ignore,
-            header=0,
-            nrows=num_rows_to_read,
-            usecols=column_range_to_read,
-        )
+        if cache is not None:
+            cached_df = cache.get(file_specification)
+            if cached_df is not None:
+                return cached_df
+
+        if workbook is not None:
+            worksheet_df = workbook.read_worksheet(file_specification)
+        else:
+            with WorkbookSession(
+                str(file_specification["dest_filepath"]), cache_size=0, engine=engine
+            ) as session:
+                worksheet_df = session.read_worksheet(file_specification)
+
+        if cache is not None:
+            cache.put(file_specification, worksheet_df)
         return worksheet_df
 
     except FileNotFoundError as exc:
@@ -119,15 +224,103 @@ def read_worksheet_into_df(file_specification: Dict[str, str | int]) -> DataFram
         ) from e
 
 
-def set_object_columns_to_string(input_df: DataFrame) -> DataFrame:
-    df_to_process = input_df.copy()
+def _read_worksheets_from_workbook(
+    file_specifications: list[Dict[str, Any]],
+    cache_directory: str,
+    engine: str | None,
+) -> list[DataFrame | Exception]:
+    # Runs in a worker process, so exceptions are returned rather than raised
+    # to keep the frames read before them and to tell which worksheet failed.
+    # Worksheets not read because the workbook could not be opened, or the
+    # cache used, are reported with that exception.
+    worksheet_dfs: list[DataFrame | Exception] = []
+    try:
+        cache = WorksheetCache(cache_directory) if cache_directory else None
+        with WorkbookSession(
+            str(file_specifications[0]["dest_filepath"]), engine=engine
+        ) as workbook:
+            for file_specification in file_specifications:
+                try:
+                    worksheet_dfs.append(
+                        read_worksheet_into_df(file_specification, workbook, cache)
+                    )
+                except Exception as exc:  # pylint: disable=broad-exception-caught
+                    worksheet_dfs.append(exc)
+    except Exception as exc:  # pylint: disable=broad-exception-caught
+        worksheet_dfs.extend([exc] * (len(file_specifications) - len(worksheet_dfs)))
+    return worksheet_dfs
+
+
+def read_worksheets_into_dfs(
+    file_specifications: list[Dict[str, Any]],
+    max_workers: int | None = None,
+    cache_directory: str = "",
+    engine: str | None = None,
+) -> list[DataFrame]:
+    """
+    Reads many Excel worksheets into pandas DataFrames in parallel, across a pool of processes.
+
+    The worksheets of each workbook are read by the same process, from one parse of the workbook,
+    while different workbooks are read by different processes.
 
-    object_columns_list = list(df_to_process.select_dtypes(include="object").columns)
+    Args:
+        file_specifications (list[Dict[str, Any]]): Worksheets to read, each specified as for
+            read_worksheet_into_df.
+        max_workers (int, optional): The maximum number of processes. Default is the number of CPUs.
+        cache_directory (str, optional): The directory of a WorksheetCache to read worksheets through.
+            Default is not to cache them.
+        engine (str, optional): The Excel engine to read with. Default is the fastest installed.
 
-    for object_column in object_columns_list:
-        df_to_process[object_column] = df_to_process[object_column].astype(str)
+    Returns:
+        list[pd.DataFrame]: One DataFrame per file specification, in the order given.
 
-    return df_to_process
+    Raises:
+        WorksheetReadError: If a worksheet cannot be read. Its file_specification attribute is the
+            specification of the first such worksheet in the order given, and the exception raised
+            when reading it is chained as its cause.
+    """
+    positions_by_workbook: Dict[str, list[int]] = {}
+    for position, file_specification in enumerate(file_specifications):
+        positions_by_workbook.setdefault(
+            str(file_specification["dest_filepath"]), []
+        ).append(position)
+
+    worksheet_dfs: list[DataFrame | Exception] = [DataFrame()] * len(
+        file_specifications
+    )
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {
+            executor.submit(
+                _read_worksheets_from_workbook,
+                [file_specifications[position] for position in positions],
+                cache_directory,
+                engine,
+            ): positions
+            for positions in positions_by_workbook.values()
+        }
+        for future, positions in futures.items():
+            for position, worksheet_df in zip(positions, future.result()):
+                worksheet_dfs[position] = worksheet_df
+
+    for file_specification, worksheet_df in zip(file_specifications, worksheet_dfs):
+        if isinstance(worksheet_df, Exception):
+            raise WorksheetReadError(
+                f"Error reading worksheet '{file_specification['worksheet_name']}' "
+                f"from '{file_specification['dest_filepath']}': {worksheet_df}",
+                file_specification,
+            ) from worksheet_df
+    return [
+        worksheet_df
+        for worksheet_df in worksheet_dfs
+        if isinstance(worksheet_df, DataFrame)
+    ]
+
+
+def set_object_columns_to_string(
+    input_df: DataFrame, dtype_mode: str = "str"
+) -> DataFrame:
+    output_df: DataFrame = convert_obj_to_string(input_df, dtype_mode=dtype_mode)
+    return output_df
 
 
 def rename_columns(input_df: DataFrame, column_mapping: Dict[str, str]) -> DataFrame:
@@ -140,31 +333,68 @@ def inner_join_with(
     columns_to_include: list[str],
     join_key: str,
 ) -> DataFrame:
+    """
+    Inner joins the given columns of a dataframe to another on a key column.
+
+    Each call hashes the keys of both dataframes. To join the same dataframe to many others,
+    build a util_lib.join.JoinIndex of it once and join with that instead.
+    """
     return pd.merge(input_df, df_to_join[columns_to_include], on=join_key, how="inner")
 
 
 @mutate_safely
 def add_week_ending_date(
-    input_df: DataFrame, default_date: str, existing_week_end_date_col_name: str
+    input_df: DataFrame,
+    default_date: str,
+    existing_week_end_date_col_name: str,
+    as_datetime: bool = False,
 ) -> None:
+    """
+    Adds a 'Week Ending Date' column derived from a column of week ending dates as read from a
+    NISRA workbook.
 
-    def calculate_week_ending_date(
-        week_ending: str, default: str = "2020-19-03"
-    ) -> str:
-        if week_ending == "19 Mar 2020 to 20 Mar 2020":
-            return default
-
-        if len(week_ending) > 10:
-            return remove_timestamp(week_ending)
+    Args:
+        input_df (pandas.DataFrame): The dataframe to modify.
+        default_date (str): The date given to the week that ended on
+            '19 Mar 2020 to 20 Mar 2020'.
+        existing_week_end_date_col_name (str): The column of week ending dates, e.g.
+            'Week Ends (Friday)' or 'Week_end_Date'. Strings longer than 'YYYY-MM-DD' must be
+            timestamps of the form 'YYYY-MM-DD HH:MM:SS'; shorter ones are used as they are.
+        as_datetime (bool, optional): Whether the new column holds datetime64 dates rather than
+            'YYYY-MM-DD' strings. Default is False.
 
-        return week_ending
+    Returns:
+        A new dataframe with the 'Week Ending Date' column.
 
-    # Can be: Week Ends (Friday) or: Week_end_Date
-    input_df["Week Ending Date"] = input_df[existing_week_end_date_col_name].apply(
-        lambda raw_week_ending_date: calculate_week_ending_date(
-            raw_week_ending_date, default_date
+    Raises:
+        KeyError: If the column of week ending dates does not exist.
+        TypeError: If the column holds anything other than strings.
+        ValueError: If a timestamp is invalid or, with as_datetime, a date is invalid.
+    """
+    week_endings = input_df[existing_week_end_date_col_name]
+    if pd.api.types.infer_dtype(week_endings, skipna=False) not in ("string", "empty"):
+        raise TypeError(
+            f"Column '{existing_week_end_date_col_name}' must only contain strings."
         )
+
+    is_combined_week = (week_endings == COMBINED_WEEK_ENDING).to_numpy()
+    has_timestamp = (week_endings.str.len() > len("YYYY-MM-DD")).to_numpy(
+        dtype=bool
+    ) & ~is_combined_week
+
+    week_ending_dates = week_endings.to_numpy(dtype=object, copy=True)
+    week_ending_dates[is_combined_week] = default_date
+    week_ending_dates[has_timestamp] = remove_timestamps(
+        week_endings[has_timestamp].to_numpy()
+    )
+
+    input_df[WEEK_ENDING_DATE_COLUMN] = pd.Series(
+        week_ending_dates, index=input_df.index, dtype=object
     )
+    if as_datetime:
+        input_df[WEEK_ENDING_DATE_COLUMN] = pd.to_datetime(
+            input_df[WEEK_ENDING_DATE_COLUMN], format="%Y-%m-%d"
+        )
 
 
 @mutate_safely
@@ -188,15 +418,88 @@ def convert_datatypes(input_df: DataFrame) -> DataFrame:
     return input_df.convert_dtypes()
 
 
-@mutate_safely
-def extract_and_cast_as_int(input_df: DataFrame, column: str) -> None:
-    input_df[column] = (
-        input_df[column]
-        .astype(str)
-        .str.replace("[a-zA-Z]", "", regex=True)
-        .astype(float)
-        .astype(int)
+def _numbers_as_floats(values: pd.Series) -> np.ndarray:
+    # Booleans are not counts, though pd.to_numeric reads them as 1 and 0, and
+    # it reads dates and durations as nanoseconds, so they are left as NaN. As
+    # text they are not numbers either.
+    if pd.api.types.is_bool_dtype(values) or not (
+        pd.api.types.is_numeric_dtype(values)
+        or pd.api.types.is_object_dtype(values)
+        or pd.api.types.is_string_dtype(values)
+    ):
+        return np.full(len(values), np.nan)
+    floats = pd.to_numeric(values, errors="coerce").to_numpy(
+        dtype="float64", na_value=np.nan, copy=True
     )
+    if pd.api.types.infer_dtype(values) in ("boolean", "mixed", "mixed-integer"):
+        floats[[isinstance(value, (bool, np.bool_)) for value in values]] = np.nan
+    return floats
+
+
+@mutate_safely
+def extract_and_cast_as_int(
+    input_df: DataFrame, column: str | list[str], nullable: bool = False
+) -> None:
+    """
+    Casts one or more columns of counts, some of which may carry letters such as footnote
+    markers, e.g. '123p', to integers.
+
+    Numbers, and strings pandas reads as numbers, are used as they are. The remaining cells of
+    all the columns are then converted together: their letters are removed and what is left is
+    read as a number. Fractional numbers are truncated.
+
+    Args:
+        input_df (pandas.DataFrame): The dataframe to modify.
+        column (str or list[str]): The column or columns to cast.
+        nullable (bool, optional): Whether to cast to the nullable Int64 dtype, with missing cells
+            and cells without digits becoming <NA>, rather than to int64. Default is False.
+
+    Returns:
+        A new dataframe with the columns cast to integers.
+
+    Raises:
+        KeyError: If a column does not exist.
+        ValueError: If a cell is not a number once its letters are removed or, unless nullable,
+            is missing.
+    """
+    columns = [column] if isinstance(column, str) else list(column)
+    integer_dtype: Literal["Int64", "int64"] = "Int64" if nullable else "int64"
+
+    columns_to_cast: list[tuple[str, np.ndarray, np.ndarray]] = []
+    text_cells: list[np.ndarray] = []
+    for column_name in columns:
+        values = input_df[column_name]
+        if pd.api.types.is_integer_dtype(values.dtype) and not values.hasnans:
+            input_df[column_name] = values.astype(integer_dtype)
+            continue
+
+        floats = _numbers_as_floats(values)
+        needs_text = np.isnan(floats)
+        if nullable:
+            needs_text &= values.notna().to_numpy()
+        columns_to_cast.append((column_name, floats, needs_text))
+        text_cells.append(values.to_numpy(dtype=object)[needs_text])
+
+    if columns_to_cast:
+        texts = (
+            pd.Series(np.concatenate(text_cells), dtype=object)
+            .astype(str)
+            .str.replace("[a-zA-Z]", "", regex=True)
+        )
+        if nullable:
+            texts = texts.where(texts.str.strip() != "")
+        text_floats = texts.astype(float).to_numpy()
+
+        start = 0
+        for _, floats, needs_text in columns_to_cast:
+            end = start + np.count_nonzero(needs_text)
+            floats[needs_text] = text_floats[start:end]
+            start = end
+
+    for column_name, floats, _ in columns_to_cast:
+        input_df[column_name] = pd.Series(
+            np.trunc(floats), index=input_df.index
+        ).astype(integer_dtype)
 
 
 if __name__ == "__main__":
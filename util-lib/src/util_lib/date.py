@@ -5,6 +5,13 @@
 from datetime import datetime
 from enum import IntEnum
 
+import numpy as np
+
+from util_lib.primitive import (
+    Values,
+    convert_each_distinct_value,
+    parse_distinct_dates,
+)
 import logging
 
 logger = logging.getLogger(__name__)
@@ -43,5 +50,39 @@ def reformat_date(
     return datetime.strptime(input_date, source_format).strftime(target_format)
 
 
+def reformat_dates(
+    input_dates: Values,
+    source_format: str = "%d-%m-%Y",
+    target_format: str = "%Y-%m-%d",
+) -> Values:
+    """
+    Convert many strings representing dates from one format to another, as
+    reformat_date does for one. Each distinct string is converted only once.
+    :param input_dates: A Series, list or NumPy array of strings representing dates.
+    :param source_format: The format of the strings above.
+    :param target_format: The format of the desired strings.
+    :return: The strings in the desired format, in a Series, list or NumPy
+        array like the one given.
+    :raises ValueError: If a string does not match the source format.
+    :raises TypeError: If a value is not a string.
+    """
+
+    def reformat_distinct_dates(distinct_dates: np.ndarray) -> np.ndarray:
+        parsed_dates = parse_distinct_dates(distinct_dates, source_format)
+        if target_format == "%Y-%m-%d" and parsed_dates.tz is None:
+            reformatted = np.datetime_as_string(parsed_dates.to_numpy(), unit="D")
+        else:
+            reformatted = parsed_dates.strftime(target_format).to_numpy()
+        reformatted = reformatted.astype(object)
+
+        for position in np.flatnonzero(parsed_dates.isna()):
+            reformatted[position] = reformat_date(
+                distinct_dates[position], source_format, target_format
+            )
+        return reformatted
+
+    return convert_each_distinct_value(input_dates, reformat_distinct_dates)
+
+
 if __name__ == "__main__":
     print("main")
@@ -0,0 +1,146 @@
+"""
+ Convenience functions for holding dataframe columns in the least memory.
+
+ Dataframes built in notebooks keep pandas' default dtypes: 64-bit integers
+ and floats, and Python strings in object columns. optimise_dtypes downcasts
+ integer columns to 32 bits where every value fits and converts columns of
+ repeated strings to categoricals, logging the memory saved by each column.
+ Floats, and integers narrower than 32 bits, are never produced: sums of
+ counts overflow int8 and int16 columns silently, and float32 changes the
+ results of arithmetic on values it holds exactly.
+"""
+
+from typing import Any
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+from pandas.api.extensions import ExtensionDtype
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# The largest proportion of distinct values for which choose_string_dtype
+# chooses a categorical.
+MAX_CATEGORY_RATIO = 0.5
+
+# The narrowest dtypes to which optimise_dtypes downcasts integer columns.
+_DOWNCAST_INTEGER_DTYPES: dict[Any, np.dtype | ExtensionDtype] = {
+    np.dtype(np.int64): np.dtype(np.int32),
+    pd.Int64Dtype(): pd.Int32Dtype(),
+}
+
+
+def choose_string_dtype(
+    values: pd.Series, max_category_ratio: float = MAX_CATEGORY_RATIO
+) -> str:
+    """
+    Choose the dtype that holds a column of strings in the least memory.
+
+    :param values: The strings.
+    :param max_category_ratio: The largest proportion of distinct values for
+        which a categorical is chosen.
+    :return: 'category' if few of the strings are distinct, so each is stored
+        once and the rows hold small integer codes, and 'string[pyarrow]'
+        otherwise.
+    """
+    if len(values) and values.nunique(dropna=False) <= max_category_ratio * len(values):
+        return "category"
+    return "string[pyarrow]"
+
+
+def memory_report(before_df: DataFrame, after_df: DataFrame) -> DataFrame:
+    """
+    Compare the memory used by each column of a dataframe before and after
+    its dtypes changed.
+
+    :param before_df: The dataframe before.
+    :param after_df: The dataframe after, with the same columns.
+    :return: A dataframe indexed by column with the columns 'dtype_before',
+        'dtype_after', 'bytes_before', 'bytes_after' and 'bytes_saved',
+        counting the memory of Python objects held in object columns.
+    """
+    bytes_before = before_df.memory_usage(index=False, deep=True)
+    bytes_after = after_df.memory_usage(index=False, deep=True)
+    return DataFrame(
+        {
+            "dtype_before": before_df.dtypes.astype(str),
+            "dtype_after": after_df.dtypes.astype(str),
+            "bytes_before": bytes_before,
+            "bytes_after": bytes_after,
+            "bytes_saved": bytes_before - bytes_after,
+        }
+    )
+
+
+def log_memory_report(before_df: DataFrame, after_df: DataFrame) -> None:
+    """
+    Log the memory_report of two dataframes, one line per column and a total.
+    The report is only made if INFO messages are logged.
+    """
+    if not logger.isEnabledFor(logging.INFO):
+        return
+
+    report = memory_report(before_df, after_df)
+    for column, row in report.iterrows():
+        logger.info(
+            f"Column '{column}': {row['dtype_before']} -> {row['dtype_after']}, "
+            f"{row['bytes_before']:,} -> {row['bytes_after']:,} bytes"
+        )
+    logger.info(f"Saved {report['bytes_saved'].sum():,} bytes in total")
+
+
+def _downcast_integers(
+    values: pd.Series, downcast_dtype: np.dtype | ExtensionDtype
+) -> pd.Series:
+    int32_info = np.iinfo(np.int32)
+    if values.count() == 0 or (
+        int32_info.min <= values.min() and values.max() <= int32_info.max
+    ):
+        return values.astype(downcast_dtype)
+    return values
+
+
+def _optimise_column(values: pd.Series, max_category_ratio: float) -> pd.Series:
+    dtype = values.dtype
+    if dtype in _DOWNCAST_INTEGER_DTYPES:
+        return _downcast_integers(values, _DOWNCAST_INTEGER_DTYPES[dtype])
+    if (
+        dtype == np.dtype("object")
+        and pd.api.types.infer_dtype(values, skipna=True) == "string"
+        and choose_string_dtype(values, max_category_ratio) == "category"
+    ):
+        return values.astype("category")
+    return values
+
+
+def optimise_dtypes(
+    input_df: DataFrame, max_category_ratio: float = MAX_CATEGORY_RATIO
+) -> DataFrame:
+    """
+    Hold each column of a dataframe in the least memory without changing its
+    values:
+
+    - int64 and Int64 columns are downcast to int32 and Int32 if every value
+      fits in 32 bits.
+    - Object columns of strings are converted to categoricals if few of the
+      strings are distinct, as decided by choose_string_dtype.
+
+    Other columns, including floats, are left unchanged.
+
+    :param input_df: The dataframe. It is not modified.
+    :param max_category_ratio: The largest proportion of distinct strings for
+        which a column is converted to a categorical.
+    :return: A new dataframe with the optimised dtypes. The memory saved by
+        each column is logged.
+    """
+    output_df = input_df.copy(deep=False)
+    for position in range(output_df.shape[1]):
+        output_df.isetitem(
+            position,
+            _optimise_column(output_df.iloc[:, position], max_category_ratio).array,
+        )
+
+    log_memory_report(input_df, output_df)
+    return output_df
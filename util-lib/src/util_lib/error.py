@@ -2,6 +2,8 @@
  Custom exceptions.
 """
 
+from typing import Any, Dict
+
 
 class InvalidFileError(Exception):
     """
@@ -10,3 +12,13 @@ class InvalidFileError(Exception):
 
     def __init__(self, message:str) -> None:
         super().__init__(message)
+
+
+class WorksheetReadError(Exception):
+    """
+    Exception raised when one of a batch of worksheets cannot be read.
+    """
+
+    def __init__(self, message: str, file_specification: Dict[str, Any]) -> None:
+        super().__init__(message)
+        self.file_specification = file_specification
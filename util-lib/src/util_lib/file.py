@@ -3,14 +3,24 @@
 """
 
 import os
-from typing import Any
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, Mapping, TextIO
+from urllib.parse import urlsplit
 import hashlib
 import json
+import re
 import jsonschema
+import referencing
+import referencing.jsonschema
 import requests
 from typing_extensions import Buffer
-from jsonschema import validate
+from jsonschema.protocols import Validator
 
+from util_lib.blobstore import BlobStore
+from util_lib.checksum import hash_file
 from util_lib.error import InvalidFileError
 import logging
 
@@ -23,31 +33,97 @@ LOCAL_CA_CERTIFICATE_FILE_PATH = (
     "site-packages/certifi/cacert.pem"
 )
 
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+DOWNLOAD_METADATA_FILE_SUFFIX = ".meta.json"
+JSON_READ_CHUNK_SIZE = 64 * 1024
+
+# Below this many bytes of JSON in total, documents are validated in this
+# process, as validating them takes less time than starting a pool of processes.
+PARALLEL_VALIDATION_MIN_BYTES = 64 * 1024
+
+# The most characters of a JSON token, '-Infinity', that the decoder reports
+# as an error from where the token starts when it is cut short.
+_MAX_PARTIAL_TOKEN_LENGTH = len("-Infinity")
+
+# Compiled schema validators by schema file path, with the modification time
+# of the schema file each was compiled from.
+_schema_validators: Dict[str, tuple[int, Validator]] = {}
+_schema_validators_lock = threading.Lock()
+
 
 def download_file(
-    from_path: str, to_path: str, ca_cert_path: str = LOCAL_CA_CERTIFICATE_FILE_PATH
+    from_path: str,
+    to_path: str,
+    ca_cert_path: str = LOCAL_CA_CERTIFICATE_FILE_PATH,
+    stream: bool = False,
+    resume: bool = False,
+    expected_hash: str = "",
 ) -> None:
+    """
+    Download a file, overwriting any file already at the destination.
+
+    :param from_path: URL of the file to download.
+    :param to_path: Destination path.
+    :param ca_cert_path: CA bundle used to verify the server's certificate.
+    :param stream: Write the response chunk by chunk to a .tmp file next to
+        the destination, rather than holding the whole body in memory, and move
+        it into place once it is complete. A file already at the destination
+        is left as it is if the download fails.
+    :param resume: If a previous attempt left a .tmp file behind, continue
+        from where it stopped with a Range request. Resumed downloads are
+        always streamed.
+    :param expected_hash: If given, the sha256 hash the downloaded content
+        must have. Downloads checked against a hash are always streamed.
+    :raises InvalidFileError: If the content does not match the expected hash.
+    """
     logger.info("downloaded from: " + from_path)
 
+    if stream or resume or expected_hash:
+        download_path = to_path + ".tmp"
+        downloaded_file_hash, _, _ = _stream_download_to_file(
+            from_path,
+            download_path,
+            "sha256",
+            ca_cert_path=ca_cert_path,
+            timeout=300,
+            resume=resume,
+        )
+        _check_expected_hash(downloaded_file_hash, expected_hash, download_path)
+        _rename_file(download_path, to_path)
+        return
+
     response = requests.get(from_path, verify=ca_cert_path, timeout=300)
 
     with open(to_path, "wb") as file:
         file.write(response.content)
 
 
-def calculate_file_hash(file_path: str, hash_algorithm: str = "sha256") -> str:
+def calculate_file_hash(
+    file_path: str, hash_algorithm: str = "sha256", blob_store: BlobStore | None = None
+) -> str:
     """
     Calculate the hash of a file using the specified hash algorithm.
 
     :param file_path: Path to the file.
     :param hash_algorithm: Hash algorithm to use (default is 'sha256').
+    :param blob_store: If given and it uses the same hash algorithm, return
+        the hash it has recorded for the file if the file is unchanged since,
+        and record the calculated hash otherwise.
     :return: Hexadecimal hash string.
     """
-    hash_func = hashlib.new(hash_algorithm)
-    with open(file_path, "rb") as file:
-        for chunk in iter(lambda: file.read(4096), b""):
-            hash_func.update(chunk)
-    return hash_func.hexdigest()
+    if blob_store is not None and blob_store.hash_algorithm != hash_algorithm:
+        blob_store = None
+
+    if blob_store is not None:
+        known_hash = blob_store.known_hash(file_path)
+        if known_hash is not None:
+            return known_hash
+
+    file_hash = hash_file(file_path, hash_algorithm)
+
+    if blob_store is not None:
+        blob_store.record_file_hash(file_path, file_hash)
+    return file_hash
 
 
 def _is_valid_url(url: str) -> bool:
@@ -66,22 +142,187 @@ def _download_file(
     return response.content
 
 
+def _update_hash_from_file(hash_func: Any, file_path: str) -> None:
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(DOWNLOAD_CHUNK_SIZE), b""):
+            hash_func.update(chunk)
+
+
+def _read_partial_download_validator(partial_path: str) -> str:
+    partial_metadata = read_download_metadata(partial_path)
+    if partial_metadata is None:
+        return ""
+    return partial_metadata.get("etag") or partial_metadata.get("last_modified", "")
+
+
+def _content_range_start(response: requests.Response) -> int | None:
+    # Content-Range is of the form 'bytes <first>-<last>/<size>'.
+    match = re.match(r"bytes (\d+)-", response.headers.get("Content-Range", ""))
+    return int(match.group(1)) if match else None
+
+
+def _stream_download_to_file(
+    from_path: str,
+    to_path: str,
+    hash_algorithm: str = "sha256",
+    ca_cert_path: str = LOCAL_CA_CERTIFICATE_FILE_PATH,
+    timeout: int = 10,
+    session: requests.Session | None = None,
+    headers: Dict[str, str] | None = None,
+    resume: bool = False,
+) -> tuple[str, Mapping[str, str], int]:
+    """
+    Write a response body to a file as it arrives, updating the hash with each
+    chunk, so memory use does not grow with the size of the file and the file
+    does not have to be read back to be hashed.
+
+    When resuming, the response's validator is recorded next to the file while
+    it is incomplete. A later call sends a Range request for the missing bytes,
+    with an If-Range header so that a changed file is sent in full instead. If
+    the range cannot be satisfied, or the server sends the content from any
+    other byte than the one asked for, the file is downloaded again in full.
+    Without resume, an incomplete file is removed if the download fails.
+
+    :param session: Session whose pooled connections are reused for the request.
+    :param headers: Additional request headers.
+    :param resume: Continue from the bytes already in the file, if any.
+    :return: Hexadecimal hash of the downloaded content, or an empty string if
+        the server answered 304 Not Modified and nothing was written, together
+        with the response headers and the number of bytes received.
+    """
+    hash_func = hashlib.new(hash_algorithm)
+    http_get = session.get if session is not None else requests.get
+    partial_metadata_path = to_path + DOWNLOAD_METADATA_FILE_SUFFIX
+
+    request_headers = dict(headers or {})
+    resume_from = (
+        os.path.getsize(to_path) if resume and _is_file_present(to_path) else 0
+    )
+    if resume_from:
+        request_headers["Range"] = f"bytes={resume_from}-"
+        partial_validator = _read_partial_download_validator(to_path)
+        if partial_validator:
+            request_headers["If-Range"] = partial_validator
+
+    with http_get(
+        from_path,
+        verify=ca_cert_path,
+        timeout=timeout,
+        stream=True,
+        headers=request_headers,
+    ) as response:
+        if response.status_code == requests.codes.not_modified:
+            return "", response.headers, 0
+
+        is_resumed = response.status_code == requests.codes.partial_content
+        if response.status_code == requests.codes.requested_range_not_satisfiable or (
+            is_resumed and _content_range_start(response) != resume_from
+        ):
+            logger.info(f"Cannot resume {to_path}; downloading it again.")
+            _delete_file(to_path)
+            return _stream_download_to_file(
+                from_path,
+                to_path,
+                hash_algorithm,
+                ca_cert_path,
+                timeout,
+                session,
+                headers,
+                resume,
+            )
+
+        response.raise_for_status()
+
+        if is_resumed:
+            logger.info(f"Resuming {from_path} from byte {resume_from}")
+            _update_hash_from_file(hash_func, to_path)
+        elif resume:
+            _write_download_metadata(
+                to_path,
+                {
+                    "url": from_path,
+                    "etag": response.headers.get("ETag", ""),
+                    "last_modified": response.headers.get("Last-Modified", ""),
+                },
+            )
+
+        num_bytes = 0
+        try:
+            with open(to_path, "ab" if is_resumed else "wb") as file:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    file.write(chunk)
+                    hash_func.update(chunk)
+                    num_bytes += len(chunk)
+        except (requests.RequestException, OSError):
+            if not resume and _is_file_present(to_path):
+                _delete_file(to_path)
+            raise
+
+    if _is_file_present(partial_metadata_path):
+        _delete_file(partial_metadata_path)
+
+    return hash_func.hexdigest(), response.headers, num_bytes
+
+
+def _check_expected_hash(
+    downloaded_file_hash: str, expected_hash: str, path_to_delete: str
+) -> None:
+    if expected_hash and downloaded_file_hash != expected_hash:
+        _delete_file(path_to_delete)
+        raise InvalidFileError(
+            f"The downloaded file hash {downloaded_file_hash} "
+            f"does not match the expected hash {expected_hash}."
+        )
+
+
+def read_download_metadata(to_path: str) -> Dict[str, str] | None:
+    """
+    Read the validators and hash recorded for a file by a conditional download.
+
+    :param to_path: Path of the downloaded file.
+    :return: The metadata, or None if none has been recorded.
+    """
+    metadata_path = to_path + DOWNLOAD_METADATA_FILE_SUFFIX
+    if not _is_file_present(metadata_path):
+        return None
+    return dict(get_json_content_from_file(metadata_path))
+
+
+def _write_download_metadata(to_path: str, metadata: Dict[str, str]) -> None:
+    with open(to_path + DOWNLOAD_METADATA_FILE_SUFFIX, "w", encoding="UTF-8") as file:
+        json.dump(metadata, file, indent=2)
+        file.write("\n")
+
+
+def _conditional_request_headers(
+    metadata: Dict[str, str] | None,
+    from_path: str,
+    hash_algorithm: str,
+) -> Dict[str, str]:
+    if (
+        metadata is None
+        or metadata.get("url") != from_path
+        or metadata.get("hash_algorithm") != hash_algorithm
+    ):
+        return {}
+
+    headers = {}
+    if metadata.get("etag"):
+        headers["If-None-Match"] = metadata["etag"]
+    if metadata.get("last_modified"):
+        headers["If-Modified-Since"] = metadata["last_modified"]
+    return headers
+
+
 def _save_temp_file(temp_file_path: str, content: Buffer) -> None:
     with open(temp_file_path, "wb") as file:
         file.write(content)
 
 
 def _calculate_file_hash(file_path: str, algorithm: str = "sha256") -> str:
-    hash_func = (
-        hashlib.sha256() if algorithm == "sha256" else None
-    )
-    if hash_func is None:
+    if algorithm != "sha256":
         raise ValueError(f"Unsupported hash algorithm: {algorithm}")
-
-    with open(file_path, "rb") as f:
-        for chunk in iter(lambda: f.read(4096), b""):
-            hash_func.update(chunk)
-    return hash_func.hexdigest()
+    return hash_file(file_path, algorithm)
 
 
 def _is_file_present(path: str) -> bool:
@@ -115,9 +356,102 @@ def _save_only_if_new(
         _rename_file(temp_file_path, to_path)
 
 
-def download_new_file(
-    from_path: str, to_path: str, hash_algorithm: str = "sha256"
+def _save_to_blob_store_only_if_new(
+    blob_store: BlobStore, downloaded_file_hash: str, temp_file_path: str, to_path: str
 ) -> None:
+    if _is_file_present(to_path):
+        existing_file_hash = calculate_file_hash(
+            to_path, blob_store.hash_algorithm, blob_store
+        )
+        logger.info(f"Hash of existing file: {existing_file_hash}")
+        if downloaded_file_hash == existing_file_hash:
+            if downloaded_file_hash in blob_store:
+                _delete_file(temp_file_path)
+            else:
+                blob_store.add(temp_file_path, to_path, downloaded_file_hash)
+            return
+        logger.info(
+            "The downloaded file is different from the existing file. The file will be saved."
+        )
+    else:
+        logger.info("The target file does not exist. The file will be saved.")
+
+    blob_store.add(temp_file_path, to_path, downloaded_file_hash)
+    blob_store.checkout(downloaded_file_hash, to_path)
+
+
+def download_new_file(
+    from_path: str,
+    to_path: str,
+    hash_algorithm: str = "sha256",
+    stream: bool = False,
+    session: requests.Session | None = None,
+    conditional: bool = False,
+    resume: bool = False,
+    expected_hash: str = "",
+    blob_store: BlobStore | None = None,
+) -> str:
+    """
+    Download a file and save it only if its content differs from the file
+    already at the destination.
+
+    :param from_path: URL of the file to download.
+    :param to_path: Destination path.
+    :param hash_algorithm: Hash algorithm used to compare contents.
+    :param stream: Write the response to disk chunk by chunk, hashing it as it
+        arrives, rather than holding the whole body in memory and hashing the
+        saved file afterwards.
+    :param session: Session to make a streamed request with, so its pooled
+        connection to the host can be reused.
+    :param conditional: Record the response's ETag and Last-Modified headers in
+        a metadata file next to the destination, and send them back as
+        If-None-Match and If-Modified-Since on later downloads. A 304 Not
+        Modified response then ends the download without transferring or
+        hashing the body. Conditional downloads are always streamed.
+    :param resume: If a previous attempt left a partial .tmp file behind,
+        continue from where it stopped with a Range request rather than starting
+        again. Resumed downloads are always streamed.
+    :param expected_hash: If given, the hash the downloaded content must have,
+        or, after a 304 Not Modified response, the file already at the
+        destination.
+    :param blob_store: If given, also keep the downloaded content in the store
+        under the destination path, and take the hash of the file already at
+        the destination from the store rather than recalculating it.
+    :return: Hexadecimal hash of the downloaded content.
+    :raises InvalidFileError: If the content does not match the expected hash.
+    :raises ValueError: If the blob store uses a different hash algorithm.
+    """
+    downloaded_file_hash, _ = _download_new_file(
+        from_path,
+        to_path,
+        hash_algorithm,
+        stream,
+        session,
+        conditional,
+        resume,
+        expected_hash,
+        blob_store,
+    )
+    return downloaded_file_hash
+
+
+def _download_new_file(
+    from_path: str,
+    to_path: str,
+    hash_algorithm: str,
+    stream: bool,
+    session: requests.Session | None,
+    conditional: bool,
+    resume: bool,
+    expected_hash: str,
+    blob_store: BlobStore | None,
+) -> tuple[str, int]:
+    # As download_new_file, also returning the number of bytes received.
+    if blob_store is not None and blob_store.hash_algorithm != hash_algorithm:
+        raise ValueError(
+            f"The blob store uses {blob_store.hash_algorithm}, not {hash_algorithm}."
+        )
+
     if not _is_valid_url(from_path):
         raise InvalidFileError(
             "Invalid URL. The URL should start with 'http://' or 'https://'."
@@ -126,11 +460,192 @@ def download_new_file(
     _create_directory_if_not_exists(to_path)
 
     temp_file_path = to_path + ".tmp"
-    _save_temp_file(temp_file_path, _download_file(from_path))
+    if stream or conditional or resume:
+        metadata = (
+            read_download_metadata(to_path)
+            if conditional and _is_file_present(to_path)
+            else None
+        )
+        downloaded_file_hash, response_headers, num_bytes = _stream_download_to_file(
+            from_path,
+            temp_file_path,
+            hash_algorithm,
+            session=session,
+            headers=_conditional_request_headers(metadata, from_path, hash_algorithm),
+            resume=resume,
+        )
+        if metadata is not None and not downloaded_file_hash:
+            logger.info(f"Not modified since last download: {from_path}")
+            for stale_path in (
+                temp_file_path,
+                temp_file_path + DOWNLOAD_METADATA_FILE_SUFFIX,
+            ):
+                if _is_file_present(stale_path):
+                    _delete_file(stale_path)
+            if expected_hash:
+                # The file is kept, but without its validators, so the next
+                # download transfers it again.
+                _check_expected_hash(
+                    calculate_file_hash(to_path, hash_algorithm, blob_store),
+                    expected_hash,
+                    to_path + DOWNLOAD_METADATA_FILE_SUFFIX,
+                )
+            return metadata["hash"], 0
+    else:
+        response_headers = {}
+        content = _download_file(from_path)
+        num_bytes = len(content)
+        _save_temp_file(temp_file_path, content)
+        downloaded_file_hash = calculate_file_hash(temp_file_path, hash_algorithm)
 
-    downloaded_file_hash = calculate_file_hash(temp_file_path, hash_algorithm)
+    _check_expected_hash(downloaded_file_hash, expected_hash, temp_file_path)
 
-    _save_only_if_new(downloaded_file_hash, hash_algorithm, temp_file_path, to_path)
+    if blob_store is not None:
+        _save_to_blob_store_only_if_new(
+            blob_store, downloaded_file_hash, temp_file_path, to_path
+        )
+    else:
+        _save_only_if_new(downloaded_file_hash, hash_algorithm, temp_file_path, to_path)
+
+    if conditional:
+        _write_download_metadata(
+            to_path,
+            {
+                "url": from_path,
+                "etag": response_headers.get("ETag", ""),
+                "last_modified": response_headers.get("Last-Modified", ""),
+                "hash_algorithm": hash_algorithm,
+                "hash": downloaded_file_hash,
+            },
+        )
+
+    return downloaded_file_hash, num_bytes
+
+
+@dataclass(frozen=True)
+class DownloadResult:
+    """
+    The outcome of one download in a batch. num_bytes counts the bytes
+    received, so it is 0 if the server answered 304 Not Modified.
+    """
+
+    from_path: str
+    to_path: str
+    succeeded: bool
+    num_bytes: int
+    elapsed_seconds: float
+    file_hash: str = ""
+    error: str = ""
+
+
+class _HostSessionPool:
+    """
+    Hands each worker thread one session per host, so consecutive downloads
+    from the same host reuse a kept-alive connection.
+    """
+
+    def __init__(self) -> None:
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._sessions: list[requests.Session] = []
+
+    def session_for(self, url: str) -> requests.Session:
+        host_sessions: dict[str, requests.Session] = getattr(
+            self._local, "host_sessions", {}
+        )
+        self._local.host_sessions = host_sessions
+
+        host = urlsplit(url).netloc
+        if host not in host_sessions:
+            host_sessions[host] = requests.Session()
+            with self._lock:
+                self._sessions.append(host_sessions[host])
+        return host_sessions[host]
+
+    def close(self) -> None:
+        for session in self._sessions:
+            session.close()
+
+
+def _download_one(
+    session_pool: _HostSessionPool,
+    from_path: str,
+    to_path: str,
+    hash_algorithm: str,
+    conditional: bool,
+    blob_store: BlobStore | None,
+) -> DownloadResult:
+    start_time = time.perf_counter()
+    try:
+        file_hash, num_bytes = _download_new_file(
+            from_path,
+            to_path,
+            hash_algorithm,
+            stream=True,
+            session=session_pool.session_for(from_path),
+            conditional=conditional,
+            resume=False,
+            expected_hash="",
+            blob_store=blob_store,
+        )
+    except (requests.RequestException, InvalidFileError, OSError) as exc:
+        logger.warning(f"Failed to download {from_path}: {exc}")
+        return DownloadResult(
+            from_path,
+            to_path,
+            succeeded=False,
+            num_bytes=0,
+            elapsed_seconds=time.perf_counter() - start_time,
+            error=str(exc),
+        )
+
+    return DownloadResult(
+        from_path,
+        to_path,
+        succeeded=True,
+        num_bytes=num_bytes,
+        elapsed_seconds=time.perf_counter() - start_time,
+        file_hash=file_hash,
+    )
+
+
+def download_files(
+    downloads: list[tuple[str, str]],
+    max_workers: int = 4,
+    hash_algorithm: str = "sha256",
+    conditional: bool = False,
+    blob_store: BlobStore | None = None,
+) -> list[DownloadResult]:
+    """
+    Download many files concurrently, saving each only if it is new, as
+    download_new_file does.
+
+    :param downloads: (URL, destination path) pairs.
+    :param max_workers: The maximum number of downloads in flight at once.
+    :param hash_algorithm: Hash algorithm used to compare contents.
+    :param conditional: Make conditional requests, as download_new_file does.
+    :param blob_store: Keep every download in this store, as download_new_file does.
+    :return: One result per download, in the order given. A failed download
+        is reported in its result rather than raised.
+    """
+    session_pool = _HostSessionPool()
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(
+                executor.map(
+                    lambda download: _download_one(
+                        session_pool,
+                        download[0],
+                        download[1],
+                        hash_algorithm,
+                        conditional,
+                        blob_store,
+                    ),
+                    downloads,
+                )
+            )
+    finally:
+        session_pool.close()
 
 
 def get_json_content_from_file(input_file: str) -> Any:
@@ -139,16 +654,157 @@ def get_json_content_from_file(input_file: str) -> Any:
     return json_content
 
 
+class _JsonArrayReader:
+    """
+    Decodes the items of a top-level JSON array one at a time, holding no
+    more of the file in memory than the item being decoded and one chunk.
+    """
+
+    def __init__(self, file: TextIO, chunk_size: int) -> None:
+        self._file = file
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._position = 0
+        self._is_exhausted = False
+
+    def _read_more(self) -> bool:
+        chunk = self._file.read(max(self._chunk_size, len(self._buffer)))
+        if not chunk:
+            self._is_exhausted = True
+            return False
+        self._buffer = self._buffer[self._position :] + chunk
+        self._position = 0
+        return True
+
+    def _next_character(self) -> str:
+        while True:
+            while (
+                self._position < len(self._buffer)
+                and self._buffer[self._position].isspace()
+            ):
+                self._position += 1
+            if self._position < len(self._buffer):
+                return self._buffer[self._position]
+            if not self._read_more():
+                return ""
+
+    def _expect(self, expected: str) -> str:
+        character = self._next_character()
+        if character not in expected:
+            raise json.JSONDecodeError(
+                f"Expecting one of {expected!r}", self._buffer, self._position
+            )
+        self._position += 1
+        return character
+
+    def _is_cut_short(self, error: json.JSONDecodeError) -> bool:
+        # An error is only caused by the end of the buffer, rather than by
+        # malformed JSON, if it is in a token that reaches that end.
+        return (
+            error.msg.startswith("Unterminated string")
+            or len(self._buffer) - error.pos < _MAX_PARTIAL_TOKEN_LENGTH
+        )
+
+    def _decode_item(self) -> Any:
+        self._next_character()
+        while True:
+            try:
+                item, end = self._decoder.raw_decode(self._buffer, self._position)
+            except json.JSONDecodeError as error:
+                if self._is_cut_short(error) and self._read_more():
+                    continue
+                raise
+            # A number near the end of the buffer may continue in the next
+            # chunk, e.g. with the '5e-3' of '12.5e-3' after '12.'.
+            is_number = isinstance(item, (int, float)) and not isinstance(item, bool)
+            if (
+                not is_number
+                or len(self._buffer) - end >= _MAX_PARTIAL_TOKEN_LENGTH
+                or self._is_exhausted
+                or not self._read_more()
+            ):
+                self._position = end
+                return item
+
+    def __iter__(self) -> Iterator[Any]:
+        if self._next_character() != "[":
+            raise InvalidFileError("The JSON document is not an array.")
+        self._position += 1
+
+        if self._next_character() == "]":
+            self._position += 1
+        else:
+            while True:
+                yield self._decode_item()
+                if self._expect(",]") == "]":
+                    break
+
+        if self._next_character():
+            raise json.JSONDecodeError("Extra data", self._buffer, self._position)
+
+
+def iter_json_array_from_file(
+    input_file: str, chunk_size: int = JSON_READ_CHUNK_SIZE
+) -> Iterator[Any]:
+    """
+    Read the items of a JSON document that is an array, e.g. of records, one
+    at a time as the file is parsed, so memory use does not grow with the
+    size of the file.
+
+    :param input_file: Path to the JSON document.
+    :param chunk_size: Number of characters read from the file at a time.
+    :return: An iterator over the array's items.
+    :raises InvalidFileError: If the document is not an array.
+    :raises json.JSONDecodeError: If the document is not valid JSON. Items
+        before the error are still returned.
+    """
+    with open(input_file, "r", encoding="UTF-8") as file:
+        yield from _JsonArrayReader(file, chunk_size)
+
+
+def _modification_time_ns(path: str) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def get_schema_validator(json_schema_file: str) -> Validator:
+    """
+    Get a validator for a JSON schema file. The schema is read, checked and
+    compiled once, and the validator reused until the file is modified.
+
+    :param json_schema_file: Path to the JSON schema.
+    :return: A validator for the schema's draft.
+    :raises jsonschema.exceptions.SchemaError: If the schema is invalid.
+    """
+    schema_path = os.path.abspath(json_schema_file)
+    modification_time = _modification_time_ns(schema_path)
+    with _schema_validators_lock:
+        cached = _schema_validators.get(schema_path)
+    if cached is not None and cached[0] == modification_time:
+        return cached[1]
+
+    json_schema = get_json_content_from_file(json_schema_file)
+    validator_class = jsonschema.validators.validator_for(json_schema)
+    validator_class.check_schema(json_schema)
+    validator = validator_class(json_schema)
+
+    if modification_time is not None:
+        with _schema_validators_lock:
+            _schema_validators[schema_path] = (modification_time, validator)
+    return validator
+
+
 def validate_json_file_against_schema_file(
     json_data_file: str, json_schema_file: str
 ) -> tuple[bool, str]:
 
     json_content = get_json_content_from_file(json_data_file)
-    json_schema = get_json_content_from_file(json_schema_file)
+    validator = get_schema_validator(json_schema_file)
 
-    try:
-        validate(instance=json_content, schema=json_schema)
-    except jsonschema.exceptions.ValidationError:
+    if not validator.is_valid(json_content):
         err = "JSON document is invalid and does not conform to the schema."
         return False, err
 
@@ -156,5 +812,177 @@ def validate_json_file_against_schema_file(
     return True, message
 
 
+def validate_json_array_file_against_schema_file(
+    json_data_file: str, json_schema_file: str
+) -> tuple[bool, str]:
+    """
+    Validate each item of a JSON array, e.g. each of many records, against a
+    schema as the file is parsed. Parsing stops at the first invalid item.
+
+    :param json_data_file: Path to the JSON document, which must be an array.
+    :param json_schema_file: Path to the JSON schema that each item must
+        conform to.
+    :return: Whether every item is valid, and a message naming the first
+        invalid item if not.
+    :raises InvalidFileError: If the document is not an array.
+    """
+    validator = get_schema_validator(json_schema_file)
+
+    num_items = 0
+    for index, item in enumerate(iter_json_array_from_file(json_data_file)):
+        error = jsonschema.exceptions.best_match(validator.iter_errors(item))
+        if error is not None:
+            err = (
+                f"Item {index} of the JSON document does not conform to the schema: "
+                f"{_describe_validation_error(error)}"
+            )
+            return False, err
+        num_items += 1
+
+    message = f"All {num_items} items of the JSON document are valid."
+    return True, message
+
+
+@dataclass(frozen=True)
+class ValidationResult:
+    """
+    The outcome of validating one JSON document in a batch.
+    """
+
+    json_data_file: str
+    errors: tuple[str, ...]
+
+    @property
+    def is_valid(self) -> bool:
+        return not self.errors
+
+
+def _describe_validation_error(error: jsonschema.exceptions.ValidationError) -> str:
+    return f"{error.json_path}: {error.message}"
+
+
+def _validate_one(json_data_file: str, validator: Validator) -> ValidationResult:
+    try:
+        json_content = get_json_content_from_file(json_data_file)
+    except (OSError, json.JSONDecodeError) as exc:
+        return ValidationResult(json_data_file, (str(exc),))
+
+    return ValidationResult(
+        json_data_file,
+        tuple(
+            _describe_validation_error(error)
+            for error in validator.iter_errors(json_content)
+        ),
+    )
+
+
+# The validator of a validation worker process, compiled once when it starts.
+_worker_validator: Validator | None = None
+
+
+def _registry_of(validator: Validator) -> referencing.Registry[Any]:
+    registry: referencing.Registry[Any] = getattr(
+        validator, "_registry", referencing.Registry()
+    )
+    return registry
+
+
+def _start_validation_worker(
+    validator_class: type[Validator],
+    schema: Any,
+    format_checker: Any,
+    registry_contents: list[tuple[str, Any]],
+    retrieve: Any,
+) -> None:
+    # Neither validators nor registries can be pickled, so each worker compiles
+    # its own validator, with a registry of the same resources. Resources that
+    # do not name their draft are read as the schema's.
+    global _worker_validator  # pylint: disable=global-statement
+    registry = referencing.Registry(  # type: ignore[call-arg]
+        retrieve=retrieve
+    ).with_contents(
+        registry_contents,
+        default_specification=referencing.jsonschema.specification_with(
+            validator_class.META_SCHEMA.get("$schema", ""),
+            default=referencing.Specification.OPAQUE,
+        ),
+    )
+    _worker_validator = validator_class(
+        schema, format_checker=format_checker, registry=registry
+    )
+
+
+def _validate_in_worker(json_data_file: str) -> ValidationResult:
+    assert _worker_validator is not None
+    return _validate_one(json_data_file, _worker_validator)
+
+
+def _file_size(path: str) -> int:
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return 0
+
+
+def validate_json_files(
+    json_data_files: list[str], validator: Validator, max_workers: int | None = None
+) -> list[ValidationResult]:
+    """
+    Validate many JSON documents against one compiled schema in parallel,
+    across a pool of processes, as validation holds the GIL. Documents
+    totalling fewer than PARALLEL_VALIDATION_MIN_BYTES are validated in this
+    process.
+
+    :param json_data_files: Paths to the JSON documents.
+    :param validator: The validator, e.g. as returned by get_schema_validator.
+        Each process compiles a validator of the same class for its schema,
+        with the resources of its registry. A validator with a legacy
+        RefResolver is only used in this process.
+    :param max_workers: The maximum number of processes. Default is the number
+        of CPUs.
+    :return: One result per document, in the order given, listing every
+        validation error. A document that cannot be read or parsed is reported
+        in its result rather than raised.
+    """
+    if (
+        len(json_data_files) < 2
+        or max_workers == 1
+        or getattr(validator, "_ref_resolver", None) is not None
+        or sum(map(_file_size, json_data_files)) < PARALLEL_VALIDATION_MIN_BYTES
+    ):
+        return [
+            _validate_one(json_data_file, validator)
+            for json_data_file in json_data_files
+        ]
+
+    registry = _registry_of(validator)
+    with ProcessPoolExecutor(
+        max_workers=max_workers,
+        initializer=_start_validation_worker,
+        initargs=(
+            type(validator),
+            validator.schema,
+            getattr(validator, "format_checker", None),
+            [(uri, registry[uri].contents) for uri in registry],
+            getattr(registry, "_retrieve"),
+        ),
+    ) as executor:
+        return list(executor.map(_validate_in_worker, json_data_files))
+
+
+def validate_json_files_against_schema_file(
+    json_data_files: list[str], json_schema_file: str, max_workers: int | None = None
+) -> list[ValidationResult]:
+    """
+    Validate many JSON documents against one schema file, as
+    validate_json_files does.
+
+    :raises jsonschema.exceptions.SchemaError: If the schema is invalid.
+    """
+    return validate_json_files(
+        json_data_files, get_schema_validator(json_schema_file), max_workers
+    )
+
+
 if __name__ == "__main__":
     logger.info("main")
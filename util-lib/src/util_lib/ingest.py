@@ -0,0 +1,258 @@
+"""
+ Incremental ingestion of source workbooks into datasets.
+
+ An ingestion specification lists source workbooks by URL and, for each, the
+ worksheets to read, the rows and columns to read from them, the transforms to
+ apply and the dataset file to write. The content hash of every source and a
+ fingerprint of every worksheet specification are recorded in a state file, so
+ a later run only re-parses the worksheets whose source or specification has
+ changed since they were last written. Datasets can be written with the
+ optimised dtypes chosen by util_lib.dtypes.optimise_dtypes.
+"""
+
+import hashlib
+import json
+import os
+import sys
+from typing import Any, Callable, Dict, cast
+
+import jsonschema
+from pandas import DataFrame
+
+from util_lib.dataframe import (
+    add_week_ending_date,
+    convert_column_to_string,
+    convert_datatypes,
+    convert_obj_to_string,
+    extract_and_cast_as_int,
+    fill_zeros,
+    read_worksheet_into_df,
+    rename_columns,
+    set_object_columns_to_string,
+)
+from util_lib.error import InvalidFileError
+from util_lib.file import (
+    ValidationResult,
+    download_new_file,
+    get_json_content_from_file,
+    validate_json_files,
+)
+from util_lib.pipeline import Pipeline
+from util_lib.store import write_dataset
+from util_lib.workbook import WorkbookSession
+import logging
+
+logger = logging.getLogger(__name__)
+
+UPDATED = "updated"
+UNCHANGED = "unchanged"
+
+# Transforms that may be named in a specification. Each is called with the
+# dataframe followed by the transform's parameters as keyword arguments.
+TRANSFORMS: Dict[str, Callable[..., DataFrame]] = {
+    "add_week_ending_date": add_week_ending_date,
+    "convert_column_to_string": convert_column_to_string,
+    "convert_datatypes": convert_datatypes,
+    "convert_obj_to_string": convert_obj_to_string,
+    "extract_and_cast_as_int": extract_and_cast_as_int,
+    "fill_zeros": fill_zeros,
+    "rename_columns": rename_columns,
+    "set_object_columns_to_string": set_object_columns_to_string,
+}
+
+INGESTION_SPEC_SCHEMA: Dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "sources": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "url": {"type": "string", "pattern": "^https?://"},
+                    "dest_filepath": {"type": "string"},
+                    "worksheets": {
+                        "type": "array",
+                        "items": {
+                            "type": "object",
+                            "properties": {
+                                "dataset_filepath": {"type": "string"},
+                                "worksheet_name": {"type": "string"},
+                                "num_rows_from_top_to_ignore": {"type": "integer"},
+                                "num_rows_to_read": {"type": "integer"},
+                                "column_range_to_read": {"type": "string"},
+                                "transforms": {
+                                    "type": "array",
+                                    "items": {
+                                        "type": "object",
+                                        "properties": {
+                                            "name": {"enum": sorted(TRANSFORMS)},
+                                            "params": {"type": "object"},
+                                        },
+                                        "required": ["name"],
+                                    },
+                                },
+                            },
+                            "required": ["dataset_filepath", "worksheet_name"],
+                        },
+                    },
+                },
+                "required": ["url", "dest_filepath", "worksheets"],
+            },
+        }
+    },
+    "required": ["sources"],
+}
+
+_ingestion_spec_validator = jsonschema.Draft202012Validator(INGESTION_SPEC_SCHEMA)
+
+
+def load_ingestion_spec(spec_file: str) -> Dict[str, Any]:
+    """
+    Read an ingestion specification and validate it against INGESTION_SPEC_SCHEMA.
+
+    :param spec_file: Path to the JSON specification.
+    :return: The specification.
+    :raises InvalidFileError: If the specification does not conform to the schema.
+    """
+    ingestion_spec = get_json_content_from_file(spec_file)
+    error = jsonschema.exceptions.best_match(
+        _ingestion_spec_validator.iter_errors(ingestion_spec)
+    )
+    if error is not None:
+        raise InvalidFileError(
+            f"Ingestion specification '{spec_file}' is invalid: {error.message}"
+        )
+    # The schema requires an object, so the content is a dict once validated.
+    return cast(Dict[str, Any], ingestion_spec)
+
+
+def validate_ingestion_spec_files(
+    spec_files: list[str], max_workers: int | None = None
+) -> list[ValidationResult]:
+    """
+    Validate many ingestion specifications against INGESTION_SPEC_SCHEMA,
+    reporting every error in each rather than stopping at the first.
+
+    :param spec_files: Paths to the JSON specifications.
+    :param max_workers: The maximum number of processes validating them.
+    :return: One result per specification, in the order given.
+    """
+    return validate_json_files(spec_files, _ingestion_spec_validator, max_workers)
+
+
+def apply_transforms(
+    input_df: DataFrame, transforms: list[Dict[str, Any]]
+) -> DataFrame:
+    """
+    Apply the named transforms, in order, to a dataframe, as one Pipeline.
+
+    :param input_df: The dataframe to transform.
+    :param transforms: Items of the form {'name': ..., 'params': {...}}.
+    :return: The transformed dataframe.
+    """
+    pipeline = Pipeline(input_df)
+    for transform in transforms:
+        pipeline = pipeline.pipe(
+            TRANSFORMS[transform["name"]], **transform.get("params", {})
+        )
+    return pipeline.collect()
+
+
+def _worksheet_fingerprint(worksheet_spec: Dict[str, Any], optimise: bool) -> str:
+    return hashlib.sha256(
+        json.dumps([worksheet_spec, optimise], sort_keys=True).encode("UTF-8")
+    ).hexdigest()
+
+
+def _read_state(state_file: str) -> Dict[str, Any]:
+    if not os.path.exists(state_file):
+        return {"sources": {}, "datasets": {}}
+    return dict(get_json_content_from_file(state_file))
+
+
+def _write_state(state_file: str, state: Dict[str, Any]) -> None:
+    with open(state_file, "w", encoding="UTF-8") as file:
+        json.dump(state, file, indent=2, sort_keys=True)
+        file.write("\n")
+
+
+def _is_dataset_current(
+    dataset_state: Dict[str, str] | None,
+    source_hash: str,
+    worksheet_fingerprint: str,
+    dataset_filepath: str,
+) -> bool:
+    return (
+        dataset_state is not None
+        and dataset_state["source_hash"] == source_hash
+        and dataset_state["worksheet_fingerprint"] == worksheet_fingerprint
+        and os.path.exists(dataset_filepath)
+    )
+
+
+def ingest(
+    ingestion_spec: Dict[str, Any], state_file: str, optimise: bool = False
+) -> Dict[str, str]:
+    """
+    Bring every dataset named in an ingestion specification up to date.
+
+    :param ingestion_spec: The specification, as returned by load_ingestion_spec.
+    :param state_file: Path to the JSON file recording what was last ingested.
+        It is created if it does not exist.
+    :param optimise: Write the datasets with optimised dtypes. A dataset last
+        written with the other setting is written again.
+    :return: Each dataset file path mapped to 'updated' or 'unchanged'.
+    """
+    state = _read_state(state_file)
+    results: Dict[str, str] = {}
+
+    for source in ingestion_spec["sources"]:
+        source_hash = download_new_file(
+            source["url"], source["dest_filepath"], stream=True, conditional=True
+        )
+        state["sources"][source["url"]] = source_hash
+
+        # Opened on the first worksheet that has to be read, and only once.
+        with WorkbookSession(source["dest_filepath"]) as workbook:
+            for worksheet_spec in source["worksheets"]:
+                dataset_filepath = worksheet_spec["dataset_filepath"]
+                worksheet_fingerprint = _worksheet_fingerprint(worksheet_spec, optimise)
+
+                if _is_dataset_current(
+                    state["datasets"].get(dataset_filepath),
+                    source_hash,
+                    worksheet_fingerprint,
+                    dataset_filepath,
+                ):
+                    results[dataset_filepath] = UNCHANGED
+                    continue
+
+                logger.info(
+                    f"Ingesting '{worksheet_spec['worksheet_name']}' "
+                    f"from {source['dest_filepath']} into {dataset_filepath}"
+                )
+                worksheet_df = read_worksheet_into_df(
+                    {**worksheet_spec, "dest_filepath": source["dest_filepath"]},
+                    workbook,
+                )
+                write_dataset(
+                    apply_transforms(
+                        worksheet_df, worksheet_spec.get("transforms", [])
+                    ),
+                    dataset_filepath,
+                    optimise,
+                )
+
+                state["datasets"][dataset_filepath] = {
+                    "source_hash": source_hash,
+                    "worksheet_fingerprint": worksheet_fingerprint,
+                }
+                results[dataset_filepath] = UPDATED
+
+        _write_state(state_file, state)
+
+    return results
+
+
+if __name__ == "__main__":
+    ingest(load_ingestion_spec(sys.argv[1]), sys.argv[2], optimise=True)
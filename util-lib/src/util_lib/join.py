@@ -0,0 +1,204 @@
+"""
+ Joins of dataframes to dimension dataframes, such as weekly series, through
+ key indexes built once and reused.
+
+ pd.merge hashes the key column of both dataframes every time it is called,
+ so joining many dataframes to the same weekly series re-hashes its weeks for
+ every join. A JoinIndex holds a dimension dataframe with an index of its key
+ column, whose hash table is built on the first lookup and kept:
+
+     weeks = JoinIndex(population_df, "Registration Week", ["Population"])
+     deaths_df = weeks.join(deaths_df)
+
+ Where the keys of both dataframes are sorted, as weekly series usually are,
+ rows are matched by binary search instead of hashing, and where they are the
+ same keys in the same order the columns are aligned without matching at all.
+
+ join_all joins several dimension dataframes in one call, filtering the rows
+ of the dataframe joined to and copying its columns only once.
+"""
+
+from typing import Hashable, Iterable
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class JoinIndex:
+    """
+    A dimension dataframe indexed by its key column, to be inner joined to
+    other dataframes on that column.
+
+    Joins give the same result as pd.merge(input_df, dimension_df, on=join_key,
+    how="inner"). Dimension dataframes whose keys are not unique, or whose key
+    dtype differs from that of the dataframe joined to, are joined with
+    pd.merge.
+    """
+
+    def __init__(
+        self,
+        dimension_df: DataFrame,
+        join_key: Hashable,
+        columns_to_include: Iterable[Hashable] | None = None,
+    ) -> None:
+        """
+        :param dimension_df: The dataframe to join to others.
+        :param join_key: The key column.
+        :param columns_to_include: The columns to join, with or without the
+            key column. Defaults to every column.
+        :raises KeyError: If the key column or a column to include is missing.
+        """
+        self.join_key = join_key
+        self.columns = [
+            column
+            for column in (
+                dimension_df.columns
+                if columns_to_include is None
+                else columns_to_include
+            )
+            if column != join_key
+        ]
+        self._dimension_df = dimension_df[[join_key] + self.columns]
+        self._joined_df = self._dimension_df[self.columns].reset_index(drop=True)
+        self._key_index = pd.Index(self._dimension_df[join_key])
+
+    def __repr__(self) -> str:
+        return f"JoinIndex({self.join_key!r}, {self.columns!r})"
+
+    def is_sorted(self) -> bool:
+        """
+        :return: Whether the keys are unique numbers or dates in ascending
+            order, so rows can be matched to them by binary search.
+        """
+        return (
+            isinstance(self._key_index.dtype, np.dtype)
+            and self._key_index.dtype.kind in "iufmM"
+            and self._key_index.is_unique
+            and self._key_index.is_monotonic_increasing
+        )
+
+    def can_index(self, input_df: DataFrame) -> bool:
+        """
+        :param input_df: A dataframe to join to.
+        :return: Whether its rows can be matched through the index: the keys of
+            the dimension dataframe are unique and input_df has a key column of
+            the same dtype.
+        """
+        return (
+            self._key_index.is_unique
+            and self.join_key in input_df.columns
+            and input_df[self.join_key].dtype == self._key_index.dtype
+        )
+
+    def positions(self, keys: pd.Series) -> np.ndarray:
+        """
+        Match keys to the rows of the dimension dataframe.
+
+        :param keys: The keys to match.
+        :return: The position of the row with each key, or -1 where there is
+            none.
+        :raises ValueError: If the keys of the dimension dataframe are not
+            unique.
+        """
+        if not self._key_index.is_unique:
+            raise ValueError(
+                f"The values of join key '{self.join_key}' are not unique."
+            )
+
+        if self.is_sorted() and keys.is_monotonic_increasing:
+            dimension_keys = self._key_index.to_numpy()
+            key_values = keys.to_numpy()
+            if np.array_equal(key_values, dimension_keys):
+                return np.arange(len(key_values))
+
+            positions = np.searchsorted(dimension_keys, key_values)
+            matched = positions < len(dimension_keys)
+            matched[matched] = dimension_keys[positions[matched]] == key_values[matched]
+            return np.where(matched, positions, -1)
+
+        indexer: np.ndarray = self._key_index.get_indexer(keys)
+        return indexer
+
+    def merge(self, input_df: DataFrame) -> DataFrame:
+        """
+        Inner join the dimension dataframe to a dataframe with pd.merge.
+
+        :param input_df: The dataframe to join to. It is not modified.
+        :return: The result of pd.merge.
+        """
+        return pd.merge(input_df, self._dimension_df, on=self.join_key, how="inner")
+
+    def joined_rows(self, positions: np.ndarray) -> DataFrame:
+        """
+        :param positions: Positions of rows of the dimension dataframe, such as
+            those returned by JoinIndex.positions.
+        :return: The joined columns of those rows, with a default index.
+        """
+        return self._joined_df.take(positions).reset_index(drop=True)
+
+    def join(self, input_df: DataFrame) -> DataFrame:
+        """
+        Inner join the dimension dataframe to a dataframe.
+
+        :param input_df: The dataframe to join to. It is not modified.
+        :return: The rows of input_df whose key is in the dimension dataframe,
+            in their original order, followed by the joined columns.
+        """
+        return join_all(input_df, [self])
+
+
+def join_all(input_df: DataFrame, join_indexes: Iterable[JoinIndex]) -> DataFrame:
+    """
+    Inner join several dimension dataframes to a dataframe in one call.
+
+    The result is the same as joining each in turn with JoinIndex.join, but
+    where every key is a column of input_df, every dimension dataframe can be
+    indexed and no joined column name is repeated, the rows are matched to
+    every dimension dataframe first and the result is built once.
+
+    :param input_df: The dataframe to join to. It is not modified.
+    :param join_indexes: The dimension dataframes to join, in order.
+    :return: The rows of input_df whose keys are in every dimension dataframe,
+        in their original order, followed by the joined columns.
+    """
+    join_indexes = list(join_indexes)
+    joined_columns = [column for index in join_indexes for column in index.columns]
+
+    if (
+        not all(index.can_index(input_df) for index in join_indexes)
+        or len(set(joined_columns)) < len(joined_columns)
+        or input_df.columns.isin(joined_columns).any()
+    ):
+        # pd.merge renames columns of the same name, and a key may be a column
+        # joined by an earlier index, so each is joined in turn.
+        output_df = input_df
+        for index in join_indexes:
+            output_df = index.merge(output_df)
+        return output_df
+
+    matched = np.ones(len(input_df), dtype=bool)
+    all_positions = []
+    for index in join_indexes:
+        positions = index.positions(input_df[index.join_key])
+        matched &= positions >= 0
+        all_positions.append(positions)
+
+    if matched.all():
+        output_df = input_df.reset_index(drop=True)
+    else:
+        output_df = input_df[matched].reset_index(drop=True)
+        all_positions = [positions[matched] for positions in all_positions]
+
+    return pd.concat(
+        [output_df]
+        + [
+            index.joined_rows(positions)
+            for index, positions in zip(join_indexes, all_positions)
+        ],
+        axis=1,
+    )
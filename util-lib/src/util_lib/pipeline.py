@@ -0,0 +1,408 @@
+"""
+ A lazy pipeline of the transforms in util_lib.dataframe.
+
+ Each transform called eagerly makes a new dataframe, including columns that no
+ later step uses. A Pipeline instead records the transforms and runs them all at
+ once when collect is called:
+
+     Pipeline(weekly_df)
+         .rename_columns(column_mapping={"Week Ends (Friday)": "Week_End"})
+         .add_week_ending_date(
+             default_date="2020-03-20", existing_week_end_date_col_name="Week_End"
+         )
+         .extract_and_cast_as_int(column="Deaths")
+         .select(["Week Ending Date", "Deaths"])
+         .collect()
+
+ Before running, the plan is optimised:
+
+ - Columns that are not used by any later step, or selected at the end, are
+   dropped from the input before the first step, and steps that only write such
+   columns are not run.
+ - Consecutive conversions of columns to strings are made in one astype call.
+   Only string conversions are fused; other casts, such as
+   extract_and_cast_as_int and convert_datatypes, run as separate steps.
+
+ Every step then modifies one working copy of the input, which shares unchanged
+ columns with the input while pandas Copy-on-Write is enabled.
+"""
+
+from dataclasses import dataclass, field
+from enum import Enum
+from typing import Any, Callable, Dict, Hashable, Iterable
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from util_lib.dataframe import (
+    WEEK_ENDING_DATE_COLUMN,
+    add_week_ending_date,
+    convert_column_to_string,
+    convert_datatypes,
+    convert_obj_to_string,
+    extract_and_cast_as_int,
+    extract_only_this_year,
+    fill_zeros,
+    inner_join_with,
+    rename_columns,
+    set_object_columns_to_string,
+)
+from util_lib.join import JoinIndex, join_all
+import logging
+
+logger = logging.getLogger(__name__)
+
+# The columns a step needs, where None means every column.
+_ColumnSet = frozenset[Hashable] | None
+
+
+class _StepKind(Enum):
+    """
+    How a step uses the columns of the dataframe it is given.
+    """
+
+    # Reads and writes the named columns only.
+    COLUMNS = "columns"
+    # Transforms every column on its own, e.g. converting its type.
+    COLUMNWISE = "columnwise"
+    RENAME = "rename"
+    SELECT = "select"
+    # May use any column, so no column can be dropped before it.
+    OPAQUE = "opaque"
+
+
+@dataclass(frozen=True)
+class _Step:
+    """
+    One recorded transform.
+    """
+
+    description: str
+    run: Callable[[DataFrame], DataFrame]
+    kind: _StepKind = _StepKind.OPAQUE
+    reads: frozenset[Hashable] = frozenset()
+    writes: frozenset[Hashable] = frozenset()
+    # Whether the step may be left out when none of the columns it writes
+    # are needed. Steps that filter rows, such as joins, may not.
+    skippable: bool = False
+    column_mapping: Dict[Hashable, Hashable] = field(default_factory=dict)
+    selected_columns: tuple[Hashable, ...] = ()
+    # For steps that convert columns to strings, the columns converted given
+    # the dtype of every column, so that consecutive conversions can be fused.
+    string_columns: Callable[[Dict[Hashable, Any]], list[Hashable]] | None = None
+
+
+def _describe(name: str, params: Dict[str, Any]) -> str:
+    arguments = ", ".join(
+        (
+            f"{key}=DataFrame{value.shape}"
+            if isinstance(value, DataFrame)
+            else f"{key}={value!r}"
+        )
+        for key, value in params.items()
+    )
+    return f"{name}({arguments})"
+
+
+def _in_place(
+    function: Callable[..., Any], params: Dict[str, Any]
+) -> Callable[[DataFrame], DataFrame]:
+    # Transforms decorated with mutate_safely copy their input. The pipeline's
+    # working dataframe is already its own, so it is modified directly.
+    undecorated_function = getattr(function, "__wrapped__", function)
+
+    def run(working_df: DataFrame) -> DataFrame:
+        undecorated_function(working_df, **params)
+        return working_df
+
+    return run
+
+
+def _object_columns(dtypes: Dict[Hashable, Any]) -> list[Hashable]:
+    return [column for column, dtype in dtypes.items() if dtype == np.dtype("object")]
+
+
+def _step_for(function: Callable[..., DataFrame], params: Dict[str, Any]) -> _Step:
+    description = _describe(getattr(function, "__name__", repr(function)), params)
+
+    if function in (fill_zeros, extract_and_cast_as_int):
+        columns = params["column"]
+        column = frozenset([columns] if isinstance(columns, str) else columns)
+        return _Step(
+            description,
+            _in_place(function, params),
+            _StepKind.COLUMNS,
+            reads=column,
+            writes=column,
+            skippable=True,
+        )
+
+    if function is convert_column_to_string:
+        column = frozenset([params["col_name"]])
+        return _Step(
+            description,
+            _in_place(function, params),
+            _StepKind.COLUMNS,
+            reads=column,
+            writes=column,
+            skippable=True,
+            string_columns=lambda dtypes: [params["col_name"]],
+        )
+
+    if function is add_week_ending_date:
+        return _Step(
+            description,
+            _in_place(function, params),
+            _StepKind.COLUMNS,
+            reads=frozenset([params["existing_week_end_date_col_name"]]),
+            writes=frozenset([WEEK_ENDING_DATE_COLUMN]),
+            skippable=True,
+        )
+
+    if function in (convert_obj_to_string, set_object_columns_to_string):
+        return _Step(
+            description,
+            lambda working_df: function(working_df, **params),
+            _StepKind.COLUMNWISE,
+            # Only conversions to Python strings are fused into one astype.
+            string_columns=(
+                _object_columns if params.get("dtype_mode", "str") == "str" else None
+            ),
+        )
+
+    if function in (convert_datatypes, extract_only_this_year):
+        return _Step(
+            description,
+            lambda working_df: function(working_df, **params),
+            _StepKind.COLUMNWISE,
+        )
+
+    if function is rename_columns:
+        return _Step(
+            description,
+            lambda working_df: function(working_df, **params),
+            _StepKind.RENAME,
+            column_mapping=dict(params["column_mapping"]),
+        )
+
+    if function is inner_join_with:
+        joined_columns = frozenset(params["columns_to_include"]) - {params["join_key"]}
+        # Columns of the same name on the left are needed too, as they change
+        # the names the joined columns are given.
+        return _Step(
+            description,
+            lambda working_df: function(working_df, **params),
+            _StepKind.COLUMNS,
+            reads=frozenset([params["join_key"]]) | joined_columns,
+            writes=joined_columns,
+        )
+
+    if function is join_all:
+        joined_columns = frozenset(
+            column for index in params["join_indexes"] for column in index.columns
+        )
+        return _Step(
+            description,
+            lambda working_df: function(working_df, **params),
+            _StepKind.COLUMNS,
+            reads=frozenset(index.join_key for index in params["join_indexes"])
+            | joined_columns,
+            writes=joined_columns,
+        )
+
+    return _Step(description, lambda working_df: function(working_df, **params))
+
+
+def _columns_needed_before(step: _Step, needed_after: _ColumnSet) -> _ColumnSet:
+    if step.kind is _StepKind.SELECT:
+        return frozenset(step.selected_columns)
+    if step.kind is _StepKind.OPAQUE or needed_after is None:
+        return None
+    if step.kind is _StepKind.RENAME:
+        return frozenset(
+            column
+            for column in needed_after | step.column_mapping.keys()
+            if step.column_mapping.get(column, column) in needed_after
+        )
+    if step.kind is _StepKind.COLUMNS:
+        return (needed_after - step.writes) | step.reads
+    return needed_after
+
+
+def _fuse_string_conversions(steps: list[_Step]) -> _Step:
+    def run(working_df: DataFrame) -> DataFrame:
+        dtypes = working_df.dtypes.to_dict()
+        string_columns: Dict[Hashable, type] = {}
+        for step in steps:
+            assert step.string_columns is not None
+            for column in step.string_columns(dtypes):
+                string_columns[column] = str
+                dtypes[column] = np.dtype("object")
+        return working_df.astype(string_columns)
+
+    return _Step(
+        " + ".join(step.description for step in steps),
+        run,
+        _StepKind.COLUMNWISE,
+    )
+
+
+class Pipeline:
+    """
+    Transforms recorded to be applied to a dataframe when collect is called.
+
+    Pipelines are immutable: each method returns a new pipeline with one more
+    step, so a pipeline can be extended in several ways.
+    """
+
+    def __init__(self, input_df: DataFrame, steps: tuple[_Step, ...] = ()) -> None:
+        self._input_df = input_df
+        self._steps = steps
+
+    def pipe(self, function: Callable[..., DataFrame], **params: Any) -> "Pipeline":
+        """
+        Record a transform called as function(dataframe, **params).
+
+        The transforms in util_lib.dataframe are recorded with the columns they
+        use. Any other function is assumed to use every column.
+        """
+        return Pipeline(self._input_df, self._steps + (_step_for(function, params),))
+
+    def rename_columns(self, column_mapping: Dict[str, str]) -> "Pipeline":
+        return self.pipe(rename_columns, column_mapping=column_mapping)
+
+    def fill_zeros(self, column: str | list[str]) -> "Pipeline":
+        return self.pipe(fill_zeros, column=column)
+
+    def convert_obj_to_string(self, dtype_mode: str = "str") -> "Pipeline":
+        return self.pipe(convert_obj_to_string, dtype_mode=dtype_mode)
+
+    def set_object_columns_to_string(self, dtype_mode: str = "str") -> "Pipeline":
+        return self.pipe(set_object_columns_to_string, dtype_mode=dtype_mode)
+
+    def convert_column_to_string(self, col_name: str) -> "Pipeline":
+        return self.pipe(convert_column_to_string, col_name=col_name)
+
+    def convert_datatypes(self) -> "Pipeline":
+        return self.pipe(convert_datatypes)
+
+    def add_week_ending_date(
+        self,
+        default_date: str,
+        existing_week_end_date_col_name: str,
+        as_datetime: bool = False,
+    ) -> "Pipeline":
+        return self.pipe(
+            add_week_ending_date,
+            default_date=default_date,
+            existing_week_end_date_col_name=existing_week_end_date_col_name,
+            as_datetime=as_datetime,
+        )
+
+    def extract_and_cast_as_int(
+        self, column: str | list[str], nullable: bool = False
+    ) -> "Pipeline":
+        return self.pipe(extract_and_cast_as_int, column=column, nullable=nullable)
+
+    def extract_only_this_year(self, rows_to_read: int) -> "Pipeline":
+        return self.pipe(extract_only_this_year, rows_to_read=rows_to_read)
+
+    def inner_join_with(
+        self, df_to_join: DataFrame, columns_to_include: list[str], join_key: str
+    ) -> "Pipeline":
+        return self.pipe(
+            inner_join_with,
+            df_to_join=df_to_join,
+            columns_to_include=columns_to_include,
+            join_key=join_key,
+        )
+
+    def join_all(self, join_indexes: Iterable[JoinIndex]) -> "Pipeline":
+        return self.pipe(join_all, join_indexes=list(join_indexes))
+
+    def select(self, columns: Iterable[Hashable]) -> "Pipeline":
+        """
+        Keep only the given columns, in the given order. Columns not selected,
+        and the steps that only write them, are left out of the plan.
+        """
+        selected_columns = tuple(columns)
+        return Pipeline(
+            self._input_df,
+            self._steps
+            + (
+                _Step(
+                    f"select({list(selected_columns)!r})",
+                    lambda working_df: working_df[list(selected_columns)],
+                    _StepKind.SELECT,
+                    selected_columns=selected_columns,
+                ),
+            ),
+        )
+
+    def _plan(self) -> tuple[list[Hashable] | None, list[_Step]]:
+        needed: _ColumnSet = None
+        planned_steps: list[_Step] = []
+        for step in reversed(self._steps):
+            if step.skippable and needed is not None and not step.writes & needed:
+                continue
+            planned_steps.append(step)
+            needed = _columns_needed_before(step, needed)
+        planned_steps.reverse()
+
+        fused_steps: list[_Step] = []
+        string_conversions: list[_Step] = []
+
+        def fuse_string_conversions() -> None:
+            if len(string_conversions) > 1:
+                fused_steps.append(_fuse_string_conversions(string_conversions[:]))
+            else:
+                fused_steps.extend(string_conversions)
+            string_conversions.clear()
+
+        for step in planned_steps:
+            if step.string_columns is not None:
+                string_conversions.append(step)
+                continue
+            fuse_string_conversions()
+            fused_steps.append(step)
+        fuse_string_conversions()
+
+        columns: list[Hashable] = list(self._input_df.columns)
+        projection: list[Hashable] | None = (
+            None
+            if needed is None
+            else [column for column in columns if column in needed]
+        )
+        if projection == columns:
+            projection = None
+        return projection, fused_steps
+
+    def explain(self) -> list[str]:
+        """
+        :return: A description of each step that collect would run, after
+            optimisation, starting with any columns dropped from the input.
+        """
+        projection, steps = self._plan()
+        return ([f"project({projection!r})"] if projection is not None else []) + [
+            step.description for step in steps
+        ]
+
+    def collect(self) -> DataFrame:
+        """
+        Run the pipeline.
+
+        :return: The transformed dataframe. The input dataframe is not modified.
+        """
+        projection, steps = self._plan()
+        if projection is not None:
+            working_df = self._input_df[projection]
+        else:
+            working_df = self._input_df.copy(
+                deep=pd.options.mode.copy_on_write is not True
+            )
+
+        for step in steps:
+            logger.debug(f"Running {step.description}")
+            working_df = step.run(working_df)
+        return working_df
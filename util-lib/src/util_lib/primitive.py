@@ -3,12 +3,23 @@
 """
 
 from datetime import datetime
-from typing import Dict, Any
+from typing import Any, Callable, Dict, TypeVar
+
+import numpy as np
+import pandas as pd
 
 import logging
 
 logger = logging.getLogger(__name__)
 
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+# Strings that pd.to_datetime parses as the current time whatever the format.
+_CURRENT_TIME_STRINGS = frozenset({"now", "today"})
+
+# A batch of values: a pandas Series, a list or a NumPy array.
+Values = TypeVar("Values", pd.Series, list[Any], np.ndarray)
+
 
 # TODO DMcC - Can this function be combined with the function below?
 def source_target_list_to_dict(list_dicts: list[Dict[str, Any]]) -> Dict[Any, Any]:
@@ -61,4 +72,95 @@ def create_me_a_dict_of_using(
 
 
 def remove_timestamp(date_string: str) -> str:
-    return str(datetime.strptime(date_string, "%Y-%m-%d %H:%M:%S").date())
+    return str(datetime.strptime(date_string, TIMESTAMP_FORMAT).date())
+
+
+def convert_each_distinct_value(
+    values: Values, convert_distinct: Callable[[np.ndarray], np.ndarray]
+) -> Values:
+    """
+    Convert a batch of values, converting each distinct value only once.
+    Columns read from weekly data repeat the same few values many times over.
+
+    :param values: A Series, list or NumPy array of values.
+    :param convert_distinct: Converts an object array of distinct values,
+        returning an array of the same length.
+    :return: The converted values, as a Series with the same index and name,
+        a list or a NumPy array, like the values given.
+    """
+    value_array = np.asarray(values, dtype=object)
+    codes, _ = pd.factorize(value_array, use_na_sentinel=False)
+
+    # factorize turns missing values such as None into NaN, so each distinct
+    # value is taken from where it first occurs instead.
+    _, first_positions = np.unique(codes, return_index=True)
+    converted = np.asarray(
+        convert_distinct(value_array[first_positions]), dtype=object
+    )[codes]
+
+    if isinstance(values, pd.Series):
+        return pd.Series(converted, index=values.index, name=values.name, dtype=object)
+    if isinstance(values, np.ndarray):
+        return converted
+    return list(converted)
+
+
+def parse_distinct_dates(
+    date_strings: np.ndarray, date_format: str
+) -> pd.DatetimeIndex:
+    """
+    Parse an object array of date strings with pd.to_datetime.
+
+    :return: The dates, with NaT for every value that is not a string or that
+        pandas cannot parse with the format, including dates outside the range
+        of its timestamps, the strings 'now' and 'today', which pandas would
+        parse as the current time, and times with 60 or 61 seconds, which
+        pandas rolls over into the next minute. Convert those one at a time to
+        get the error or result that datetime.strptime gives for them.
+    """
+    is_string = np.fromiter(
+        (
+            isinstance(value, str) and value not in _CURRENT_TIME_STRINGS
+            for value in date_strings
+        ),
+        dtype=bool,
+        count=len(date_strings),
+    )
+    parsed_dates = pd.DatetimeIndex(
+        pd.to_datetime(
+            pd.Series(date_strings, dtype=object).where(is_string),
+            format=date_format,
+            errors="coerce",
+        )
+    )
+    if "%S" in date_format:
+        # pandas rolls seconds 60 and 61 over into the next minute, where
+        # strptime rejects them; such dates do not format back to the string.
+        is_rolled_over = parsed_dates.notna() & (
+            parsed_dates.strftime(date_format).to_numpy(dtype=object) != date_strings
+        )
+        parsed_dates = pd.DatetimeIndex(parsed_dates.where(~is_rolled_over))
+    return parsed_dates
+
+
+def remove_timestamps(date_strings: Values) -> Values:
+    """
+    Remove the time from many timestamps at once, as remove_timestamp does
+    for one.
+
+    :param date_strings: A Series, list or NumPy array of strings of the form
+        'YYYY-MM-DD HH:MM:SS'.
+    :return: The dates as 'YYYY-MM-DD' strings, in a Series, list or NumPy
+        array like the one given.
+    :raises ValueError: If a string is not of that form.
+    :raises TypeError: If a value is not a string.
+    """
+
+    def remove_distinct_timestamps(distinct_strings: np.ndarray) -> np.ndarray:
+        parsed_dates = parse_distinct_dates(distinct_strings, TIMESTAMP_FORMAT)
+        dates = np.datetime_as_string(parsed_dates.to_numpy(), unit="D").astype(object)
+        for position in np.flatnonzero(parsed_dates.isna()):
+            dates[position] = remove_timestamp(distinct_strings[position])
+        return dates
+
+    return convert_each_distinct_value(date_strings, remove_distinct_timestamps)
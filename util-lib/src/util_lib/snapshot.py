@@ -0,0 +1,329 @@
+"""
+ Delta-encoded storage of successive snapshots of a dataset.
+
+ The first snapshot is stored in full as the base. Each later snapshot is
+ stored as the rows and columns that changed since the one before it, and is
+ rebuilt on demand by applying the deltas to the base. Rebuilt snapshots are
+ kept in a least recently used cache.
+"""
+
+import json
+import os
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict
+
+import pandas as pd
+from pandas import DataFrame
+
+from util_lib.catalog import DatasetCatalog
+from util_lib.store import DATASET_FILE_EXTENSION, read_dataset, write_dataset
+import logging
+
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_INDEX_FILE_NAME = "snapshots.json"
+BASE_FILE_NAME = f"base{DATASET_FILE_EXTENSION}"
+DELTA_DIRECTORY_NAME = "deltas"
+
+
+@dataclass(frozen=True)
+class SnapshotDelta:
+    """
+    The changes between a snapshot and the snapshot before it.
+
+    upserted_rows holds the complete rows, over the columns the two snapshots
+    share, that are new or whose values changed. added_columns holds the complete
+    data of columns that are new or whose dtype changed. index_order holds the
+    index of the snapshot in row order, so that inserted and reordered rows are
+    rebuilt in place. It is None where the rows are already rebuilt in order:
+    the previous rows that were kept, followed by the new rows.
+    """
+
+    period: str
+    upserted_rows: DataFrame
+    deleted_rows: list[Any]
+    added_columns: DataFrame
+    dropped_columns: list[str]
+    columns: list[str]
+    index_order: list[Any] | None = None
+
+
+def _equal_values(previous: pd.Series, current: pd.Series) -> Any:
+    both_missing = previous.isna().to_numpy() & current.isna().to_numpy()
+    return previous.eq(current).to_numpy(dtype=bool, na_value=False) | both_missing
+
+
+def compute_delta(
+    period: str, previous_df: DataFrame, current_df: DataFrame
+) -> SnapshotDelta:
+    """
+    Compute the row and column changes that turn one snapshot into the next.
+
+    Rows are matched on the index, which must be unique in both snapshots.
+
+    :param period: The period of the current snapshot.
+    :param previous_df: The previous snapshot.
+    :param current_df: The current snapshot.
+    :return: The delta from the previous to the current snapshot.
+    """
+    for snapshot_df in (previous_df, current_df):
+        if not snapshot_df.index.is_unique:
+            raise ValueError("Snapshots must have a unique index.")
+
+    common_columns = [
+        column
+        for column in current_df.columns
+        if column in previous_df.columns
+        and previous_df[column].dtype == current_df[column].dtype
+    ]
+    added_columns = [
+        column for column in current_df.columns if column not in common_columns
+    ]
+    dropped_columns = [
+        column for column in previous_df.columns if column not in common_columns
+    ]
+
+    shared_rows = current_df.index.intersection(previous_df.index, sort=False)
+    unchanged = pd.Series(True, index=shared_rows)
+    for column in common_columns:
+        unchanged &= _equal_values(
+            previous_df.loc[shared_rows, column], current_df.loc[shared_rows, column]
+        )
+
+    upserted_row_mask = ~current_df.index.isin(unchanged[unchanged].index)
+
+    deleted_rows = previous_df.index.difference(current_df.index, sort=False)
+    rebuilt_order = previous_df.index.drop(deleted_rows).append(
+        current_df.index.difference(previous_df.index, sort=False)
+    )
+
+    return SnapshotDelta(
+        period=period,
+        upserted_rows=current_df.loc[upserted_row_mask, common_columns],
+        deleted_rows=deleted_rows.tolist(),
+        added_columns=current_df[added_columns],
+        dropped_columns=dropped_columns,
+        columns=list(current_df.columns),
+        index_order=(
+            None
+            if rebuilt_order.equals(current_df.index)
+            else current_df.index.tolist()
+        ),
+    )
+
+
+def apply_delta(previous_df: DataFrame, delta: SnapshotDelta) -> DataFrame:
+    """
+    Rebuild a snapshot from the snapshot before it and the delta between them.
+
+    :param previous_df: The previous snapshot.
+    :param delta: The delta computed by compute_delta.
+    :return: A new dataframe equal to the snapshot the delta was computed from.
+    """
+    rebuilt_df = previous_df.drop(
+        index=delta.deleted_rows, columns=delta.dropped_columns
+    )
+
+    upserted_rows = delta.upserted_rows
+    updated_rows = upserted_rows.index.intersection(rebuilt_df.index, sort=False)
+    appended_rows = upserted_rows.index.difference(rebuilt_df.index, sort=False)
+
+    if len(updated_rows) > 0:
+        rebuilt_df.loc[updated_rows, upserted_rows.columns] = upserted_rows.loc[
+            updated_rows
+        ]
+    if len(appended_rows) > 0:
+        rebuilt_df = pd.concat([rebuilt_df, upserted_rows.loc[appended_rows]])
+
+    for column in delta.added_columns.columns:
+        rebuilt_df[column] = delta.added_columns[column]
+
+    # New rows were appended above, so restore the order of the snapshot.
+    if delta.index_order is not None and not rebuilt_df.index.equals(
+        pd.Index(delta.index_order)
+    ):
+        rebuilt_df = rebuilt_df.reindex(delta.index_order)
+
+    return rebuilt_df[delta.columns]
+
+
+class SnapshotStore:
+    """
+    A directory holding a base snapshot and the deltas of every later snapshot.
+
+    Layout:
+        snapshots.json                  The base period and per-period metadata.
+        base.arrow                      The first snapshot in full.
+        deltas/<period>.rows.arrow      Upserted rows for each later period.
+        deltas/<period>.columns.arrow   Added columns, for periods that have any.
+        deltas/<period>.deleted.arrow   Deleted row labels, for periods that have any.
+        deltas/<period>.order.arrow     Row order, for periods whose rows move.
+
+    Row labels are kept in the Arrow files, in the dtype of the index, and the
+    JSON index is replaced in one step once every file of a period is written.
+    """
+
+    def __init__(self, directory: str, cache_size: int = 8) -> None:
+        self._directory = directory
+        self._cache_size = cache_size
+        self._cache: OrderedDict[str, DataFrame] = OrderedDict()
+
+        index_path = os.path.join(directory, SNAPSHOT_INDEX_FILE_NAME)
+        if os.path.exists(index_path):
+            with open(index_path, "r", encoding="UTF-8") as file:
+                self._index: Dict[str, Any] = json.load(file)
+        else:
+            self._index = {"periods": [], "deltas": {}}
+
+    def periods(self) -> list[str]:
+        return list(self._index["periods"])
+
+    def cached_periods(self) -> list[str]:
+        """
+        List the periods whose rebuilt snapshots are cached, least recently used first.
+        """
+        return list(self._cache)
+
+    def append(self, period: str, snapshot_df: DataFrame) -> SnapshotDelta | None:
+        """
+        Add the snapshot for a period later than any already stored.
+
+        :param period: The snapshot's period, e.g. '2023-W09'.
+        :param snapshot_df: The full snapshot.
+        :return: The delta from the previous snapshot, or None for the base.
+        """
+        periods = self._index["periods"]
+        if periods and period <= periods[-1]:
+            raise ValueError(
+                f"Period '{period}' must be later than the latest stored period '{periods[-1]}'."
+            )
+
+        deltas = dict(self._index["deltas"])
+        if not periods:
+            write_dataset(snapshot_df, os.path.join(self._directory, BASE_FILE_NAME))
+            delta = None
+        else:
+            delta = compute_delta(period, self.load(periods[-1]), snapshot_df)
+            deltas[period] = self._write_delta(delta)
+
+        index = {"periods": periods + [period], "deltas": deltas}
+        self._write_index(index)
+        self._index = index
+        self._remember(period, snapshot_df.copy())
+        return delta
+
+    def load(self, period: str) -> DataFrame:
+        """
+        Rebuild the snapshot for a period, starting from the most recent cached
+        snapshot at or before it, or from the base if none is cached.
+        """
+        periods = self._index["periods"]
+        if period not in periods:
+            raise KeyError(f"No snapshot is stored for period '{period}'.")
+
+        target_position = periods.index(period)
+        start_position = next(
+            (
+                position
+                for position in range(target_position, -1, -1)
+                if periods[position] in self._cache
+            ),
+            None,
+        )
+
+        if start_position is None:
+            rebuilt_df = read_dataset(
+                os.path.join(self._directory, BASE_FILE_NAME), memory_map=False
+            )
+            start_position = 0
+        else:
+            rebuilt_df = self._cache[periods[start_position]]
+            self._cache.move_to_end(periods[start_position])
+
+        for position in range(start_position + 1, target_position + 1):
+            rebuilt_df = apply_delta(rebuilt_df, self.changes(periods[position]))
+
+        self._remember(period, rebuilt_df)
+        return rebuilt_df.copy()
+
+    def changes(self, period: str) -> SnapshotDelta:
+        """
+        Read what changed in a period's snapshot relative to the one before it.
+        """
+        if period not in self._index["deltas"]:
+            raise KeyError(f"No delta is stored for period '{period}'.")
+
+        delta_metadata = self._index["deltas"][period]
+        return SnapshotDelta(
+            period=period,
+            upserted_rows=read_dataset(self._delta_path(period, "rows")),
+            deleted_rows=self._read_labels(period, "deleted") or [],
+            added_columns=self._read_part(period, "columns", DataFrame()),
+            dropped_columns=delta_metadata["dropped_columns"],
+            columns=delta_metadata["columns"],
+            index_order=self._read_labels(period, "order"),
+        )
+
+    def _remember(self, period: str, snapshot_df: DataFrame) -> None:
+        self._cache[period] = snapshot_df
+        self._cache.move_to_end(period)
+        while len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+
+    def _delta_path(self, period: str, part: str) -> str:
+        return os.path.join(
+            self._directory,
+            DELTA_DIRECTORY_NAME,
+            f"{period}.{part}{DATASET_FILE_EXTENSION}",
+        )
+
+    def _read_part(self, period: str, part: str, default: Any) -> Any:
+        part_path = self._delta_path(period, part)
+        return read_dataset(part_path) if os.path.exists(part_path) else default
+
+    def _read_labels(self, period: str, part: str) -> list[Any] | None:
+        labels_df = self._read_part(period, part, None)
+        return None if labels_df is None else labels_df.index.tolist()
+
+    def _write_labels(self, period: str, part: str, labels: list[Any]) -> None:
+        # Labels are stored as the index of a dataframe without columns, so
+        # they keep their dtype, e.g. for dates.
+        write_dataset(DataFrame(index=pd.Index(labels)), self._delta_path(period, part))
+
+    def _write_delta(self, delta: SnapshotDelta) -> Dict[str, Any]:
+        write_dataset(delta.upserted_rows, self._delta_path(delta.period, "rows"))
+        if len(delta.added_columns.columns) > 0:
+            write_dataset(
+                delta.added_columns, self._delta_path(delta.period, "columns")
+            )
+        if delta.deleted_rows:
+            self._write_labels(delta.period, "deleted", delta.deleted_rows)
+        if delta.index_order is not None:
+            self._write_labels(delta.period, "order", delta.index_order)
+        return {
+            "dropped_columns": delta.dropped_columns,
+            "columns": delta.columns,
+        }
+
+    def _write_index(self, index: Dict[str, Any]) -> None:
+        os.makedirs(self._directory, exist_ok=True)
+        index_path = os.path.join(self._directory, SNAPSHOT_INDEX_FILE_NAME)
+        temp_path = index_path + ".tmp"
+        with open(temp_path, "w", encoding="UTF-8") as file:
+            json.dump(index, file, indent=2)
+            file.write("\n")
+        os.replace(temp_path, index_path)
+
+
+def store_catalog_snapshots(
+    catalog: DatasetCatalog, dataset: str, directory: str, cache_size: int = 8
+) -> SnapshotStore:
+    """
+    Load every snapshot of a catalogued dataset, oldest first, into a new
+    delta-encoded snapshot store.
+    """
+    snapshot_store = SnapshotStore(directory, cache_size)
+    for period in catalog.periods(dataset):
+        snapshot_store.append(period, catalog.load(dataset, period))
+    return snapshot_store
@@ -0,0 +1,147 @@
+"""
+ Columnar storage of dataframes in the Arrow IPC (Feather V2) file format.
+
+ Datasets are written uncompressed so that they can be opened memory-mapped.
+ Numeric columns are then handed to pandas without being copied and the
+ underlying pages are shared, through the operating system page cache, by
+ every process that opens the same file.
+
+ Datasets can be written with optimised dtypes, as chosen by
+ util_lib.dtypes.optimise_dtypes, so that every process reading them holds
+ narrower columns.
+"""
+
+import glob
+import os
+import sys
+
+import pandas as pd
+from pandas import DataFrame
+from pyarrow import feather
+
+from util_lib.dtypes import optimise_dtypes
+import logging
+
+logger = logging.getLogger(__name__)
+
+DATASET_FILE_EXTENSION = ".arrow"
+PICKLE_FILE_EXTENSION = ".pkl"
+
+
+def write_dataset(input_df: DataFrame, to_path: str, optimise: bool = False) -> None:
+    """
+    Write a dataframe to an uncompressed Arrow IPC file.
+
+    The file is written to a temporary location first and then moved into
+    place, so any process holding a memory map of the previous version keeps
+    a consistent view of it.
+
+    :param input_df: The dataframe to write.
+    :param to_path: Path of the dataset file to create or replace.
+    :param optimise: Write the columns with the optimised dtypes chosen by
+        optimise_dtypes, logging the memory saved. By default the dtypes are
+        written unchanged.
+    """
+    if optimise:
+        input_df = optimise_dtypes(input_df)
+
+    os.makedirs(os.path.dirname(os.path.abspath(to_path)), exist_ok=True)
+
+    temp_file_path = to_path + ".tmp"
+    feather.write_feather(input_df, temp_file_path, compression="uncompressed")
+    os.replace(temp_file_path, to_path)
+
+
+def read_dataset(from_path: str, memory_map: bool = True) -> DataFrame:
+    """
+    Read a dataframe from an Arrow IPC file.
+
+    :param from_path: Path of the dataset file.
+    :param memory_map: Map the file into memory rather than reading it onto the heap.
+    :return: The dataframe with the index and dtypes it was written with,
+        except for object columns that Arrow stores as a typed column. Those
+        are read back with that type: an object column of numbers and missing
+        values, for example, comes back as float64 with NaN for pd.NA and None.
+    """
+    table = feather.read_table(from_path, memory_map=memory_map)
+    dataset_df: DataFrame = table.to_pandas(split_blocks=True)
+    return dataset_df
+
+
+def dataset_path_for(pickle_path: str) -> str:
+    """
+    Derive the dataset file path that corresponds to a pickle file path.
+
+    :param pickle_path: Path to a pickled dataframe, e.g. 'deaths/AllDeaths.pkl'.
+    :return: The same path with the dataset extension, e.g. 'deaths/AllDeaths.arrow'.
+    """
+    return os.path.splitext(pickle_path)[0] + DATASET_FILE_EXTENSION
+
+
+def convert_pickle_to_dataset(
+    pickle_path: str, dataset_path: str = "", optimise: bool = False
+) -> str:
+    """
+    Convert a pickled dataframe into an Arrow IPC dataset file.
+
+    :param pickle_path: Path to the pickled dataframe.
+    :param dataset_path: Path of the dataset file to write. Defaults to the pickle
+        path with the dataset extension.
+    :param optimise: Write the dataset with optimised dtypes.
+    :return: Path of the dataset file written.
+    """
+    dataset_path = dataset_path or dataset_path_for(pickle_path)
+
+    pickled_df = pd.read_pickle(pickle_path)
+    if not isinstance(pickled_df, DataFrame):
+        raise ValueError(f"The file '{pickle_path}' does not contain a dataframe.")
+
+    if optimise:
+        pickled_df = optimise_dtypes(pickled_df)
+    write_dataset(pickled_df, dataset_path)
+    logger.info(f"Converted {pickle_path} to {dataset_path}")
+
+    for retyped in _retyped_columns(pickled_df, read_dataset(dataset_path)):
+        logger.warning(f"{dataset_path} does not read back as written: {retyped}")
+    return dataset_path
+
+
+def _retyped_columns(written_df: DataFrame, read_df: DataFrame) -> list[str]:
+    """
+    Describe the index and columns whose dtypes changed on a round trip through a
+    dataset file, e.g. "Column 'Mean': object -> float64".
+    """
+    retyped = []
+    if written_df.index.dtype != read_df.index.dtype:
+        retyped.append(f"Index: {written_df.index.dtype} -> {read_df.index.dtype}")
+    for column, written_dtype, read_dtype in zip(
+        written_df.columns, written_df.dtypes, read_df.dtypes
+    ):
+        if written_dtype != read_dtype:
+            retyped.append(f"Column '{column}': {written_dtype} -> {read_dtype}")
+    return retyped
+
+
+def convert_pickle_directory(directory: str, optimise: bool = False) -> list[str]:
+    """
+    Convert every pickled dataframe below a directory into a dataset file
+    alongside the original.
+
+    :param directory: The directory to search recursively for pickle files.
+    :param optimise: Write the datasets with optimised dtypes.
+    :return: Paths of the dataset files written, in sorted order.
+    """
+    pickle_paths = sorted(
+        glob.glob(
+            os.path.join(directory, "**", f"*{PICKLE_FILE_EXTENSION}"), recursive=True
+        )
+    )
+    return [
+        convert_pickle_to_dataset(pickle_path, optimise=optimise)
+        for pickle_path in pickle_paths
+    ]
+
+
+if __name__ == "__main__":
+    for directory_to_convert in sys.argv[1:]:
+        convert_pickle_directory(directory_to_convert, optimise=True)
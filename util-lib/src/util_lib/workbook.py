@@ -0,0 +1,270 @@
+"""
+ Convenience functions for reading many worksheets and ranges from one
+ Excel workbook.
+
+ pd.read_excel opens and parses the whole workbook every time it is called. A
+ WorkbookSession opens the workbook once and keeps the cells of the sheets it
+ has read, so further reads of those sheets, with other rows to skip or read
+ and other columns, do not touch the file again.
+
+ Workbooks are read with the fastest Excel engine installed: calamine, a Rust
+ reader, if the python-calamine package is installed, and openpyxl otherwise.
+"""
+
+import importlib.util
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Mapping
+
+import pandas as pd
+from pandas import DataFrame
+from pandas.errors import EmptyDataError
+from pandas.io.parsers import TextParser  # type: ignore[attr-defined]
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+_EMPTY_CELL = ""
+
+# pandas Excel engines that read .xlsx workbooks, fastest first, with the
+# package each needs.
+EXCEL_ENGINES: Dict[str, str] = {
+    "calamine": "python_calamine",
+    "openpyxl": "openpyxl",
+}
+
+
+def available_excel_engines() -> list[str]:
+    """
+    :return: The Excel engines whose packages are installed, fastest first.
+    """
+    return [
+        engine
+        for engine, package in EXCEL_ENGINES.items()
+        if importlib.util.find_spec(package) is not None
+    ]
+
+
+def select_excel_engine(engine: str | None = None) -> str:
+    """
+    Choose the Excel engine to read workbooks with.
+
+    :param engine: An engine to use rather than the fastest installed one.
+    :return: The engine.
+    :raises ValueError: If the engine is unknown or its package is not
+        installed, or no engine is installed.
+    """
+    available_engines = available_excel_engines()
+    if engine is not None and engine not in available_engines:
+        raise ValueError(
+            f"Excel engine '{engine}' is not available. "
+            f"Available engines: {available_engines}"
+        )
+    if not available_engines:
+        raise ValueError(
+            f"No Excel engine is installed. Install one of: {list(EXCEL_ENGINES)}"
+        )
+    return engine or available_engines[0]
+
+
+def _column_letters_to_index(column_letters: str) -> int:
+    index = 0
+    for letter in column_letters.strip().upper():
+        if not "A" <= letter <= "Z":
+            raise ValueError(f"Invalid column name: {column_letters}")
+        index = index * 26 + ord(letter) - ord("A") + 1
+    return index - 1
+
+
+def column_range_to_indices(column_range: str) -> list[int]:
+    """
+    Convert an Excel column range, as accepted by pd.read_excel's usecols, to
+    column positions.
+
+    :param column_range: Comma-separated columns and ranges, e.g. 'A:C,E'.
+    :return: The zero-based position of every column in the range.
+    :raises ValueError: If a column name is not made of letters.
+    """
+    indices: list[int] = []
+    for part in column_range.split(","):
+        if ":" in part:
+            first, last = part.split(":")
+            indices.extend(
+                range(
+                    _column_letters_to_index(first),
+                    _column_letters_to_index(last) + 1,
+                )
+            )
+        else:
+            indices.append(_column_letters_to_index(part))
+    return indices
+
+
+def _trim_trailing_empty_cells(row: list[Any]) -> list[Any]:
+    end = len(row)
+    while end and row[end - 1] == _EMPTY_CELL:
+        end -= 1
+    return row[:end]
+
+
+class WorkbookSession:
+    """
+    An Excel workbook opened once to read many worksheets and ranges.
+
+    The workbook is opened on the first read. The cells of up to cache_size
+    worksheets are kept, the least recently read being evicted first.
+
+    With a cache_size of 0, nothing is kept and each read streams only the
+    rows it needs from the worksheet, which suits reading a workbook once.
+    """
+
+    def __init__(
+        self, file_path: str, cache_size: int = 8, engine: str | None = None
+    ) -> None:
+        """
+        :param file_path: Path to the workbook.
+        :param cache_size: The number of worksheets whose cells are kept.
+        :param engine: The Excel engine to read the workbook with. Defaults
+            to the fastest installed, as chosen by select_excel_engine.
+        :raises ValueError: If the engine is not available.
+        """
+        self.file_path = file_path
+        self.engine = select_excel_engine(engine)
+        self._cache_size = cache_size
+        self._excel_file: pd.ExcelFile | None = None
+        self._sheet_rows: OrderedDict[str | int, list[list[Any]]] = OrderedDict()
+
+    def __enter__(self) -> "WorkbookSession":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the workbook and forget the cells read from it.
+        """
+        if self._excel_file is not None:
+            self._excel_file.close()
+            self._excel_file = None
+        self._sheet_rows.clear()
+
+    def _open(self) -> pd.ExcelFile:
+        if self._excel_file is None:
+            logger.info(f"Opening workbook {self.file_path}")
+            # select_excel_engine only returns engines that pandas accepts.
+            self._excel_file = pd.ExcelFile(
+                self.file_path, engine=self.engine  # type: ignore[arg-type]
+            )
+        return self._excel_file
+
+    def sheet_names(self) -> list[str]:
+        return [str(sheet_name) for sheet_name in self._open().sheet_names]
+
+    def cached_sheets(self) -> list[str | int]:
+        """
+        :return: The worksheets whose cells are kept, least recently read first.
+        """
+        return list(self._sheet_rows)
+
+    def _rows(self, sheet_name: str | int) -> list[list[Any]]:
+        if sheet_name in self._sheet_rows:
+            self._sheet_rows.move_to_end(sheet_name)
+            return self._sheet_rows[sheet_name]
+
+        # Read every cell as it is, with empty cells left as empty strings,
+        # so each read below parses them just as pd.read_excel would.
+        sheet_df = self._open().parse(
+            sheet_name, header=None, dtype=object, na_filter=False
+        )
+        rows = [
+            _trim_trailing_empty_cells(list(row))
+            for row in sheet_df.itertuples(index=False, name=None)
+        ]
+
+        self._sheet_rows[sheet_name] = rows
+        while len(self._sheet_rows) > self._cache_size:
+            self._sheet_rows.popitem(last=False)
+        return rows
+
+    def read(
+        self,
+        sheet_name: str | int,
+        skiprows: int = 0,
+        nrows: int | None = None,
+        usecols: str | list[Hashable] | None = None,
+    ) -> DataFrame:
+        """
+        Read a worksheet, taking its header from the first row not skipped, as
+        pd.read_excel(file_path, sheet_name, skiprows=..., header=0, nrows=...,
+        usecols=...) would.
+
+        :param sheet_name: Name or position of the worksheet.
+        :param skiprows: The number of rows to skip from the top.
+        :param nrows: The number of rows to read below the header. Defaults to
+            all of them.
+        :param usecols: An Excel column range such as 'A:C', or column names
+            or positions. Defaults to every column.
+        :return: The worksheet's data.
+        :raises ValueError: If there is no such worksheet.
+        """
+        if self._cache_size == 0:
+            # Only the rows up to the last one needed are read from the file.
+            return self._open().parse(
+                sheet_name,
+                skiprows=skiprows,
+                header=0,
+                nrows=nrows,
+                usecols=usecols,
+            )
+
+        rows = self._rows(sheet_name)
+        if nrows is not None:
+            rows = rows[: skiprows + 1 + nrows]
+
+        num_rows = len(rows)
+        while num_rows and not rows[num_rows - 1]:
+            num_rows -= 1
+        if num_rows == 0:
+            return DataFrame()
+
+        width = max(len(row) for row in rows[:num_rows])
+        data = [row + [_EMPTY_CELL] * (width - len(row)) for row in rows[:num_rows]]
+
+        try:
+            worksheet_df: DataFrame = TextParser(
+                data,
+                header=0,
+                skiprows=skiprows,
+                nrows=nrows,
+                skip_blank_lines=False,
+                usecols=(
+                    column_range_to_indices(usecols)
+                    if isinstance(usecols, str)
+                    else usecols
+                ),
+            ).read(nrows=nrows)
+        except EmptyDataError:
+            return DataFrame()
+        return worksheet_df
+
+    def read_worksheet(self, file_specification: Mapping[str, Any]) -> DataFrame:
+        """
+        Read the rows and columns of a worksheet given by a file specification,
+        as read_worksheet_into_df does. The specification's 'dest_filepath' is
+        not used.
+        """
+        return self.read(
+            file_specification["worksheet_name"],
+            skiprows=int(file_specification.get("num_rows_from_top_to_ignore", 0)),
+            nrows=(
+                int(file_specification["num_rows_to_read"])
+                if "num_rows_to_read" in file_specification
+                else None
+            ),
+            usecols=(
+                str(file_specification["column_range_to_read"])
+                if "column_range_to_read" in file_specification
+                else None
+            ),
+        )
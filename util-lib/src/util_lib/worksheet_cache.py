@@ -0,0 +1,182 @@
+"""
+ An on-disk cache of worksheets read from Excel workbooks.
+
+ Each entry holds the dataframe read from one workbook with one worksheet
+ name, rows to skip, rows to read and column range, in an uncompressed Arrow
+ IPC file that is memory-mapped when read. An entry records the content hash
+ of the workbook it was read from and is only used while the workbook still
+ has that hash, so a changed workbook is read again and its entry replaced.
+
+ Arrow cannot hold every column read from a worksheet, e.g. one of both
+ numbers and footnote text. Such columns are pickled into the file's metadata
+ instead, so the cached dataframe is always the same as the one read.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+from typing import Any, Dict, Mapping
+
+import numpy as np
+import pyarrow as pa
+from pandas import DataFrame, RangeIndex, Series
+from pyarrow import feather
+
+from util_lib.file import calculate_file_hash
+from util_lib.store import DATASET_FILE_EXTENSION
+import logging
+
+logger = logging.getLogger(__name__)
+
+_FILE_HASH_METADATA_KEY = b"util_lib.file_hash"
+_COLUMNS_METADATA_KEY = b"util_lib.columns"
+_PICKLED_COLUMNS_METADATA_KEY = b"util_lib.pickled_columns"
+
+
+def _series_from_array(array: pa.Array) -> Series:
+    series: Series = array.to_pandas()
+    if series.dtype == np.dtype("object"):
+        # Missing values in text columns come back from Arrow as None, but
+        # pd.read_excel leaves them as NaN.
+        series = series.where(series.notna(), np.nan)
+    return series
+
+
+def _array_from_series(series: Series) -> pa.Array | None:
+    try:
+        array = pa.array(series, from_pandas=True)
+    except (pa.ArrowException, TypeError):
+        return None
+
+    restored = _series_from_array(array)
+    if restored.dtype != series.dtype or not restored.equals(
+        series.reset_index(drop=True)
+    ):
+        return None
+    return array
+
+
+def _table_from_frame(input_df: DataFrame, file_hash: str) -> pa.Table:
+    arrays = []
+    pickled_columns = {}
+    for position in range(input_df.shape[1]):
+        series = input_df.iloc[:, position]
+        array = _array_from_series(series)
+        if array is None:
+            pickled_columns[position] = series.reset_index(drop=True)
+            array = pa.nulls(len(series))
+        arrays.append(array)
+
+    # Arrow field names must be strings, so columns are stored by position
+    # and their labels, which may be numbers or dates, kept in the metadata.
+    return pa.Table.from_arrays(
+        arrays,
+        names=[str(position) for position in range(input_df.shape[1])],
+        metadata={
+            _FILE_HASH_METADATA_KEY: file_hash.encode("UTF-8"),
+            _COLUMNS_METADATA_KEY: pickle.dumps(input_df.columns),
+            _PICKLED_COLUMNS_METADATA_KEY: pickle.dumps(pickled_columns),
+        },
+    )
+
+
+def _frame_from_table(table: pa.Table) -> DataFrame:
+    metadata = table.schema.metadata
+    pickled_columns = pickle.loads(metadata[_PICKLED_COLUMNS_METADATA_KEY])
+    return DataFrame(
+        {
+            position: (
+                pickled_columns[position]
+                if position in pickled_columns
+                else _series_from_array(table.column(position).combine_chunks())
+            )
+            for position in range(table.num_columns)
+        },
+        index=RangeIndex(table.num_rows),
+    ).set_axis(pickle.loads(metadata[_COLUMNS_METADATA_KEY]), axis=1)
+
+
+class WorksheetCache:
+    """
+    A directory of worksheets read from Excel workbooks, one file per
+    workbook path and worksheet specification.
+    """
+
+    def __init__(self, directory: str) -> None:
+        """
+        :param directory: The cache directory. It is created if it does not exist.
+        """
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._file_hashes: Dict[str, tuple[int, int, str]] = {}
+
+    def file_hash(self, file_path: str) -> str:
+        """
+        :return: The content hash of a workbook, calculated again only if the
+            workbook's size or modification time has changed since it was last
+            calculated by this cache.
+        """
+        file_stat = os.stat(file_path)
+        recorded = self._file_hashes.get(file_path)
+        if recorded is not None and recorded[:2] == (
+            file_stat.st_size,
+            file_stat.st_mtime_ns,
+        ):
+            return recorded[2]
+
+        file_hash = calculate_file_hash(file_path)
+        self._file_hashes[file_path] = (
+            file_stat.st_size,
+            file_stat.st_mtime_ns,
+            file_hash,
+        )
+        return file_hash
+
+    def _entry_path(self, file_specification: Mapping[str, Any]) -> str:
+        entry_key = json.dumps(
+            [
+                os.path.abspath(str(file_specification["dest_filepath"])),
+                file_specification["worksheet_name"],
+                file_specification.get("num_rows_from_top_to_ignore", 0),
+                file_specification.get("num_rows_to_read"),
+                file_specification.get("column_range_to_read"),
+            ]
+        )
+        return os.path.join(
+            self.directory,
+            hashlib.sha256(entry_key.encode("UTF-8")).hexdigest()
+            + DATASET_FILE_EXTENSION,
+        )
+
+    def get(self, file_specification: Mapping[str, Any]) -> DataFrame | None:
+        """
+        :param file_specification: As accepted by read_worksheet_into_df.
+        :return: The cached worksheet, or None if it is not cached or the
+            workbook has changed since it was.
+        """
+        entry_path = self._entry_path(file_specification)
+        file_hash = self.file_hash(str(file_specification["dest_filepath"]))
+
+        if os.path.exists(entry_path):
+            table = feather.read_table(entry_path, memory_map=True)
+            if table.schema.metadata[_FILE_HASH_METADATA_KEY].decode() == file_hash:
+                return _frame_from_table(table)
+        return None
+
+    def put(
+        self, file_specification: Mapping[str, Any], worksheet_df: DataFrame
+    ) -> None:
+        """
+        Cache a worksheet read with a file specification, replacing any entry
+        for the same specification.
+        """
+        entry_path = self._entry_path(file_specification)
+        file_hash = self.file_hash(str(file_specification["dest_filepath"]))
+
+        feather.write_feather(
+            _table_from_frame(worksheet_df, file_hash),
+            entry_path + ".tmp",
+            compression="uncompressed",
+        )
+        os.replace(entry_path + ".tmp", entry_path)
@@ -0,0 +1,82 @@
+"""
+Tests for the blobstore module.
+"""
+
+import hashlib
+import os
+from pathlib import Path
+
+import pytest
+
+from util_lib.blobstore import BlobStore
+
+
+def _add(blob_store: BlobStore, tmp_path: Path, content: bytes, name: str) -> str:
+    file_path = tmp_path / "download.tmp"
+    file_path.write_bytes(content)
+    file_hash = hashlib.sha256(content).hexdigest()
+    blob_store.add(str(file_path), name, file_hash)
+    return file_hash
+
+
+def test_add_moves_file_into_store(tmp_path: Path) -> None:
+    blob_store = BlobStore(str(tmp_path / "blobs"))
+
+    file_hash = _add(blob_store, tmp_path, b"content", "weekly.xlsx")
+
+    assert file_hash in blob_store
+    assert Path(blob_store.blob_path(file_hash)).read_bytes() == b"content"
+    assert not (tmp_path / "download.tmp").exists()
+
+
+def test_identical_content_is_stored_once(tmp_path: Path) -> None:
+    blob_store = BlobStore(str(tmp_path / "blobs"))
+
+    file_hash = _add(blob_store, tmp_path, b"content", "weekly.xlsx")
+    _add(blob_store, tmp_path, b"content", "monthly.xlsx")
+
+    assert blob_store.names() == ["monthly.xlsx", "weekly.xlsx"]
+    assert blob_store.latest("monthly.xlsx") == file_hash
+    assert os.listdir(os.path.dirname(blob_store.blob_path(file_hash))) == [file_hash]
+    assert not (tmp_path / "download.tmp").exists()
+
+
+def test_history_keeps_every_version(tmp_path: Path) -> None:
+    blob_store = BlobStore(str(tmp_path / "blobs"))
+
+    first_hash = _add(blob_store, tmp_path, b"first", "weekly.xlsx")
+    _add(blob_store, tmp_path, b"first", "weekly.xlsx")
+    second_hash = _add(blob_store, tmp_path, b"second", "weekly.xlsx")
+
+    reopened_store = BlobStore(str(tmp_path / "blobs"))
+    assert reopened_store.history("weekly.xlsx") == [first_hash, second_hash]
+    assert reopened_store.latest("weekly.xlsx") == second_hash
+    assert Path(reopened_store.blob_path(first_hash)).read_bytes() == b"first"
+    assert reopened_store.latest("monthly.xlsx") is None
+
+
+def test_checkout_records_hash_until_file_changes(tmp_path: Path) -> None:
+    blob_store = BlobStore(str(tmp_path / "blobs"))
+    file_hash = _add(blob_store, tmp_path, b"content", "weekly.xlsx")
+    to_path = tmp_path / "weekly.xlsx"
+
+    blob_store.checkout(file_hash, str(to_path))
+
+    assert to_path.read_bytes() == b"content"
+    assert BlobStore(str(tmp_path / "blobs")).known_hash(str(to_path)) == file_hash
+
+    to_path.write_bytes(b"changed content")
+    assert blob_store.known_hash(str(to_path)) is None
+
+
+def test_checkout_unknown_digest(tmp_path: Path) -> None:
+    with pytest.raises(KeyError):
+        BlobStore(str(tmp_path)).checkout("0" * 64, str(tmp_path / "weekly.xlsx"))
+
+
+def test_store_keeps_its_hash_algorithm(tmp_path: Path) -> None:
+    blob_store = BlobStore(str(tmp_path))
+    _add(blob_store, tmp_path, b"content", "weekly.xlsx")
+
+    with pytest.raises(ValueError):
+        BlobStore(str(tmp_path), hash_algorithm="md5")
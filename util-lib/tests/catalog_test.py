@@ -0,0 +1,129 @@
+"""
+Tests for the catalog module.
+"""
+
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from util_lib.catalog import (
+    DatasetCatalog,
+    build_manifest,
+    write_manifest,
+    period_from_match,
+    read_dataset_schema,
+    week_period,
+    MANIFEST_FILE_NAME,
+)
+from util_lib.store import write_dataset
+
+
+def _write_weekly_snapshot(directory: Path, file_stem: str, num_weeks: int) -> None:
+    snapshot_df = pd.DataFrame(
+        {
+            "Registration_Week": range(1, num_weeks + 1),
+            "2023": pd.array([300] * num_weeks, dtype="Int64"),
+        }
+    )
+    write_dataset(snapshot_df, str(directory / "deaths" / f"{file_stem}.arrow"))
+
+
+@pytest.fixture
+def catalog(tmp_path: Path) -> DatasetCatalog:
+    _write_weekly_snapshot(tmp_path, "AllDeathsUpTo2023Week9", 9)
+    _write_weekly_snapshot(tmp_path, "AllDeathsUpTo2023Week12", 12)
+    _write_weekly_snapshot(tmp_path, "AllDeathsUpTo2024Week17", 17)
+    write_dataset(
+        pd.DataFrame({"Month": ["Jan"]}),
+        str(tmp_path / "births" / "AllBirthsUpToDec2022.arrow"),
+    )
+    write_dataset(pd.DataFrame({"Arm": ["Placebo"]}), str(tmp_path / "Unrelated.arrow"))
+
+    manifest_path = str(tmp_path / MANIFEST_FILE_NAME)
+    write_manifest(build_manifest(str(tmp_path)), manifest_path)
+    return DatasetCatalog(manifest_path)
+
+
+def test_build_manifest_indexes_only_matching_files(catalog: DatasetCatalog) -> None:
+    assert catalog.datasets() == ["monthly_births", "weekly_deaths"]
+    assert catalog.periods("weekly_deaths") == ["2023-W09", "2023-W12", "2024-W17"]
+    assert catalog.periods("monthly_births") == ["2022-12"]
+
+
+def test_build_manifest_rejects_two_snapshots_of_one_period(tmp_path: Path) -> None:
+    for file_stem in ["AllBirthsUpToFeb2023", "AllBirthsUpToMonth22023"]:
+        write_dataset(
+            pd.DataFrame({"Month": ["Jan", "Feb"]}),
+            str(tmp_path / "births" / f"{file_stem}.arrow"),
+        )
+
+    with pytest.raises(ValueError, match="'monthly_births' snapshot for 2023-02"):
+        build_manifest(str(tmp_path))
+
+
+def test_resolve_latest(catalog: DatasetCatalog, tmp_path: Path) -> None:
+    snapshot = catalog.resolve("weekly_deaths")
+
+    assert snapshot.as_of == "2024-W17"
+    assert snapshot.path == str(tmp_path / "deaths" / "AllDeathsUpTo2024Week17.arrow")
+
+
+def test_resolve_exact_period(catalog: DatasetCatalog) -> None:
+    assert catalog.resolve("weekly_deaths", week_period(2023, 12)).as_of == "2023-W12"
+
+
+def test_resolve_period_between_snapshots(catalog: DatasetCatalog) -> None:
+    assert catalog.resolve("weekly_deaths", "2023-W40").as_of == "2023-W12"
+
+
+def test_resolve_period_before_first_snapshot(catalog: DatasetCatalog) -> None:
+    with pytest.raises(KeyError):
+        catalog.resolve("weekly_deaths", "2022-W52")
+
+
+def test_resolve_unknown_dataset(catalog: DatasetCatalog) -> None:
+    with pytest.raises(KeyError):
+        catalog.resolve("weekly_births")
+
+
+def test_resolve_exposes_schema_without_loading(catalog: DatasetCatalog) -> None:
+    snapshot = catalog.resolve("weekly_deaths", "2023-W09")
+
+    assert snapshot.num_rows == 9
+    assert snapshot.columns == {"Registration_Week": "int64", "2023": "Int64"}
+
+
+def test_load(catalog: DatasetCatalog) -> None:
+    loaded_df = catalog.load("weekly_deaths", "2023-W12")
+
+    assert loaded_df.shape == (12, 2)
+
+
+def test_read_dataset_schema_excludes_index(tmp_path: Path) -> None:
+    dataset_file = str(tmp_path / "indexed.arrow")
+    write_dataset(
+        pd.DataFrame({"week": [1, 2], "deaths": [3.0, 4.0]}).set_index("week"),
+        dataset_file,
+    )
+
+    assert read_dataset_schema(dataset_file) == (2, {"deaths": "float64"})
+
+
+@pytest.mark.parametrize(
+    "groups, expected_period",
+    [
+        ({"year": "2023", "week": "9"}, "2023-W09"),
+        ({"year": "2024", "month": "2"}, "2024-02"),
+        ({"year": "2022", "month_name": "Nov"}, "2022-11"),
+        ({"year": "2024", "month_name": "April"}, "2024-04"),
+        ({"year": "2022", "quarter": "4"}, "2022-Q4"),
+    ],
+)
+def test_period_from_match(groups: dict, expected_period: str) -> None:
+    assert period_from_match(groups) == expected_period
+
+
+def test_period_from_match_unknown_month() -> None:
+    with pytest.raises(ValueError):
+        period_from_match({"year": "2022", "month_name": "Smarch"})
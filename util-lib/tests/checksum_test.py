@@ -0,0 +1,111 @@
+"""
+Tests for the checksum module.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+
+from util_lib.checksum import (
+    CHECKSUM_MANIFEST_FILE_NAME,
+    build_checksum_manifest,
+    hash_file,
+    hash_files,
+    verify_checksum_manifest,
+    write_checksum_manifest,
+)
+
+
+@pytest.fixture
+def data_directory(tmp_path: Path) -> Path:
+    (tmp_path / "deaths").mkdir()
+    (tmp_path / "deaths" / "AllDeaths.arrow").write_bytes(b"deaths" * 100_000)
+    (tmp_path / "manifest.json").write_bytes(b"{}")
+    (tmp_path / "empty.pkl").write_bytes(b"")
+    return tmp_path
+
+
+@pytest.mark.parametrize("has_file_digest", [True, False])
+def test_hash_file(data_directory: Path, has_file_digest: bool) -> None:
+    file_path = data_directory / "deaths" / "AllDeaths.arrow"
+
+    with patch("util_lib.checksum.hasattr", create=True, return_value=has_file_digest):
+        file_hash = hash_file(str(file_path))
+        empty_file_hash = hash_file(str(data_directory / "empty.pkl"), "md5")
+
+    assert file_hash == hashlib.sha256(file_path.read_bytes()).hexdigest()
+    assert empty_file_hash == hashlib.md5(b"").hexdigest()
+
+
+def test_hash_files_in_order(data_directory: Path) -> None:
+    file_paths = [
+        str(data_directory / "manifest.json"),
+        str(data_directory / "empty.pkl"),
+    ]
+
+    file_hashes = hash_files(file_paths, max_workers=2)
+
+    assert list(file_hashes) == file_paths
+    assert file_hashes[file_paths[0]] == hashlib.sha256(b"{}").hexdigest()
+
+
+def test_build_checksum_manifest(data_directory: Path) -> None:
+    manifest = build_checksum_manifest(str(data_directory))
+
+    assert manifest["hash_algorithm"] == "sha256"
+    assert list(manifest["files"]) == [
+        "empty.pkl",
+        "manifest.json",
+        "deaths/AllDeaths.arrow",
+    ]
+    assert manifest["files"]["manifest.json"] == {
+        "size": 2,
+        "hash": hashlib.sha256(b"{}").hexdigest(),
+    }
+
+
+def test_written_manifest_is_not_listed_in_itself(data_directory: Path) -> None:
+    manifest_path = write_checksum_manifest(str(data_directory))
+
+    assert manifest_path == str(data_directory / CHECKSUM_MANIFEST_FILE_NAME)
+    assert (
+        CHECKSUM_MANIFEST_FILE_NAME
+        not in build_checksum_manifest(str(data_directory))["files"]
+    )
+    assert len(json.loads(Path(manifest_path).read_text())["files"]) == 3
+
+
+def test_verify_unchanged_directory(data_directory: Path) -> None:
+    write_checksum_manifest(str(data_directory))
+    (data_directory / "new.arrow").write_bytes(b"new")
+
+    assert verify_checksum_manifest(str(data_directory)) == []
+
+
+def test_verify_reports_missing_and_changed_files(data_directory: Path) -> None:
+    write_checksum_manifest(str(data_directory))
+    (data_directory / "empty.pkl").unlink()
+    (data_directory / "manifest.json").write_bytes(b"[]")
+    (data_directory / "deaths" / "AllDeaths.arrow").write_bytes(b"truncated")
+
+    assert verify_checksum_manifest(str(data_directory)) == [
+        "deaths/AllDeaths.arrow",
+        "empty.pkl",
+        "manifest.json",
+    ]
+
+
+def test_verify_does_not_hash_files_of_the_wrong_size(data_directory: Path) -> None:
+    write_checksum_manifest(str(data_directory))
+    (data_directory / "deaths" / "AllDeaths.arrow").write_bytes(b"truncated")
+
+    with patch("util_lib.checksum.hash_file", wraps=hash_file) as mock_hash_file:
+        verify_checksum_manifest(str(data_directory))
+
+    assert sorted(call.args[0] for call in mock_hash_file.call_args_list) == [
+        str(data_directory / "empty.pkl"),
+        str(data_directory / "manifest.json"),
+    ]
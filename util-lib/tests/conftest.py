@@ -0,0 +1,117 @@
+"""
+Shared fixtures.
+"""
+
+import hashlib
+import os
+import threading
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+
+class _StandInRequestHandler(SimpleHTTPRequestHandler):
+    """
+    Serves files from a directory with an ETag derived from their content,
+    answers conditional and single-range requests and records the status of
+    every response instead of logging it to stderr.
+    """
+
+    etag: str | None = None
+
+    def send_head(self) -> Any:
+        file_path = self.translate_path(self.path)
+        if os.path.isfile(file_path):
+            with open(file_path, "rb") as file:
+                self.etag = f'"{hashlib.sha256(file.read()).hexdigest()[:16]}"'
+
+            if self.headers.get("If-None-Match") == self.etag:
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.end_headers()
+                return None
+
+            range_header = self.headers.get("Range", "")
+            if_range = self.headers.get("If-Range")
+            if range_header.startswith("bytes=") and if_range in (None, self.etag):
+                return self._send_range_head(file_path, range_header)
+
+        return super().send_head()
+
+    def _send_range_head(self, file_path: str, range_header: str) -> Any:
+        file_size = os.path.getsize(file_path)
+        range_start = int(range_header[len("bytes=") :].split("-")[0])
+
+        if range_start >= file_size:
+            self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+            self.send_header("Content-Range", f"bytes */{file_size}")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return None
+
+        file = open(file_path, "rb")  # pylint: disable=consider-using-with
+        file.seek(range_start)
+        self.send_response(HTTPStatus.PARTIAL_CONTENT)
+        self.send_header("Content-Type", self.guess_type(file_path))
+        self.send_header(
+            "Content-Range", f"bytes {range_start}-{file_size - 1}/{file_size}"
+        )
+        self.send_header("Content-Length", str(file_size - range_start))
+        self.end_headers()
+        return file
+
+    def end_headers(self) -> None:
+        if self.etag is not None:
+            self.send_header("ETag", self.etag)
+        super().end_headers()
+
+    def log_request(self, code: Any = "-", size: Any = "-") -> None:
+        self.server.request_log.append((self.path, int(code)))  # type: ignore[attr-defined]
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+
+@pytest.fixture
+def served_directory(tmp_path: Path) -> Path:
+    directory = tmp_path / "served"
+    directory.mkdir()
+    return directory
+
+
+@pytest.fixture
+def stand_in_server(served_directory: Path) -> Iterator[ThreadingHTTPServer]:
+    server = ThreadingHTTPServer(
+        ("127.0.0.1", 0),
+        partial(_StandInRequestHandler, directory=str(served_directory)),
+    )
+    server.request_log = []  # type: ignore[attr-defined]
+    server_thread = threading.Thread(target=server.serve_forever, daemon=True)
+    server_thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+    server_thread.join()
+
+
+@pytest.fixture
+def http_server(stand_in_server: ThreadingHTTPServer) -> str:
+    """
+    A local stand-in for a remote web server. Files written to the
+    served_directory fixture are available below the returned base URL.
+    """
+    return f"http://127.0.0.1:{stand_in_server.server_address[1]}"
+
+
+@pytest.fixture
+def http_request_log(stand_in_server: ThreadingHTTPServer) -> list[tuple[str, int]]:
+    """
+    The (path, status code) of every response sent by the stand-in server.
+    """
+    request_log: list[tuple[str, int]] = stand_in_server.request_log  # type: ignore[attr-defined]
+    return request_log
@@ -2,6 +2,7 @@
 Tests for dataframe module.
 """
 
+import logging
 from pathlib import Path
 import unittest
 from typing import Dict
@@ -11,9 +12,11 @@ import pandas as pd
 import pytest
 from pandas import DataFrame
 
+from util_lib.error import WorksheetReadError
 from util_lib.dataframe import (
     convert_obj_to_string,
     read_worksheet_into_df,
+    read_worksheets_into_dfs,
     inner_join_with,
     fill_zeros,
     set_object_columns_to_string,
@@ -75,6 +78,72 @@ def test_fill_zeros_with_nan_values() -> None:
     pd.testing.assert_frame_equal(actual_df, expected_df)
 
 
+def test_fill_zeros_keeps_numeric_dtypes() -> None:
+    input_df = pd.DataFrame(
+        {
+            "Deaths": np.array([0, 3, 0, 0, 5], dtype=np.int64),
+            "Mean": [0.0, np.nan, 2.5, 0.0, np.nan],
+            "Cases": np.array([1, 0, 2, 0, 0], dtype=np.int16),
+        }
+    )
+
+    actual_df = fill_zeros(input_df=input_df, column=["Deaths", "Mean", "Cases"])
+
+    expected_df = pd.DataFrame(
+        {
+            "Deaths": np.array([0, 3, 3, 3, 5], dtype=np.int64),
+            "Mean": [0.0, 0.0, 2.5, 2.5, 2.5],
+            "Cases": np.array([1, 1, 2, 2, 2], dtype=np.int16),
+        }
+    )
+    pd.testing.assert_frame_equal(actual_df, expected_df)
+
+
+def test_fill_zeros_many_columns_of_mixed_dtypes() -> None:
+    input_df = pd.DataFrame(
+        {
+            "Week": [1, 2, 3],
+            "Deaths": [4, 0, 6],
+            "Notes": pd.Series([7, 0, 0], dtype=object),
+            "Doses": pd.array([0, 8, 0], dtype="Int64"),
+        }
+    )
+
+    actual_df = fill_zeros(input_df=input_df, column=["Deaths", "Notes", "Doses"])
+
+    assert actual_df["Week"].tolist() == [1, 2, 3]
+    assert actual_df["Deaths"].tolist() == [4, 4, 6]
+    assert actual_df["Notes"].tolist() == [7, 7, 7]
+    assert actual_df["Doses"].tolist() == [0, 8, 8]
+    assert actual_df.dtypes.astype(str).tolist() == [
+        "int64",
+        "int64",
+        "object",
+        "Int64",
+    ]
+
+
+def test_fill_zeros_leaves_input_unchanged() -> None:
+    input_df = pd.DataFrame({"Deaths": [4, 0, 6], "Cases": [0, 1, 0]})
+
+    fill_zeros(input_df=input_df, column=["Deaths", "Cases"])
+
+    assert input_df.to_dict(orient="list") == {"Deaths": [4, 0, 6], "Cases": [0, 1, 0]}
+
+
+def test_fill_zeros_non_existent_column() -> None:
+    with pytest.raises(KeyError):
+        fill_zeros(input_df=pd.DataFrame({"Deaths": [1]}), column=["Deaths", "Missing"])
+
+
+def test_fill_zeros_empty_dataframe() -> None:
+    input_df = pd.DataFrame({"Deaths": pd.Series([], dtype=np.int64)})
+
+    actual_df = fill_zeros(input_df=input_df, column="Deaths")
+
+    pd.testing.assert_frame_equal(actual_df, input_df)
+
+
 def test_all_object_columns() -> None:
     df = pd.DataFrame({"col1": ["a", "b", "c"], "col2": ["d", "e", "f"]})
     result_df = convert_obj_to_string(df)
@@ -122,6 +191,57 @@ def test_mixed_object_types() -> None:
     assert all(isinstance(val, str) for val in result_df["col2"])
 
 
+def test_convert_obj_to_string_auto_dtype_mode() -> None:
+    df = pd.DataFrame(
+        {
+            "Age_Group": ["<1", "1-14", "<1", "1-14", np.nan, "<1"],
+            "Note": ["a", "b", "c", "d", "e", "f"],
+            "Count": [1, 2, 3, 4, 5, 6],
+        }
+    )
+    result_df = convert_obj_to_string(df, dtype_mode="auto")
+
+    assert result_df["Age_Group"].dtype == "category"
+    assert result_df["Age_Group"].tolist() == ["<1", "1-14", "<1", "1-14", "nan", "<1"]
+    assert result_df["Note"].dtype == pd.StringDtype("pyarrow")
+    assert result_df["Note"].tolist() == ["a", "b", "c", "d", "e", "f"]
+    assert result_df["Count"].dtype == np.int64
+    assert (result_df["Age_Group"] == "<1").tolist() == [
+        True,
+        False,
+        True,
+        False,
+        False,
+        True,
+    ]
+
+
+@pytest.mark.parametrize("dtype_mode", ["category", "string[pyarrow]"])
+def test_convert_obj_to_string_fixed_dtype_mode(dtype_mode: str) -> None:
+    df = pd.DataFrame({"col1": ["a", 2, "c"], "col2": [1, 2, 3]})
+    result_df = set_object_columns_to_string(df, dtype_mode=dtype_mode)
+
+    assert result_df["col1"].dtype == dtype_mode
+    assert result_df["col1"].tolist() == ["a", "2", "c"]
+    assert df["col1"].tolist() == ["a", 2, "c"]
+
+
+def test_convert_obj_to_string_unknown_dtype_mode() -> None:
+    with pytest.raises(ValueError):
+        convert_obj_to_string(pd.DataFrame({"col1": ["a"]}), dtype_mode="bytes")
+
+
+def test_convert_obj_to_string_logs_memory_saved(
+    caplog: pytest.LogCaptureFixture,
+) -> None:
+    df = pd.DataFrame({"Period": ["2018", "2019"] * 500})
+    with caplog.at_level(logging.INFO, logger="util_lib.dtypes"):
+        convert_obj_to_string(df, dtype_mode="auto")
+
+    assert "Column 'Period': object -> category" in caplog.text
+    assert "Saved" in caplog.text
+
+
 def test_read_present_worksheet() -> None:
     test_input_file = resources_dir / "dataframe_test" / "valid_workbook.xlsx"
 
@@ -138,6 +258,89 @@ def test_read_present_worksheet() -> None:
     assert df.shape == (29, 3)
 
 
+def test_read_worksheet_defaults_to_all_rows_and_columns() -> None:
+    test_input_file = resources_dir / "dataframe_test" / "valid_workbook.xlsx"
+
+    file_spec = {
+        "dest_filepath": test_input_file,
+        "worksheet_name": "Table 6",
+        "num_rows_from_top_to_ignore": 3,
+    }
+
+    df = read_worksheet_into_df(file_spec)
+    assert df.shape[1] == 4
+    assert len(df) > 29
+
+
+def _weekly_workbook(tmp_path: Path, week: int) -> str:
+    workbook_path = tmp_path / f"weekly_{week}.xlsx"
+    with pd.ExcelWriter(workbook_path) as writer:
+        pd.DataFrame({"Week": [week], "Deaths": [300 + week]}).to_excel(
+            writer, sheet_name="Table 1", index=False
+        )
+        pd.DataFrame({"Week": [week], "Births": [400 + week]}).to_excel(
+            writer, sheet_name="Table 2", index=False
+        )
+    return str(workbook_path)
+
+
+def test_read_worksheets_in_order(tmp_path: Path) -> None:
+    workbook_paths = [_weekly_workbook(tmp_path, week) for week in range(1, 4)]
+    file_specs = [
+        {"dest_filepath": workbook_path, "worksheet_name": worksheet_name}
+        for worksheet_name in ["Table 1", "Table 2"]
+        for workbook_path in workbook_paths
+    ]
+
+    dfs = read_worksheets_into_dfs(file_specs, max_workers=2)
+
+    assert [df.iloc[0, 1] for df in dfs] == [301, 302, 303, 401, 402, 403]
+    for file_spec, df in zip(file_specs, dfs):
+        pd.testing.assert_frame_equal(df, read_worksheet_into_df(file_spec))
+
+
+def test_read_worksheets_through_cache(tmp_path: Path) -> None:
+    file_specs = [
+        {"dest_filepath": _weekly_workbook(tmp_path, 1), "worksheet_name": "Table 1"}
+    ]
+
+    read_worksheets_into_dfs(file_specs, 1, str(tmp_path / "cache"))
+
+    assert len(list((tmp_path / "cache").iterdir())) == 1
+
+
+def test_read_worksheets_reports_first_failure(tmp_path: Path) -> None:
+    workbook_path = _weekly_workbook(tmp_path, 1)
+    missing_worksheet_spec = {
+        "dest_filepath": workbook_path,
+        "worksheet_name": "Table 9",
+    }
+    file_specs = [
+        {"dest_filepath": workbook_path, "worksheet_name": "Table 1"},
+        missing_worksheet_spec,
+        {"dest_filepath": str(tmp_path / "missing.xlsx"), "worksheet_name": "Table 1"},
+    ]
+
+    with pytest.raises(WorksheetReadError) as read_error:
+        read_worksheets_into_dfs(file_specs, max_workers=2)
+
+    assert read_error.value.file_specification == missing_worksheet_spec
+    assert isinstance(read_error.value.__cause__, ValueError)
+
+
+def test_read_worksheets_with_unknown_engine(tmp_path: Path) -> None:
+    file_spec = {
+        "dest_filepath": _weekly_workbook(tmp_path, 1),
+        "worksheet_name": "Table 1",
+    }
+
+    with pytest.raises(WorksheetReadError) as read_error:
+        read_worksheets_into_dfs([file_spec], max_workers=1, engine="no-such-engine")
+
+    assert read_error.value.file_specification == file_spec
+    assert isinstance(read_error.value.__cause__, ValueError)
+
+
 def test_read_missing_worksheet() -> None:
     test_input_file = resources_dir / "dataframe_test" / "missing_workbook.xlsx"
 
@@ -374,6 +577,80 @@ def test_add_week_ending_date_invalid_date_format() -> None:
         assert " does not match format" in str(value_error.value)
 
 
+def test_add_week_ending_date_as_datetime() -> None:
+    df = _create_sample_df(
+        ["19 Mar 2020 to 20 Mar 2020", "2020-03-27 12:30:00", "2020-04-03"],
+        "Week_end_Date",
+    )
+    result = add_week_ending_date(
+        input_df=df,
+        default_date="2020-03-19",
+        existing_week_end_date_col_name="Week_end_Date",
+        as_datetime=True,
+    )
+    assert result["Week Ending Date"].dtype == np.dtype("datetime64[ns]")
+    assert result["Week Ending Date"].tolist() == [
+        pd.Timestamp("2020-03-19"),
+        pd.Timestamp("2020-03-27"),
+        pd.Timestamp("2020-04-03"),
+    ]
+
+
+def test_add_week_ending_date_as_datetime_invalid_short_date() -> None:
+    df = _create_sample_df(["2020-13-01"], "Week_end_Date")
+    with pytest.raises(ValueError):
+        add_week_ending_date(
+            input_df=df,
+            default_date="2020-03-19",
+            existing_week_end_date_col_name="Week_end_Date",
+            as_datetime=True,
+        )
+
+
+def test_add_week_ending_date_timestamp_outside_pandas_range() -> None:
+    df = _create_sample_df(["1500-01-02 00:00:00", "2020-3-6 0:0:0"], "Week_end_Date")
+    result = add_week_ending_date(
+        input_df=df,
+        default_date="2020-03-19",
+        existing_week_end_date_col_name="Week_end_Date",
+    )
+    assert result["Week Ending Date"].tolist() == ["1500-01-02", "2020-03-06"]
+
+
+def test_add_week_ending_date_invalid_timestamp_among_valid() -> None:
+    df = _create_sample_df(
+        ["2020-03-27 00:00:00", "2020-04-03T00:00:00"], "Week_end_Date"
+    )
+    with pytest.raises(ValueError, match="does not match format"):
+        add_week_ending_date(
+            input_df=df,
+            default_date="2020-03-19",
+            existing_week_end_date_col_name="Week_end_Date",
+        )
+
+
+def test_add_week_ending_date_leap_second() -> None:
+    df = _create_sample_df(
+        ["2020-12-25 00:00:00", "2020-12-31 23:59:60"], "Week_end_Date"
+    )
+    with pytest.raises(ValueError, match="second must be in 0..59"):
+        add_week_ending_date(
+            input_df=df,
+            default_date="2020-03-19",
+            existing_week_end_date_col_name="Week_end_Date",
+        )
+
+
+def test_add_week_ending_date_non_string_values() -> None:
+    df = _create_sample_df(["2020-03-27", pd.Timestamp("2020-04-03")], "Week_end_Date")
+    with pytest.raises(TypeError):
+        add_week_ending_date(
+            input_df=df,
+            default_date="2020-03-19",
+            existing_week_end_date_col_name="Week_end_Date",
+        )
+
+
 def test_convert_int_column_to_string() -> None:
     input_df = pd.DataFrame({"A": [1, 2, 3], "B": [4.0, 5.0, 6.0]})
 
@@ -461,3 +738,105 @@ def test_extract_and_cast_as_int_zero_values() -> None:
     result = extract_and_cast_as_int(input_df=df, column="col")
     assert result["col"].tolist() == [0, 0, 0]
 
+
+def test_extract_and_cast_as_int_many_columns() -> None:
+    df = pd.DataFrame(
+        {
+            "a": ["1p", "2", "3.9"],
+            "b": [4, 5, 6],
+            "c": [7.0, "8r", -9.5],
+            "d": ["x", "y", "z"],
+        }
+    )
+    result = extract_and_cast_as_int(input_df=df, column=["a", "b", "c"])
+    assert result["a"].tolist() == [1, 2, 3]
+    assert result["b"].tolist() == [4, 5, 6]
+    assert result["c"].tolist() == [7, 8, -9]
+    assert (result[["a", "b", "c"]].dtypes == np.int64).all()
+    assert result["d"].tolist() == ["x", "y", "z"]
+
+
+def test_extract_and_cast_as_int_nullable() -> None:
+    df = pd.DataFrame({"a": ["1p", None, "z", ""], "b": [1.5, np.nan, 3.0, 4.0]})
+    result = extract_and_cast_as_int(input_df=df, column=["a", "b"], nullable=True)
+    assert result["a"].dtype == pd.Int64Dtype()
+    assert result["a"].tolist() == [1, pd.NA, pd.NA, pd.NA]
+    assert result["b"].tolist() == [1, pd.NA, 3, 4]
+
+
+def test_extract_and_cast_as_int_missing_values() -> None:
+    df = pd.DataFrame({"col": [1.0, np.nan]})
+    with pytest.raises(ValueError):
+        extract_and_cast_as_int(input_df=df, column="col")
+
+
+def test_extract_and_cast_as_int_booleans() -> None:
+    df = pd.DataFrame({"col": ["1", True]})
+    with pytest.raises(ValueError):
+        extract_and_cast_as_int(input_df=df, column="col")
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        pd.to_datetime(["2023-01-06", "2023-01-13"]),
+        pd.to_timedelta(["1D", "2D"]),
+    ],
+)
+def test_extract_and_cast_as_int_dates_and_durations(values: pd.Index) -> None:
+    df = pd.DataFrame({"col": values})
+    with pytest.raises(ValueError):
+        extract_and_cast_as_int(input_df=df, column="col")
+
+
+def test_extract_and_cast_as_int_invalid_number_in_second_column() -> None:
+    df = pd.DataFrame({"a": ["1", "2"], "b": ["3", "4.5.6"]})
+    with pytest.raises(ValueError):
+        extract_and_cast_as_int(input_df=df, column=["a", "b"])
+
+
+def test_mutate_safely_copies_only_modified_columns() -> None:
+    input_df = pd.DataFrame(
+        {
+            "count": [1, 0, 3],
+            "label": ["1a", "2b", "3c"],
+            "week": [1, 2, 3],
+            "untouched": [1.5, 2.5, 3.5],
+        }
+    )
+    expected_input_df = input_df.copy()
+
+    with pd.option_context("mode.copy_on_write", True):
+        actual_df = fill_zeros(input_df=input_df, column="count")
+        actual_df = extract_and_cast_as_int(input_df=actual_df, column="label")
+        actual_df = convert_column_to_string(input_df=actual_df, col_name="week")
+
+    assert np.shares_memory(
+        actual_df["untouched"].to_numpy(), input_df["untouched"].to_numpy()
+    )
+    assert actual_df["label"].tolist() == [1, 2, 3]
+    assert actual_df["week"].tolist() == ["1", "2", "3"]
+    pd.testing.assert_frame_equal(input_df, expected_input_df)
+
+
+def test_mutate_safely_result_is_independent_of_input() -> None:
+    input_df = pd.DataFrame({"count": [1, 0, 3], "untouched": [1.5, 2.5, 3.5]})
+
+    actual_df = fill_zeros(input_df=input_df, column="count")
+    actual_df.loc[0, "untouched"] = 100.0
+    input_df.loc[1, "untouched"] = 200.0
+
+    assert actual_df["untouched"].tolist() == [100.0, 2.5, 3.5]
+    assert input_df["untouched"].tolist() == [1.5, 200.0, 3.5]
+
+
+def test_mutate_safely_deep_copies_without_copy_on_write() -> None:
+    input_df = pd.DataFrame({"count": [1, 0, 3], "untouched": [1.5, 2.5, 3.5]})
+
+    with pd.option_context("mode.copy_on_write", False):
+        actual_df = fill_zeros(input_df=input_df, column="count")
+
+    assert not np.shares_memory(
+        actual_df["untouched"].to_numpy(), input_df["untouched"].to_numpy()
+    )
+    assert input_df["count"].tolist() == [1, 0, 3]
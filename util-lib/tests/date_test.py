@@ -5,6 +5,10 @@ This module contains tests for the date module.
 import logging
 import unittest
 
+import numpy as np
+import pandas as pd
+import pytest
+
 from util_lib import date
 
 logging.basicConfig(level=logging.INFO)
@@ -31,5 +35,64 @@ def test_valid_date_time_only_succeeds() -> None:
     assert actual_output == expected_output
 
 
+def test_reformat_dates_in_series() -> None:
+    input_dates = pd.Series(
+        ["31-12-2023", "01-01-2024", "31-12-2023"], index=[5, 6, 7], name="Date"
+    )
+
+    actual_output = date.reformat_dates(input_dates)
+
+    pd.testing.assert_series_equal(
+        actual_output,
+        pd.Series(
+            ["2023-12-31", "2024-01-01", "2023-12-31"],
+            index=[5, 6, 7],
+            name="Date",
+            dtype=object,
+        ),
+    )
+
+
+def test_reformat_dates_in_list_and_array() -> None:
+    input_dates = ["12/11/2018 09:15:32", "13/11/2018 10:00:00"]
+
+    assert date.reformat_dates(input_dates, "%d/%m/%Y %H:%M:%S", "%d %b %Y") == [
+        "12 Nov 2018",
+        "13 Nov 2018",
+    ]
+    assert date.reformat_dates(np.array(input_dates), "%d/%m/%Y %H:%M:%S").tolist() == [
+        "2018-11-12",
+        "2018-11-13",
+    ]
+
+
+def test_reformat_dates_outside_pandas_range() -> None:
+    assert date.reformat_dates(["01-01-1500"]) == [date.reformat_date("01-01-1500")]
+
+
+def test_reformat_dates_invalid_date() -> None:
+    with pytest.raises(ValueError, match="does not match format"):
+        date.reformat_dates(["31-12-2023", "2023-12-31"])
+
+
+@pytest.mark.parametrize("invalid_date", ["now", "today"])
+def test_reformat_dates_current_time_keyword(invalid_date: str) -> None:
+    with pytest.raises(ValueError, match="does not match format"):
+        date.reformat_dates(["31-12-2023", invalid_date])
+
+
+def test_reformat_dates_leap_second() -> None:
+    with pytest.raises(ValueError, match="second must be in 0..59"):
+        date.reformat_dates(
+            ["31-12-2020 23:59:59", "31-12-2020 23:59:60"],
+            source_format="%d-%m-%Y %H:%M:%S",
+        )
+
+
+def test_reformat_dates_non_string() -> None:
+    with pytest.raises(TypeError):
+        date.reformat_dates(["31-12-2023", None])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,99 @@
+"""
+Tests for the dtypes module.
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from util_lib.dtypes import choose_string_dtype, memory_report, optimise_dtypes
+
+
+def test_choose_string_dtype() -> None:
+    assert choose_string_dtype(pd.Series(["a", "a", "b", "b"])) == "category"
+    assert choose_string_dtype(pd.Series(["a", "b", "c", "d"])) == "string[pyarrow]"
+    assert choose_string_dtype(pd.Series([], dtype=object)) == "string[pyarrow]"
+    assert (
+        choose_string_dtype(pd.Series(["a", "b", "c", "d"]), max_category_ratio=1)
+        == "category"
+    )
+
+
+def test_memory_report() -> None:
+    before_df = pd.DataFrame({"Period": ["2018", "2019"] * 500, "Count": range(1000)})
+    after_df = before_df.astype({"Period": "category", "Count": "int16"})
+
+    report = memory_report(before_df, after_df)
+
+    assert report.loc["Count"].to_dict() == {
+        "dtype_before": "int64",
+        "dtype_after": "int16",
+        "bytes_before": 8000,
+        "bytes_after": 2000,
+        "bytes_saved": 6000,
+    }
+    assert report.loc["Period", "dtype_after"] == "category"
+    assert report["bytes_saved"]["Period"] > 0
+
+
+def test_optimise_dtypes() -> None:
+    input_df = pd.DataFrame(
+        {
+            "Registration_Week": np.arange(1, 101, dtype=np.int64),
+            "Deaths": pd.array([310, None] * 50, dtype="Int64"),
+            "Population": np.full(100, 1_900_000, dtype=np.int64),
+            "Total": np.full(100, 3_000_000_000, dtype=np.int64),
+            "Mean": np.tile([1.5, np.nan], 50),
+            "Rate": np.full(100, 0.1),
+            "Year": ["2023", "2024"] * 50,
+            "Note": [f"Note {row}" for row in range(100)],
+            "Revised": [True, False] * 50,
+        }
+    )
+
+    actual_df = optimise_dtypes(input_df)
+
+    assert actual_df.dtypes.astype(str).to_dict() == {
+        "Registration_Week": "int32",
+        "Deaths": "Int32",
+        "Population": "int32",
+        "Total": "int64",
+        "Mean": "float64",
+        "Rate": "float64",
+        "Year": "category",
+        "Note": "object",
+        "Revised": "bool",
+    }
+    pd.testing.assert_frame_equal(actual_df.astype(input_df.dtypes.to_dict()), input_df)
+
+
+def test_optimise_dtypes_leaves_input_unchanged() -> None:
+    input_df = pd.DataFrame({"Week": [1, 2, 3], "Year": ["2023"] * 3})
+
+    optimise_dtypes(input_df)
+
+    assert input_df.dtypes.astype(str).to_list() == ["int64", "object"]
+
+
+def test_optimise_dtypes_keeps_mixed_object_columns() -> None:
+    input_df = pd.DataFrame({"Week": [1, "1", 1, "1"]})
+
+    assert optimise_dtypes(input_df)["Week"].dtype == np.dtype("object")
+
+
+def test_optimise_dtypes_empty_dataframe() -> None:
+    input_df = pd.DataFrame({"Week": pd.Series([], dtype=np.int64)})
+
+    assert optimise_dtypes(input_df)["Week"].dtype == np.int32
+
+
+def test_optimise_dtypes_logs_memory_saved(caplog: pytest.LogCaptureFixture) -> None:
+    input_df = pd.DataFrame({"Week": range(1000)})
+
+    with caplog.at_level(logging.INFO, logger="util_lib.dtypes"):
+        optimise_dtypes(input_df)
+
+    assert "Column 'Week': int64 -> int32, 8,000 -> 4,000 bytes" in caplog.text
+    assert "Saved 4,000 bytes in total" in caplog.text
@@ -4,16 +4,36 @@ The tests cover various scenarios such as file existence, file hashing, file dow
 file validation against a schema, and file saving logic.
 """
 
+import hashlib
+import io
 import json
-from typing import Dict
+import os
+from http.server import ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterator
 from unittest.mock import patch, mock_open, Mock
+import jsonschema
 import pytest
+import referencing
+import referencing.jsonschema
+import requests
 
+from util_lib.blobstore import BlobStore
 from util_lib.error import InvalidFileError
 from util_lib.file import (
+    calculate_file_hash,
+    download_file,
+    download_files,
     download_new_file,
     get_json_content_from_file,
+    get_schema_validator,
+    iter_json_array_from_file,
+    read_download_metadata,
+    validate_json_array_file_against_schema_file,
     validate_json_file_against_schema_file,
+    validate_json_files,
+    validate_json_files_against_schema_file,
+    _JsonArrayReader,
     _save_only_if_new,
 )
 
@@ -236,3 +256,740 @@ def test_invalid_schema(mock_item: Mock) -> None:
     )
     assert result is False
 
+
+@pytest.fixture
+def schema_file(tmp_path: Path) -> Path:
+    schema_file = tmp_path / "schema.json"
+    schema_file.write_text(json.dumps(valid_json_schema), encoding="UTF-8")
+    return schema_file
+
+
+def test_schema_validator_is_compiled_once(schema_file: Path) -> None:
+    with patch(
+        "util_lib.file.get_json_content_from_file", wraps=get_json_content_from_file
+    ) as mock_get_json:
+        first_validator = get_schema_validator(str(schema_file))
+        second_validator = get_schema_validator(str(schema_file))
+
+    assert second_validator is first_validator
+    mock_get_json.assert_called_once()
+
+
+def test_schema_validator_is_recompiled_when_schema_changes(schema_file: Path) -> None:
+    first_validator = get_schema_validator(str(schema_file))
+
+    schema_file.write_text(json.dumps(invalid_json_schema), encoding="UTF-8")
+    os.utime(schema_file, ns=(0, os.stat(schema_file).st_mtime_ns + 1))
+    second_validator = get_schema_validator(str(schema_file))
+
+    assert second_validator is not first_validator
+    assert second_validator.is_valid(invalid_json_content)
+
+
+def test_invalid_schema_file_is_rejected(tmp_path: Path) -> None:
+    schema_file = tmp_path / "schema.json"
+    schema_file.write_text(json.dumps({"type": "no-such-type"}), encoding="UTF-8")
+
+    with pytest.raises(jsonschema.exceptions.SchemaError):
+        get_schema_validator(str(schema_file))
+
+
+def test_validate_json_files_reports_every_error(
+    schema_file: Path, tmp_path: Path
+) -> None:
+    documents = {
+        "valid.json": json.dumps(valid_json_content),
+        "invalid.json": json.dumps({"name": 7, "age": "thirty"}),
+        "malformed.json": "{",
+    }
+    for file_name, content in documents.items():
+        (tmp_path / file_name).write_text(content, encoding="UTF-8")
+
+    results = validate_json_files_against_schema_file(
+        [str(tmp_path / file_name) for file_name in documents],
+        str(schema_file),
+        max_workers=2,
+    )
+
+    assert [result.json_data_file for result in results] == [
+        str(tmp_path / file_name) for file_name in documents
+    ]
+    assert results[0].is_valid
+    assert sorted(results[1].errors) == [
+        "$.age: 'thirty' is not of type 'number'",
+        "$.name: 7 is not of type 'string'",
+    ]
+    assert not results[2].is_valid
+    assert len(results[2].errors) == 1
+
+
+def test_validate_few_json_files_in_this_process(
+    schema_file: Path, tmp_path: Path
+) -> None:
+    json_data_file = tmp_path / "valid.json"
+    json_data_file.write_text(json.dumps(valid_json_content), encoding="UTF-8")
+
+    with patch("util_lib.file.ProcessPoolExecutor") as mock_executor:
+        results = validate_json_files_against_schema_file(
+            [str(json_data_file)] * 3, str(schema_file), max_workers=2
+        )
+
+    mock_executor.assert_not_called()
+    assert [result.is_valid for result in results] == [True, True, True]
+
+
+def _retrieve_age_schema(uri: str) -> referencing.Resource[Any]:
+    return referencing.jsonschema.DRAFT202012.create_resource({"type": "number"})
+
+
+def test_validate_json_files_in_parallel_with_the_validator_registry(
+    tmp_path: Path,
+) -> None:
+    registry: referencing.Registry[Any] = referencing.Registry(
+        retrieve=_retrieve_age_schema  # type: ignore[call-arg]
+    ).with_resource(
+        "urn:name",
+        referencing.jsonschema.DRAFT202012.create_resource({"type": "string"}),
+    )
+    validator = jsonschema.Draft202012Validator(
+        {
+            "type": "object",
+            "properties": {"name": {"$ref": "urn:name"}, "age": {"$ref": "urn:age"}},
+        },
+        registry=registry,
+    )
+    documents = {
+        "valid.json": valid_json_content,
+        "invalid.json": {"name": 7, "age": "thirty"},
+    }
+    for file_name, content in documents.items():
+        (tmp_path / file_name).write_text(json.dumps(content), encoding="UTF-8")
+
+    with patch("util_lib.file.PARALLEL_VALIDATION_MIN_BYTES", 0):
+        results = validate_json_files(
+            [str(tmp_path / file_name) for file_name in documents],
+            validator,
+            max_workers=2,
+        )
+
+    assert results[0].is_valid
+    assert sorted(results[1].errors) == [
+        "$.age: 'thirty' is not of type 'number'",
+        "$.name: 7 is not of type 'string'",
+    ]
+
+
+def _weekly_records(num_weeks: int) -> list[Dict]:
+    return [
+        {"name": f"Week {week}", "age": week * 1234567, "tags": ["a", {"b": None}]}
+        for week in range(num_weeks)
+    ]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 64 * 1024])
+def test_iter_json_array_from_file(tmp_path: Path, chunk_size: int) -> None:
+    records = _weekly_records(50) + [12345, "text", [], {}]
+    json_file = tmp_path / "records.json"
+    json_file.write_text(json.dumps(records, indent=2), encoding="UTF-8")
+
+    assert list(iter_json_array_from_file(str(json_file), chunk_size)) == records
+
+
+@pytest.mark.parametrize("content", ["[]", " [ ] \n"])
+def test_iter_empty_json_array_from_file(tmp_path: Path, content: str) -> None:
+    json_file = tmp_path / "records.json"
+    json_file.write_text(content, encoding="UTF-8")
+
+    assert list(iter_json_array_from_file(str(json_file), 1)) == []
+
+
+@pytest.mark.parametrize("content", ["[1, 2", "[1 2]", "[1, 2] 3", "[1,, 2]"])
+def test_iter_malformed_json_array_from_file(tmp_path: Path, content: str) -> None:
+    json_file = tmp_path / "records.json"
+    json_file.write_text(content, encoding="UTF-8")
+
+    with pytest.raises(json.JSONDecodeError):
+        list(iter_json_array_from_file(str(json_file), 2))
+
+
+def test_iter_json_array_matches_json_loads_at_every_chunk_size() -> None:
+    content = json.dumps(
+        ["text", 12.5e-3, -7, 1e21, 0.5, True, None, {"a": [1.25e-10, "b"]}, 3]
+    )
+
+    for chunk_size in range(1, len(content) + 1):
+        assert list(_JsonArrayReader(io.StringIO(content), chunk_size)) == json.loads(
+            content
+        ), chunk_size
+
+
+@pytest.mark.parametrize("pad", [65525, 65526, 65528])
+def test_iter_json_array_with_number_cut_at_default_chunk_size(
+    tmp_path: Path, pad: int
+) -> None:
+    json_file = tmp_path / "records.json"
+    json_file.write_text('["' + "x" * pad + '", 12.5e-3]', encoding="UTF-8")
+
+    assert list(iter_json_array_from_file(str(json_file))) == ["x" * pad, 12.5e-3]
+
+
+def test_iter_json_array_stops_reading_at_malformed_item() -> None:
+    content = (
+        '[{"name": "Week 1", "age": tru}, ' + json.dumps(_weekly_records(10000))[1:]
+    )
+    file = io.StringIO(content)
+
+    with pytest.raises(json.JSONDecodeError, match="Expecting value"):
+        list(_JsonArrayReader(file, 1024))
+
+    assert file.tell() <= 1024
+
+
+def test_iter_json_array_from_file_that_is_not_an_array(tmp_path: Path) -> None:
+    json_file = tmp_path / "records.json"
+    json_file.write_text(json.dumps(valid_json_content), encoding="UTF-8")
+
+    with pytest.raises(InvalidFileError):
+        list(iter_json_array_from_file(str(json_file)))
+
+
+def test_validate_json_array_file(schema_file: Path, tmp_path: Path) -> None:
+    json_file = tmp_path / "records.json"
+    json_file.write_text(json.dumps(_weekly_records(3)), encoding="UTF-8")
+
+    assert validate_json_array_file_against_schema_file(
+        str(json_file), str(schema_file)
+    ) == (True, "All 3 items of the JSON document are valid.")
+
+
+def test_validate_json_array_file_stops_at_first_invalid_item(
+    schema_file: Path, tmp_path: Path
+) -> None:
+    json_file = tmp_path / "records.json"
+    json_file.write_text(
+        json.dumps(_weekly_records(2) + [invalid_json_content])[:-1] + ", {",
+        encoding="UTF-8",
+    )
+
+    result, message = validate_json_array_file_against_schema_file(
+        str(json_file), str(schema_file)
+    )
+
+    assert result is False
+    assert message == (
+        "Item 2 of the JSON document does not conform to the schema: "
+        "$.age: 'thirty' is not of type 'number'"
+    )
+
+
+@pytest.fixture
+def large_served_file(served_directory: Path) -> bytes:
+    content = os.urandom(3 * 1024 * 1024 + 17)
+    (served_directory / "workbook.xlsx").write_bytes(content)
+    return content
+
+
+def test_download_file_streamed(
+    http_server: str, large_served_file: bytes, tmp_path: Path
+) -> None:
+    to_path = tmp_path / "workbook.xlsx"
+
+    download_file(f"{http_server}/workbook.xlsx", str(to_path), stream=True)
+
+    assert to_path.read_bytes() == large_served_file
+
+
+def test_download_file_with_wrong_hash_keeps_existing_file(
+    http_server: str, served_directory: Path, tmp_path: Path
+) -> None:
+    (served_directory / "table.xlsx").write_bytes(b"new content")
+    to_path = tmp_path / "table.xlsx"
+    to_path.write_bytes(b"content")
+
+    with pytest.raises(InvalidFileError):
+        download_file(
+            f"{http_server}/table.xlsx",
+            str(to_path),
+            expected_hash=hashlib.sha256(b"other content").hexdigest(),
+        )
+
+    assert to_path.read_bytes() == b"content"
+    assert sorted(os.listdir(tmp_path)) == ["served", "table.xlsx"]
+
+
+def test_download_file_streamed_failure_keeps_existing_file(
+    http_server: str, served_directory: Path, tmp_path: Path
+) -> None:
+    (served_directory / "table.xlsx").write_bytes(b"new content")
+    to_path = tmp_path / "table.xlsx"
+    to_path.write_bytes(b"content")
+
+    def _fail_half_way(chunk_size: int) -> Iterator[bytes]:
+        yield b"new"
+        raise requests.ConnectionError("connection reset")
+
+    with patch(
+        "util_lib.file.requests.Response.iter_content", side_effect=_fail_half_way
+    ):
+        with pytest.raises(requests.ConnectionError):
+            download_file(f"{http_server}/table.xlsx", str(to_path), stream=True)
+
+    assert to_path.read_bytes() == b"content"
+    assert sorted(os.listdir(tmp_path)) == ["served", "table.xlsx"]
+
+
+def test_download_new_file_streamed_hashes_while_downloading(
+    http_server: str, large_served_file: bytes, tmp_path: Path
+) -> None:
+    to_path = tmp_path / "raw" / "workbook.xlsx"
+
+    with patch("util_lib.file._download_file") as mock_download_file:
+        downloaded_file_hash = download_new_file(
+            f"{http_server}/workbook.xlsx", str(to_path), stream=True
+        )
+
+    mock_download_file.assert_not_called()
+    assert downloaded_file_hash == hashlib.sha256(large_served_file).hexdigest()
+    assert to_path.read_bytes() == large_served_file
+    assert not Path(str(to_path) + ".tmp").exists()
+
+
+def test_download_new_file_streamed_identical_file_is_kept(
+    http_server: str, large_served_file: bytes, tmp_path: Path
+) -> None:
+    to_path = tmp_path / "workbook.xlsx"
+    to_path.write_bytes(large_served_file)
+    modified_time = to_path.stat().st_mtime_ns
+
+    download_new_file(f"{http_server}/workbook.xlsx", str(to_path), stream=True)
+
+    assert to_path.stat().st_mtime_ns == modified_time
+    assert not Path(str(to_path) + ".tmp").exists()
+
+
+def test_download_new_file_streamed_missing_file(
+    http_server: str, tmp_path: Path
+) -> None:
+    with pytest.raises(requests.exceptions.HTTPError):
+        download_new_file(
+            f"{http_server}/missing.xlsx", str(tmp_path / "missing.xlsx"), stream=True
+        )
+
+
+def test_download_files_concurrently_in_input_order(
+    http_server: str, served_directory: Path, tmp_path: Path
+) -> None:
+    for index in range(6):
+        (served_directory / f"table{index}.xlsx").write_bytes(b"x" * (index + 1))
+    downloads = [
+        (f"{http_server}/table{index}.xlsx", str(tmp_path / f"table{index}.xlsx"))
+        for index in range(6)
+    ]
+
+    results = download_files(downloads, max_workers=3)
+
+    assert [(result.from_path, result.to_path) for result in results] == downloads
+    assert all(result.succeeded for result in results)
+    assert [result.num_bytes for result in results] == [1, 2, 3, 4, 5, 6]
+    assert all(result.elapsed_seconds >= 0 for result in results)
+    assert results[0].file_hash == hashlib.sha256(b"x").hexdigest()
+
+
+def test_download_files_reuses_one_session_per_worker_and_host(
+    http_server: str, served_directory: Path, tmp_path: Path
+) -> None:
+    (served_directory / "table.xlsx").write_bytes(b"content")
+    downloads = [
+        (f"{http_server}/table.xlsx", str(tmp_path / f"table{index}.xlsx"))
+        for index in range(8)
+    ]
+
+    with patch(
+        "util_lib.file.requests.Session", wraps=requests.Session
+    ) as mock_session:
+        download_files(downloads, max_workers=2)
+
+    assert mock_session.call_count <= 2
+
+
+def test_download_files_reports_failures_without_raising(
+    http_server: str, served_directory: Path, tmp_path: Path
+) -> None:
+    (served_directory / "table.xlsx").write_bytes(b"content")
+
+    results = download_files(
+        [
+            (f"{http_server}/missing.xlsx", str(tmp_path / "missing.xlsx")),
+            ("ftp://example.com/table.xlsx", str(tmp_path / "ftp.xlsx")),
+            (f"{http_server}/table.xlsx", str(tmp_path / "table.xlsx")),
+        ]
+    )
+
+    assert [result.succeeded for result in results] == [False, False, True]
+    assert "404" in results[0].error
+    assert "Invalid URL" in results[1].error
+
+
+def test_download_files_counts_bytes_received(
+    http_server: str, served_directory: Path, tmp_path: Path
+) -> None:
+    (served_directory / "table.xlsx").write_bytes(b"content")
+    downloads = [(f"{http_server}/table.xlsx", str(tmp_path / "table.xlsx"))]
+
+    first_results = download_files(downloads, conditional=True)
+    second_results = download_files(downloads, conditional=True)
+
+    assert first_results[0].num_bytes == len(b"content")
+    assert second_results[0].succeeded
+    assert second_results[0].num_bytes == 0
+
+
+def test_conditional_download_records_validators(
+    http_server: str, served_directory: Path, tmp_path: Path
+) -> None:
+    (served_directory / "table.xlsx").write_bytes(b"content")
+    to_path = str(tmp_path / "table.xlsx")
+
+    file_hash = download_new_file(
+        f"{http_server}/table.xlsx", to_path, conditional=True
+    )
+
+    metadata = read_download_metadata(to_path)
+    assert metadata is not None
+    assert metadata["url"] == f"{http_server}/table.xlsx"
+    assert metadata["etag"].startswith('"')
+    assert metadata["last_modified"]
+    assert metadata["hash"] == file_hash == hashlib.sha256(b"content").hexdigest()
+
+
+def test_conditional_download_not_modified_skips_body_and_hashing(
+    http_server: str,
+    served_directory: Path,
+    tmp_path: Path,
+    http_request_log: list,
+) -> None:
+    (served_directory / "table.xlsx").write_bytes(b"content")
+    to_path = str(tmp_path / "table.xlsx")
+    first_hash = download_new_file(
+        f"{http_server}/table.xlsx", to_path, conditional=True
+    )
+
+    with patch("util_lib.file.calculate_file_hash") as mock_calculate_file_hash:
+        second_hash = download_new_file(
+            f"{http_server}/table.xlsx", to_path, conditional=True
+        )
+
+    mock_calculate_file_hash.assert_not_called()
+    assert second_hash == first_hash
+    assert [code for _, code in http_request_log] == [200, 304]
+    assert not Path(to_path + ".tmp").exists()
+
+
+def test_conditional_download_not_modified_checks_expected_hash(
+    http_server: str,
+    served_directory: Path,
+    tmp_path: Path,
+    http_request_log: list,
+) -> None:
+    (served_directory / "table.xlsx").write_bytes(b"content")
+    to_path = str(tmp_path / "table.xlsx")
+    download_new_file(f"{http_server}/table.xlsx", to_path, conditional=True)
+    Path(to_path).write_bytes(b"corrupted")
+
+    with pytest.raises(InvalidFileError):
+        download_new_file(
+            f"{http_server}/table.xlsx",
+            to_path,
+            conditional=True,
+            expected_hash=hashlib.sha256(b"content").hexdigest(),
+        )
+    assert Path(to_path).read_bytes() == b"corrupted"
+    assert read_download_metadata(to_path) is None
+
+    download_new_file(f"{http_server}/table.xlsx", to_path, conditional=True)
+
+    assert [code for _, code in http_request_log] == [200, 304, 200]
+    assert Path(to_path).read_bytes() == b"content"
+
+
+def test_conditional_download_modified_file_is_saved(
+    http_server: str,
+    served_directory: Path,
+    tmp_path: Path,
+    http_request_log: list,
+) -> None:
+    (served_directory / "table.xlsx").write_bytes(b"content")
+    to_path = str(tmp_path / "table.xlsx")
+    download_new_file(f"{http_server}/table.xlsx", to_path, conditional=True)
+
+    (served_directory / "table.xlsx").write_bytes(b"new content")
+    file_hash = download_new_file(
+        f"{http_server}/table.xlsx", to_path, conditional=True
+    )
+
+    assert [code for _, code in http_request_log] == [200, 200]
+    assert Path(to_path).read_bytes() == b"new content"
+    metadata = read_download_metadata(to_path)
+    assert metadata is not None
+    assert metadata["hash"] == file_hash
+
+
+def test_conditional_download_without_local_file_ignores_metadata(
+    http_server: str,
+    served_directory: Path,
+    tmp_path: Path,
+    http_request_log: list,
+) -> None:
+    (served_directory / "table.xlsx").write_bytes(b"content")
+    to_path = tmp_path / "table.xlsx"
+    download_new_file(f"{http_server}/table.xlsx", str(to_path), conditional=True)
+
+    to_path.unlink()
+    download_new_file(f"{http_server}/table.xlsx", str(to_path), conditional=True)
+
+    assert [code for _, code in http_request_log] == [200, 200]
+    assert to_path.read_bytes() == b"content"
+
+
+def test_read_download_metadata_for_unconditional_download(tmp_path: Path) -> None:
+    assert read_download_metadata(str(tmp_path / "table.xlsx")) is None
+
+
+def _interrupted_download(
+    http_server: str, served_directory: Path, tmp_path: Path, content: bytes
+) -> str:
+    (served_directory / "table.xlsx").write_bytes(content)
+    to_path = str(tmp_path / "table.xlsx")
+
+    def _fail_half_way(chunk_size: int) -> Iterator[bytes]:
+        yield content[: len(content) // 2]
+        raise requests.ConnectionError("connection reset")
+
+    with patch(
+        "util_lib.file.requests.Response.iter_content", side_effect=_fail_half_way
+    ):
+        with pytest.raises(requests.ConnectionError):
+            download_new_file(f"{http_server}/table.xlsx", to_path, resume=True)
+    return to_path
+
+
+def test_interrupted_resumable_download_keeps_partial_file(
+    http_server: str, served_directory: Path, tmp_path: Path
+) -> None:
+    to_path = _interrupted_download(
+        http_server, served_directory, tmp_path, b"0123456789"
+    )
+
+    assert Path(to_path + ".tmp").read_bytes() == b"01234"
+    assert not os.path.exists(to_path)
+
+
+def test_resumed_download_requests_only_the_remaining_bytes(
+    http_server: str,
+    served_directory: Path,
+    tmp_path: Path,
+    http_request_log: list,
+) -> None:
+    content = b"0123456789"
+    to_path = _interrupted_download(http_server, served_directory, tmp_path, content)
+
+    file_hash = download_new_file(f"{http_server}/table.xlsx", to_path, resume=True)
+
+    assert [code for _, code in http_request_log] == [200, 206]
+    assert Path(to_path).read_bytes() == content
+    assert file_hash == hashlib.sha256(content).hexdigest()
+    assert sorted(os.listdir(tmp_path)) == ["served", "table.xlsx"]
+
+
+def test_resumed_download_of_changed_file_starts_again(
+    http_server: str,
+    served_directory: Path,
+    tmp_path: Path,
+    http_request_log: list,
+) -> None:
+    to_path = _interrupted_download(
+        http_server, served_directory, tmp_path, b"0123456789"
+    )
+    (served_directory / "table.xlsx").write_bytes(b"abcdefghij")
+
+    download_new_file(f"{http_server}/table.xlsx", to_path, resume=True)
+
+    assert [code for _, code in http_request_log] == [200, 200]
+    assert Path(to_path).read_bytes() == b"abcdefghij"
+
+
+def test_resumed_download_sent_from_another_byte_starts_again(
+    http_server: str,
+    served_directory: Path,
+    tmp_path: Path,
+    stand_in_server: ThreadingHTTPServer,
+    http_request_log: list,
+) -> None:
+    content = b"0123456789"
+    to_path = _interrupted_download(http_server, served_directory, tmp_path, content)
+    handler_class = stand_in_server.RequestHandlerClass.func  # type: ignore[attr-defined]
+    send_range_head = handler_class._send_range_head
+
+    def send_range_from_start(handler: Any, file_path: str, range_header: str) -> Any:
+        # A server that ignores the first byte asked for.
+        return send_range_head(handler, file_path, "bytes=0-")
+
+    with patch.object(handler_class, "_send_range_head", send_range_from_start):
+        file_hash = download_new_file(f"{http_server}/table.xlsx", to_path, resume=True)
+
+    assert [code for _, code in http_request_log] == [200, 206, 200]
+    assert Path(to_path).read_bytes() == content
+    assert file_hash == hashlib.sha256(content).hexdigest()
+
+
+def test_resumed_download_with_complete_partial_file_starts_again(
+    http_server: str,
+    served_directory: Path,
+    tmp_path: Path,
+    http_request_log: list,
+) -> None:
+    (served_directory / "table.xlsx").write_bytes(b"content")
+    to_path = str(tmp_path / "table.xlsx")
+    Path(to_path + ".tmp").write_bytes(b"too much content")
+
+    download_new_file(f"{http_server}/table.xlsx", to_path, resume=True)
+
+    assert [code for _, code in http_request_log] == [416, 200]
+    assert Path(to_path).read_bytes() == b"content"
+
+
+def test_download_with_unexpected_hash_is_discarded(
+    http_server: str, served_directory: Path, tmp_path: Path
+) -> None:
+    (served_directory / "table.xlsx").write_bytes(b"content")
+    to_path = str(tmp_path / "table.xlsx")
+
+    with pytest.raises(InvalidFileError):
+        download_new_file(
+            f"{http_server}/table.xlsx", to_path, resume=True, expected_hash="0" * 64
+        )
+
+    assert sorted(os.listdir(tmp_path)) == ["served"]
+
+
+def test_download_new_file_with_expected_hash(
+    http_server: str, served_directory: Path, tmp_path: Path
+) -> None:
+    (served_directory / "table.xlsx").write_bytes(b"content")
+    to_path = str(tmp_path / "table.xlsx")
+
+    download_new_file(
+        f"{http_server}/table.xlsx",
+        to_path,
+        stream=True,
+        expected_hash=hashlib.sha256(b"content").hexdigest(),
+    )
+
+    assert Path(to_path).read_bytes() == b"content"
+
+
+def test_failed_download_without_resume_leaves_no_partial_file(
+    http_server: str, served_directory: Path, tmp_path: Path
+) -> None:
+    (served_directory / "table.xlsx").write_bytes(b"0123456789")
+
+    def _fail_half_way(chunk_size: int) -> Iterator[bytes]:
+        yield b"01234"
+        raise requests.ConnectionError("connection reset")
+
+    with patch(
+        "util_lib.file.requests.Response.iter_content", side_effect=_fail_half_way
+    ):
+        with pytest.raises(requests.ConnectionError):
+            download_new_file(
+                f"{http_server}/table.xlsx", str(tmp_path / "table.xlsx"), stream=True
+            )
+
+    assert sorted(os.listdir(tmp_path)) == ["served"]
+
+
+def test_download_file_resumes_into_temporary_file(
+    http_server: str,
+    served_directory: Path,
+    tmp_path: Path,
+    http_request_log: list,
+) -> None:
+    content = b"0123456789"
+    to_path = _interrupted_download(http_server, served_directory, tmp_path, content)
+
+    download_file(
+        f"{http_server}/table.xlsx",
+        to_path,
+        resume=True,
+        expected_hash=hashlib.sha256(content).hexdigest(),
+    )
+
+    assert [code for _, code in http_request_log] == [200, 206]
+    assert Path(to_path).read_bytes() == content
+    assert sorted(os.listdir(tmp_path)) == ["served", "table.xlsx"]
+
+
+def test_download_new_file_keeps_every_version_in_blob_store(
+    http_server: str, served_directory: Path, tmp_path: Path
+) -> None:
+    blob_store = BlobStore(str(tmp_path / "blobs"))
+    to_path = str(tmp_path / "table.xlsx")
+
+    (served_directory / "table.xlsx").write_bytes(b"content")
+    first_hash = download_new_file(
+        f"{http_server}/table.xlsx", to_path, stream=True, blob_store=blob_store
+    )
+    (served_directory / "table.xlsx").write_bytes(b"new content")
+    second_hash = download_new_file(
+        f"{http_server}/table.xlsx", to_path, stream=True, blob_store=blob_store
+    )
+
+    assert Path(to_path).read_bytes() == b"new content"
+    assert blob_store.history(to_path) == [first_hash, second_hash]
+    assert Path(blob_store.blob_path(first_hash)).read_bytes() == b"content"
+    assert not os.path.exists(to_path + ".tmp")
+
+
+def test_download_new_file_takes_existing_hash_from_blob_store(
+    http_server: str, served_directory: Path, tmp_path: Path
+) -> None:
+    blob_store = BlobStore(str(tmp_path / "blobs"))
+    to_path = str(tmp_path / "table.xlsx")
+    (served_directory / "table.xlsx").write_bytes(b"content")
+    download_new_file(
+        f"{http_server}/table.xlsx", to_path, stream=True, blob_store=blob_store
+    )
+
+    with patch("util_lib.file.hashlib.new", wraps=hashlib.new) as mock_new:
+        download_new_file(
+            f"{http_server}/table.xlsx", to_path, stream=True, blob_store=blob_store
+        )
+
+    assert mock_new.call_count == 1
+    assert blob_store.history(to_path) == [hashlib.sha256(b"content").hexdigest()]
+    assert not os.path.exists(to_path + ".tmp")
+
+
+def test_calculate_file_hash_recalculates_modified_file(tmp_path: Path) -> None:
+    blob_store = BlobStore(str(tmp_path / "blobs"))
+    file_path = tmp_path / "table.xlsx"
+    file_path.write_bytes(b"content")
+    calculate_file_hash(str(file_path), blob_store=blob_store)
+
+    file_path.write_bytes(b"new content")
+
+    assert calculate_file_hash(str(file_path), blob_store=blob_store) == (
+        hashlib.sha256(b"new content").hexdigest()
+    )
+
+
+def test_download_new_file_rejects_blob_store_with_other_algorithm(
+    tmp_path: Path,
+) -> None:
+    with pytest.raises(ValueError):
+        download_new_file(
+            "http://example.com/table.xlsx",
+            str(tmp_path / "table.xlsx"),
+            hash_algorithm="md5",
+            blob_store=BlobStore(str(tmp_path / "blobs")),
+        )
@@ -0,0 +1,223 @@
+"""
+Tests for the ingest module, run against a local stand-in HTTP server.
+"""
+
+import json
+from pathlib import Path
+from typing import Any, Dict
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from util_lib.error import InvalidFileError
+from util_lib.ingest import (
+    UNCHANGED,
+    UPDATED,
+    apply_transforms,
+    ingest,
+    load_ingestion_spec,
+    validate_ingestion_spec_files,
+)
+from util_lib.store import read_dataset
+
+
+def _write_workbook(path: Path, offset: int = 0) -> None:
+    with pd.ExcelWriter(path) as writer:
+        pd.DataFrame(
+            {"Registration Week": [1, 2, 3], "Deaths": [300 + offset, 301, 302]}
+        ).to_excel(writer, sheet_name="Table 1", index=False)
+        pd.DataFrame({"Month": ["Jan", "Feb"], "Births": [1900, 1800]}).to_excel(
+            writer, sheet_name="Table 2", index=False
+        )
+
+
+def _ingestion_spec(base_url: str, tmp_path: Path) -> Dict[str, Any]:
+    return {
+        "sources": [
+            {
+                "url": f"{base_url}/weekly.xlsx",
+                "dest_filepath": str(tmp_path / "raw" / "weekly.xlsx"),
+                "worksheets": [
+                    {
+                        "dataset_filepath": str(tmp_path / "data" / "deaths.arrow"),
+                        "worksheet_name": "Table 1",
+                        "num_rows_to_read": 3,
+                        "transforms": [
+                            {
+                                "name": "rename_columns",
+                                "params": {
+                                    "column_mapping": {
+                                        "Registration Week": "Registration_Week"
+                                    }
+                                },
+                            }
+                        ],
+                    },
+                    {
+                        "dataset_filepath": str(tmp_path / "data" / "births.arrow"),
+                        "worksheet_name": "Table 2",
+                        "num_rows_to_read": 2,
+                    },
+                ],
+            }
+        ]
+    }
+
+
+@pytest.fixture
+def weekly_workbook(served_directory: Path) -> Path:
+    workbook_path = served_directory / "weekly.xlsx"
+    _write_workbook(workbook_path)
+    return workbook_path
+
+
+def test_first_run_ingests_every_worksheet(
+    http_server: str, weekly_workbook: Path, tmp_path: Path
+) -> None:
+    results = ingest(
+        _ingestion_spec(http_server, tmp_path), str(tmp_path / "state.json")
+    )
+
+    assert results == {
+        str(tmp_path / "data" / "deaths.arrow"): UPDATED,
+        str(tmp_path / "data" / "births.arrow"): UPDATED,
+    }
+    deaths_df = read_dataset(str(tmp_path / "data" / "deaths.arrow"))
+    assert deaths_df.columns.tolist() == ["Registration_Week", "Deaths"]
+    assert deaths_df["Deaths"].tolist() == [300, 301, 302]
+
+
+def test_unchanged_source_is_not_parsed_again(
+    http_server: str, weekly_workbook: Path, tmp_path: Path
+) -> None:
+    ingestion_spec = _ingestion_spec(http_server, tmp_path)
+    state_file = str(tmp_path / "state.json")
+    ingest(ingestion_spec, state_file)
+
+    with patch("util_lib.ingest.read_worksheet_into_df") as mock_read_worksheet:
+        results = ingest(ingestion_spec, state_file)
+
+    mock_read_worksheet.assert_not_called()
+    assert set(results.values()) == {UNCHANGED}
+
+
+def test_changed_source_is_parsed_again(
+    http_server: str, weekly_workbook: Path, tmp_path: Path
+) -> None:
+    ingestion_spec = _ingestion_spec(http_server, tmp_path)
+    state_file = str(tmp_path / "state.json")
+    ingest(ingestion_spec, state_file)
+
+    _write_workbook(weekly_workbook, offset=10)
+    results = ingest(ingestion_spec, state_file)
+
+    assert set(results.values()) == {UPDATED}
+    deaths_df = read_dataset(str(tmp_path / "data" / "deaths.arrow"))
+    assert deaths_df["Deaths"].tolist() == [310, 301, 302]
+
+
+def test_only_the_changed_worksheet_specification_is_parsed_again(
+    http_server: str, weekly_workbook: Path, tmp_path: Path
+) -> None:
+    ingestion_spec = _ingestion_spec(http_server, tmp_path)
+    state_file = str(tmp_path / "state.json")
+    ingest(ingestion_spec, state_file)
+
+    ingestion_spec["sources"][0]["worksheets"][1]["num_rows_to_read"] = 1
+    results = ingest(ingestion_spec, state_file)
+
+    assert results == {
+        str(tmp_path / "data" / "deaths.arrow"): UNCHANGED,
+        str(tmp_path / "data" / "births.arrow"): UPDATED,
+    }
+    assert len(read_dataset(str(tmp_path / "data" / "births.arrow"))) == 1
+
+
+def test_missing_dataset_is_rebuilt(
+    http_server: str, weekly_workbook: Path, tmp_path: Path
+) -> None:
+    ingestion_spec = _ingestion_spec(http_server, tmp_path)
+    state_file = str(tmp_path / "state.json")
+    ingest(ingestion_spec, state_file)
+
+    (tmp_path / "data" / "births.arrow").unlink()
+    results = ingest(ingestion_spec, state_file)
+
+    assert results[str(tmp_path / "data" / "births.arrow")] == UPDATED
+
+
+def test_ingest_optimised(
+    http_server: str, weekly_workbook: Path, tmp_path: Path
+) -> None:
+    ingestion_spec = _ingestion_spec(http_server, tmp_path)
+    state_file = str(tmp_path / "state.json")
+    ingest(ingestion_spec, state_file)
+
+    results = ingest(ingestion_spec, state_file, optimise=True)
+
+    assert set(results.values()) == {UPDATED}
+    deaths_df = read_dataset(str(tmp_path / "data" / "deaths.arrow"))
+    assert deaths_df["Deaths"].dtype == "int32"
+
+
+def test_load_valid_ingestion_spec(tmp_path: Path) -> None:
+    spec_file = tmp_path / "spec.json"
+    spec_file.write_text(
+        json.dumps(_ingestion_spec("http://example.com", tmp_path)), encoding="UTF-8"
+    )
+
+    assert load_ingestion_spec(str(spec_file))["sources"][0]["url"] == (
+        "http://example.com/weekly.xlsx"
+    )
+
+
+def test_load_ingestion_spec_with_unknown_transform(tmp_path: Path) -> None:
+    ingestion_spec = _ingestion_spec("http://example.com", tmp_path)
+    ingestion_spec["sources"][0]["worksheets"][0]["transforms"] = [
+        {"name": "drop_everything"}
+    ]
+    spec_file = tmp_path / "spec.json"
+    spec_file.write_text(json.dumps(ingestion_spec), encoding="UTF-8")
+
+    with pytest.raises(InvalidFileError):
+        load_ingestion_spec(str(spec_file))
+
+
+def test_apply_transforms_in_order() -> None:
+    input_df = pd.DataFrame({"Deaths": ["12a", "13b"]})
+
+    output_df = apply_transforms(
+        input_df,
+        [
+            {"name": "extract_and_cast_as_int", "params": {"column": "Deaths"}},
+            {"name": "rename_columns", "params": {"column_mapping": {"Deaths": "D"}}},
+        ],
+    )
+
+    assert output_df["D"].tolist() == [12, 13]
+
+
+def test_validate_ingestion_spec_files(tmp_path: Path) -> None:
+    valid_spec = _ingestion_spec("http://example.com", tmp_path)
+    invalid_spec = _ingestion_spec("ftp://example.com", tmp_path)
+    invalid_spec["sources"][0]["worksheets"][0]["transforms"] = [
+        {"name": "drop_everything"}
+    ]
+    spec_files = [str(tmp_path / "valid.json"), str(tmp_path / "invalid.json")]
+    for spec_file, ingestion_spec in zip(spec_files, [valid_spec, invalid_spec]):
+        Path(spec_file).write_text(json.dumps(ingestion_spec), encoding="UTF-8")
+
+    results = validate_ingestion_spec_files(spec_files)
+
+    assert results[0].is_valid
+    assert len(results[1].errors) == 2
+
+
+def test_each_source_workbook_is_opened_once(
+    http_server: str, weekly_workbook: Path, tmp_path: Path
+) -> None:
+    with patch("util_lib.workbook.pd.ExcelFile", wraps=pd.ExcelFile) as mock_open:
+        ingest(_ingestion_spec(http_server, tmp_path), str(tmp_path / "state.json"))
+
+    mock_open.assert_called_once()
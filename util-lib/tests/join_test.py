@@ -0,0 +1,155 @@
+"""
+Tests for the join module.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from pandas import DataFrame
+
+from util_lib.join import JoinIndex, join_all
+
+
+def _deaths_df() -> DataFrame:
+    return pd.DataFrame(
+        {"Registration Week": [3, 1, 2, 5], "Deaths": [300, 310, 295, 305]}
+    )
+
+
+def _population_df() -> DataFrame:
+    return pd.DataFrame(
+        {
+            "Registration Week": [1, 2, 3, 4],
+            "Population": [1900, 1901, 1902, 1903],
+            "Region": ["NI", "NI", "NI", "NI"],
+        }
+    )
+
+
+def _merge_all(input_df: DataFrame, dimension_dfs: list[DataFrame]) -> DataFrame:
+    for dimension_df in dimension_dfs:
+        input_df = pd.merge(input_df, dimension_df, on="Registration Week")
+    return input_df
+
+
+def test_join_matches_merge() -> None:
+    join_index = JoinIndex(_population_df(), "Registration Week", ["Population"])
+
+    actual_df = join_index.join(_deaths_df())
+
+    pd.testing.assert_frame_equal(
+        actual_df,
+        _merge_all(
+            _deaths_df(), [_population_df()[["Registration Week", "Population"]]]
+        ),
+    )
+    assert actual_df["Registration Week"].tolist() == [3, 1, 2]
+
+
+def test_join_sorted_keys() -> None:
+    input_df = _deaths_df().sort_values("Registration Week")
+    join_index = JoinIndex(_population_df(), "Registration Week")
+
+    assert join_index.is_sorted()
+    assert join_index.positions(input_df["Registration Week"]).tolist() == [
+        0,
+        1,
+        2,
+        -1,
+    ]
+    pd.testing.assert_frame_equal(
+        join_index.join(input_df), _merge_all(input_df, [_population_df()])
+    )
+
+
+def test_join_aligned_keys() -> None:
+    input_df = pd.DataFrame(
+        {"Registration Week": [1, 2, 3, 4], "Deaths": [1, 2, 3, 4]}, index=[5, 6, 7, 8]
+    )
+    join_index = JoinIndex(_population_df(), "Registration Week")
+
+    assert join_index.positions(input_df["Registration Week"]).tolist() == [0, 1, 2, 3]
+    pd.testing.assert_frame_equal(
+        join_index.join(input_df), _merge_all(input_df, [_population_df()])
+    )
+
+
+def test_join_string_keys_are_not_sorted() -> None:
+    join_index = JoinIndex(pd.DataFrame({"Year": ["2023", "2024"]}), "Year")
+
+    assert not join_index.is_sorted()
+    assert join_index.positions(pd.Series(["2024", "2025"])).tolist() == [1, -1]
+
+
+def test_join_all_matches_merges() -> None:
+    vaccinations_df = pd.DataFrame(
+        {"Registration Week": [5, 3, 2, 1], "Doses": [10.5, 20.5, 30.5, 40.5]}
+    )
+
+    actual_df = join_all(
+        _deaths_df(),
+        [
+            JoinIndex(_population_df(), "Registration Week"),
+            JoinIndex(vaccinations_df, "Registration Week"),
+        ],
+    )
+
+    pd.testing.assert_frame_equal(
+        actual_df, _merge_all(_deaths_df(), [_population_df(), vaccinations_df])
+    )
+
+
+def test_join_all_with_repeated_column_names_matches_merges() -> None:
+    other_population_df = _population_df().drop(columns="Region")
+
+    actual_df = join_all(
+        _deaths_df(),
+        [
+            JoinIndex(_population_df(), "Registration Week"),
+            JoinIndex(other_population_df, "Registration Week"),
+        ],
+    )
+
+    assert list(actual_df.columns) == [
+        "Registration Week",
+        "Deaths",
+        "Population_x",
+        "Region",
+        "Population_y",
+    ]
+    pd.testing.assert_frame_equal(
+        actual_df, _merge_all(_deaths_df(), [_population_df(), other_population_df])
+    )
+
+
+def test_join_duplicate_dimension_keys_matches_merge() -> None:
+    dimension_df = pd.DataFrame({"Registration Week": [1, 1, 3], "Source": list("abc")})
+    join_index = JoinIndex(dimension_df, "Registration Week")
+
+    pd.testing.assert_frame_equal(
+        join_index.join(_deaths_df()), _merge_all(_deaths_df(), [dimension_df])
+    )
+    with pytest.raises(ValueError):
+        join_index.positions(pd.Series([1]))
+
+
+def test_join_different_key_dtypes_matches_merge() -> None:
+    dimension_df = _population_df().astype({"Registration Week": np.float64})
+
+    pd.testing.assert_frame_equal(
+        JoinIndex(dimension_df, "Registration Week").join(_deaths_df()),
+        _merge_all(_deaths_df(), [dimension_df]),
+    )
+
+
+def test_join_leaves_input_unchanged() -> None:
+    input_df = _deaths_df()
+
+    JoinIndex(_population_df(), "Registration Week").join(input_df)
+
+    pd.testing.assert_frame_equal(input_df, _deaths_df())
+
+
+def test_join_index_missing_column() -> None:
+    with pytest.raises(KeyError):
+        JoinIndex(_population_df(), "Registration Week", ["Missing"])
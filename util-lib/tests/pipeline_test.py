@@ -0,0 +1,217 @@
+"""
+Tests for the pipeline module.
+"""
+
+import pandas as pd
+import pytest
+from pandas import DataFrame
+
+from util_lib.dataframe import (
+    add_week_ending_date,
+    convert_column_to_string,
+    convert_obj_to_string,
+    extract_and_cast_as_int,
+    fill_zeros,
+    inner_join_with,
+    rename_columns,
+)
+from util_lib.join import JoinIndex
+from util_lib.pipeline import Pipeline
+
+
+def _weekly_df() -> DataFrame:
+    return pd.DataFrame(
+        {
+            "Week Ends (Friday)": [
+                "19 Mar 2020 to 20 Mar 2020",
+                "2020-03-27 00:00:00",
+                "2020-04-03",
+            ],
+            "Registration Week": [12, 13, 14],
+            "Deaths": ["300a", "301", "302b"],
+            "Notes": ["x", "y", "z"],
+            "Average": [1.5, 0.0, 2.5],
+        }
+    )
+
+
+def _population_df() -> DataFrame:
+    return pd.DataFrame(
+        {"Registration Week": [12, 13, 15], "Population": [1900, 1901, 1902]}
+    )
+
+
+def test_collect_matches_eager_transforms() -> None:
+    weekly_df = _weekly_df()
+
+    expected_df = rename_columns(weekly_df, {"Week Ends (Friday)": "Week_End"})
+    expected_df = convert_obj_to_string(input_df=expected_df)
+    expected_df = add_week_ending_date(
+        input_df=expected_df,
+        default_date="2020-03-20",
+        existing_week_end_date_col_name="Week_End",
+    )
+    expected_df = extract_and_cast_as_int(input_df=expected_df, column="Deaths")
+    expected_df = fill_zeros(input_df=expected_df, column="Average")
+    expected_df = inner_join_with(
+        expected_df,
+        _population_df(),
+        ["Registration Week", "Population"],
+        "Registration Week",
+    )
+
+    actual_df = (
+        Pipeline(weekly_df)
+        .rename_columns(column_mapping={"Week Ends (Friday)": "Week_End"})
+        .convert_obj_to_string()
+        .add_week_ending_date(
+            default_date="2020-03-20", existing_week_end_date_col_name="Week_End"
+        )
+        .extract_and_cast_as_int(column="Deaths")
+        .fill_zeros(column="Average")
+        .inner_join_with(
+            _population_df(), ["Registration Week", "Population"], "Registration Week"
+        )
+        .collect()
+    )
+
+    pd.testing.assert_frame_equal(actual_df, expected_df)
+
+
+def test_collect_leaves_input_unchanged() -> None:
+    weekly_df = _weekly_df()
+
+    Pipeline(weekly_df).extract_and_cast_as_int(column="Deaths").fill_zeros(
+        column="Average"
+    ).collect()
+
+    pd.testing.assert_frame_equal(weekly_df, _weekly_df())
+
+
+def test_unused_columns_and_steps_are_pruned() -> None:
+    pipeline = (
+        Pipeline(_weekly_df())
+        .rename_columns(column_mapping={"Week Ends (Friday)": "Week_End"})
+        .convert_obj_to_string()
+        .extract_and_cast_as_int(column="Deaths")
+        .add_week_ending_date(
+            default_date="2020-03-20", existing_week_end_date_col_name="Week_End"
+        )
+        .fill_zeros(column="Average")
+        .select(["Week Ending Date", "Registration Week"])
+    )
+
+    assert pipeline.explain() == [
+        "project(['Week Ends (Friday)', 'Registration Week'])",
+        "rename_columns(column_mapping={'Week Ends (Friday)': 'Week_End'})",
+        "convert_obj_to_string(dtype_mode='str')",
+        "add_week_ending_date(default_date='2020-03-20', "
+        "existing_week_end_date_col_name='Week_End', as_datetime=False)",
+        "select(['Week Ending Date', 'Registration Week'])",
+    ]
+    assert pipeline.collect().to_dict(orient="list") == {
+        "Week Ending Date": ["2020-03-20", "2020-03-27", "2020-04-03"],
+        "Registration Week": [12, 13, 14],
+    }
+
+
+def test_join_keeps_left_columns_that_change_joined_names() -> None:
+    left_df = pd.DataFrame({"Week": [1, 2], "Population": [10, 20], "Other": [0, 0]})
+    right_df = pd.DataFrame({"Week": [1, 2], "Population": [11, 21]})
+
+    pipeline = (
+        Pipeline(left_df)
+        .inner_join_with(right_df, ["Week", "Population"], "Week")
+        .select(["Week", "Population_y"])
+    )
+
+    assert pipeline.explain()[0] == "project(['Week', 'Population'])"
+    assert pipeline.collect()["Population_y"].tolist() == [11, 21]
+
+
+def test_string_conversions_are_fused() -> None:
+    input_df = pd.DataFrame({"a": [1, 2], "b": [1.5, 2.5], "c": ["x", None]})
+
+    pipeline = (
+        Pipeline(input_df)
+        .convert_column_to_string(col_name="a")
+        .convert_column_to_string(col_name="b")
+        .convert_obj_to_string()
+    )
+
+    assert pipeline.explain() == [
+        "convert_column_to_string(col_name='a') + "
+        "convert_column_to_string(col_name='b') + "
+        "convert_obj_to_string(dtype_mode='str')"
+    ]
+    expected_df = convert_obj_to_string(
+        input_df=convert_column_to_string(
+            input_df=convert_column_to_string(input_df=input_df, col_name="a"),
+            col_name="b",
+        )
+    )
+    pd.testing.assert_frame_equal(pipeline.collect(), expected_df)
+
+
+def test_fused_conversion_of_missing_column_raises() -> None:
+    pipeline = (
+        Pipeline(pd.DataFrame({"a": [1]}))
+        .convert_column_to_string(col_name="a")
+        .convert_column_to_string(col_name="missing")
+    )
+
+    with pytest.raises(KeyError):
+        pipeline.collect()
+
+
+def test_unknown_function_stops_pruning() -> None:
+    pipeline = (
+        Pipeline(_weekly_df())
+        .pipe(lambda input_df: input_df.iloc[:, [0, 2]])
+        .extract_and_cast_as_int(column="Deaths")
+        .select(["Deaths"])
+    )
+
+    assert not pipeline.explain()[0].startswith("project")
+    assert pipeline.collect()["Deaths"].tolist() == [300, 301, 302]
+
+
+def test_pipelines_are_immutable() -> None:
+    pipeline = Pipeline(_weekly_df())
+
+    extended_pipeline = pipeline.extract_and_cast_as_int(column="Deaths")
+
+    assert pipeline.explain() == []
+    assert pipeline.collect()["Deaths"].tolist() == ["300a", "301", "302b"]
+    assert extended_pipeline.collect()["Deaths"].tolist() == [300, 301, 302]
+
+
+def test_categorical_conversion_is_not_fused() -> None:
+    input_df = pd.DataFrame({"a": [1, 2], "b": ["x", "x"]})
+
+    pipeline = (
+        Pipeline(input_df)
+        .convert_column_to_string(col_name="a")
+        .convert_obj_to_string(dtype_mode="category")
+    )
+
+    assert len(pipeline.explain()) == 2
+    actual_df = pipeline.collect()
+    assert actual_df["a"].dtype == "category"
+    assert actual_df["b"].tolist() == ["x", "x"]
+
+
+def test_join_all_reads_only_keys_and_joined_columns() -> None:
+    weeks = JoinIndex(_population_df(), "Registration Week")
+
+    pipeline = Pipeline(_weekly_df()).join_all([weeks]).select(["Deaths", "Population"])
+
+    assert pipeline.explain() == [
+        "project(['Registration Week', 'Deaths'])",
+        "join_all(join_indexes=[JoinIndex('Registration Week', ['Population'])])",
+        "select(['Deaths', 'Population'])",
+    ]
+    assert pipeline.collect().to_dict(orient="list") == {
+        "Deaths": ["300a", "301"],
+        "Population": [1900, 1901],
+    }
@@ -1,15 +1,20 @@
 """
 Tests for the primitive module.
 """
+
 import unittest
 from typing import Dict
 
+import numpy as np
+import pandas as pd
 import pytest
 
 from util_lib.primitive import (
     source_target_list_to_dict,
     create_me_a_dict_of_using,
+    convert_each_distinct_value,
     remove_timestamp,
+    remove_timestamps,
 )
 
 
@@ -123,3 +128,51 @@ def test_empty_string() -> None:
     with pytest.raises(ValueError):
         remove_timestamp(empty_string)
 
+
+def test_remove_timestamps_matches_remove_timestamp() -> None:
+    date_strings = [
+        "2024-07-31 14:30:00",
+        "2024-07-31 00:00:00",
+        "2024-7-1 0:0:0",
+        "1500-01-01 00:00:00",
+    ]
+    assert remove_timestamps(date_strings) == [
+        remove_timestamp(date_string) for date_string in date_strings
+    ]
+
+
+def test_remove_timestamps_in_series() -> None:
+    date_strings = pd.Series(["2024-07-31 14:30:00"] * 3, index=[2, 4, 6])
+    expected = pd.Series(["2024-07-31"] * 3, index=[2, 4, 6], dtype=object)
+    pd.testing.assert_series_equal(remove_timestamps(date_strings), expected)
+
+
+@pytest.mark.parametrize(
+    "invalid_input", ["2024-07-31T14:30:00", "Not a date", "", "now", "today"]
+)
+def test_remove_timestamps_invalid_input(invalid_input: str) -> None:
+    with pytest.raises(ValueError):
+        remove_timestamps(np.array(["2024-07-31 14:30:00", invalid_input]))
+
+
+@pytest.mark.parametrize("leap_second", ["2020-12-31 23:59:60", "2020-12-31 23:59:61"])
+def test_remove_timestamps_leap_second(leap_second: str) -> None:
+    with pytest.raises(ValueError, match="second must be in 0..59"):
+        remove_timestamps([leap_second])
+
+
+def test_convert_each_distinct_value_once() -> None:
+    converted_batches = []
+
+    def convert_distinct(distinct_values: np.ndarray) -> np.ndarray:
+        converted_batches.append(list(distinct_values))
+        return np.array([str(value) for value in distinct_values])
+
+    assert convert_each_distinct_value([1, 2, 1, None, 2], convert_distinct) == [
+        "1",
+        "2",
+        "1",
+        "None",
+        "2",
+    ]
+    assert converted_batches == [[1, 2, None]]
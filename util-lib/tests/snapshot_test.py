@@ -0,0 +1,228 @@
+"""
+Tests for the snapshot module.
+"""
+
+from pathlib import Path
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from util_lib.snapshot import (
+    SnapshotStore,
+    apply_delta,
+    compute_delta,
+)
+
+
+def _weekly_deaths(weeks_2023: list, extra_columns: dict | None = None) -> pd.DataFrame:
+    num_weeks = 5
+    weekly_df = pd.DataFrame(
+        {
+            "Registration_Week": range(1, num_weeks + 1),
+            "2022": [310, 320, 330, 340, 350],
+            "2023": pd.array(
+                weeks_2023 + [None] * (num_weeks - len(weeks_2023)), dtype="Int64"
+            ),
+        }
+    )
+    for column, values in (extra_columns or {}).items():
+        weekly_df[column] = values
+    return weekly_df
+
+
+def test_compute_delta_only_includes_changed_rows() -> None:
+    previous_df = _weekly_deaths([300, 301])
+    current_df = _weekly_deaths([300, 305, 302])
+
+    delta = compute_delta("2023-W03", previous_df, current_df)
+
+    assert delta.upserted_rows.index.tolist() == [1, 2]
+    assert delta.deleted_rows == []
+    assert delta.added_columns.columns.tolist() == []
+    assert delta.dropped_columns == []
+
+
+def test_compute_delta_treats_missing_values_as_equal() -> None:
+    previous_df = _weekly_deaths([300])
+
+    delta = compute_delta("2023-W02", previous_df, previous_df.copy())
+
+    assert delta.upserted_rows.empty
+
+
+def test_compute_delta_columns_added_dropped_and_retyped() -> None:
+    previous_df = _weekly_deaths([300], {"Old": ["a"] * 5})
+    current_df = _weekly_deaths([300], {"Mean": [1.5] * 5})
+    current_df["2022"] = current_df["2022"].astype("Int64")
+
+    delta = compute_delta("2023-W02", previous_df, current_df)
+
+    assert delta.added_columns.columns.tolist() == ["2022", "Mean"]
+    assert delta.dropped_columns == ["2022", "Old"]
+    assert delta.upserted_rows.columns.tolist() == ["Registration_Week", "2023"]
+
+
+def test_compute_delta_requires_unique_index() -> None:
+    previous_df = _weekly_deaths([300]).set_index(pd.Index([0, 0, 1, 2, 3]))
+
+    with pytest.raises(ValueError):
+        compute_delta("2023-W02", previous_df, _weekly_deaths([300]))
+
+
+def test_apply_delta_rebuilds_current_snapshot() -> None:
+    previous_df = _weekly_deaths([300, 301], {"Old": ["a"] * 5})
+    current_df = pd.concat(
+        [_weekly_deaths([300, 305, 302], {"Mean": [1.5] * 5}).drop(index=[0])]
+        + [pd.DataFrame({"Registration_Week": [6], "2022": [360]}, index=[5])]
+    )
+    current_df["2023"] = current_df["2023"].astype("Int64")
+
+    delta = compute_delta("2023-W03", previous_df, current_df)
+
+    pd.testing.assert_frame_equal(apply_delta(previous_df, delta), current_df)
+
+
+def test_apply_delta_keeps_rows_inserted_mid_frame_in_place() -> None:
+    previous_df = _weekly_deaths([300, 301]).drop(index=[2])
+    current_df = _weekly_deaths([300, 301])
+
+    delta = compute_delta("2023-W02", previous_df, current_df)
+    rebuilt_df = apply_delta(previous_df, delta)
+
+    assert rebuilt_df.index.tolist() == [0, 1, 2, 3, 4]
+    pd.testing.assert_frame_equal(rebuilt_df, current_df)
+
+
+def test_apply_delta_reorders_rows() -> None:
+    previous_df = _weekly_deaths([300, 301])
+    current_df = previous_df.iloc[::-1]
+
+    delta = compute_delta("2023-W02", previous_df, current_df)
+
+    assert delta.upserted_rows.empty
+    pd.testing.assert_frame_equal(apply_delta(previous_df, delta), current_df)
+
+
+def test_store_rebuilds_reordered_snapshot_from_disk(tmp_path: Path) -> None:
+    snapshot_store = SnapshotStore(str(tmp_path))
+    snapshot_store.append("2023-W01", _weekly_deaths([300]).drop(index=[1]))
+    snapshot_store.append("2023-W02", _weekly_deaths([300, 301]).iloc[::-1])
+
+    pd.testing.assert_frame_equal(
+        SnapshotStore(str(tmp_path)).load("2023-W02"),
+        _weekly_deaths([300, 301]).iloc[::-1],
+    )
+
+
+def test_compute_delta_omits_row_order_of_appended_rows() -> None:
+    previous_df = _weekly_deaths([300]).iloc[:3]
+    current_df = _weekly_deaths([300, 301]).iloc[1:]
+
+    delta = compute_delta("2023-W02", previous_df, current_df)
+
+    assert delta.deleted_rows == [0]
+    assert delta.index_order is None
+
+
+def test_store_keeps_date_index_out_of_snapshot_index(tmp_path: Path) -> None:
+    weeks = pd.date_range("2023-01-06", periods=5, freq="W-FRI", name="Week_End")
+    first_df = _weekly_deaths([300]).set_axis(weeks)
+    second_df = _weekly_deaths([300, 301]).set_axis(weeks).drop(index=weeks[0])
+
+    snapshot_store = SnapshotStore(str(tmp_path))
+    snapshot_store.append("2023-W01", first_df)
+    snapshot_store.append("2023-W02", second_df.iloc[::-1])
+
+    assert "2023-01-06" not in (tmp_path / "snapshots.json").read_text(encoding="UTF-8")
+    pd.testing.assert_frame_equal(
+        SnapshotStore(str(tmp_path)).load("2023-W02"),
+        second_df.iloc[::-1],
+        check_freq=False,
+    )
+
+
+def test_store_failed_append_leaves_store_unchanged(tmp_path: Path) -> None:
+    snapshot_store = SnapshotStore(str(tmp_path))
+    snapshot_store.append("2023-W01", _weekly_deaths([300]))
+
+    with patch("util_lib.snapshot.write_dataset", side_effect=OSError("disk full")):
+        with pytest.raises(OSError):
+            snapshot_store.append("2023-W02", _weekly_deaths([300, 301]))
+
+    assert snapshot_store.periods() == ["2023-W01"]
+    assert SnapshotStore(str(tmp_path)).periods() == ["2023-W01"]
+
+
+@pytest.fixture
+def weekly_store(tmp_path: Path) -> SnapshotStore:
+    weekly_store = SnapshotStore(str(tmp_path), cache_size=2)
+    weekly_store.append("2023-W01", _weekly_deaths([300]))
+    weekly_store.append("2023-W02", _weekly_deaths([300, 301]))
+    weekly_store.append(
+        "2023-W03", _weekly_deaths([300, 301, 302], {"Mean": [1.5] * 5})
+    )
+    return weekly_store
+
+
+def test_store_rebuilds_every_snapshot_from_disk(
+    weekly_store: SnapshotStore, tmp_path: Path
+) -> None:
+    reopened_store = SnapshotStore(str(tmp_path))
+
+    assert reopened_store.periods() == ["2023-W01", "2023-W02", "2023-W03"]
+    pd.testing.assert_frame_equal(
+        reopened_store.load("2023-W01"), _weekly_deaths([300])
+    )
+    pd.testing.assert_frame_equal(
+        reopened_store.load("2023-W03"),
+        _weekly_deaths([300, 301, 302], {"Mean": [1.5] * 5}),
+    )
+
+
+def test_store_changes_since_previous_snapshot(weekly_store: SnapshotStore) -> None:
+    delta = weekly_store.changes("2023-W02")
+
+    assert delta.upserted_rows.index.tolist() == [1]
+    assert delta.upserted_rows["2023"].tolist() == [301]
+    assert delta.added_columns.empty
+
+
+def test_store_rejects_out_of_order_period(weekly_store: SnapshotStore) -> None:
+    with pytest.raises(ValueError):
+        weekly_store.append("2023-W02", _weekly_deaths([300, 301]))
+
+
+def test_store_load_unknown_period(weekly_store: SnapshotStore) -> None:
+    with pytest.raises(KeyError):
+        weekly_store.load("2022-W52")
+
+
+def test_store_load_returns_a_copy(weekly_store: SnapshotStore) -> None:
+    loaded_df = weekly_store.load("2023-W02")
+    loaded_df["2022"] = 0
+
+    assert weekly_store.load("2023-W02")["2022"].tolist() == [310, 320, 330, 340, 350]
+
+
+def test_store_evicts_least_recently_used(tmp_path: Path) -> None:
+    weekly_store = SnapshotStore(str(tmp_path), cache_size=1)
+    weekly_store.append("2023-W01", _weekly_deaths([300]))
+    weekly_store.append("2023-W02", _weekly_deaths([300, 301]))
+
+    reopened_store = SnapshotStore(str(tmp_path), cache_size=1)
+    reopened_store.load("2023-W02")
+    assert reopened_store.cached_periods() == ["2023-W02"]
+
+    reopened_store.load("2023-W01")
+    assert reopened_store.cached_periods() == ["2023-W01"]
+
+    pd.testing.assert_frame_equal(
+        reopened_store.load("2023-W02"), _weekly_deaths([300, 301])
+    )
+
+
+def test_store_keeps_recently_used_snapshots(weekly_store: SnapshotStore) -> None:
+    weekly_store.load("2023-W02")
+
+    assert weekly_store.cached_periods() == ["2023-W03", "2023-W02"]
@@ -0,0 +1,159 @@
+"""
+Tests for the store module.
+"""
+
+import logging
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from util_lib.store import (
+    write_dataset,
+    read_dataset,
+    dataset_path_for,
+    convert_pickle_to_dataset,
+    convert_pickle_directory,
+)
+
+
+def _create_sample_df() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Registration_Week": [1, 2, 3],
+            "2023": pd.array([310, None, 295], dtype="Int64"),
+            "2015_to_2019_Mean": [301.2, 299.8, 287.4],
+            "Week Ending Date": ["2023-01-06", "2023-01-13", "2023-01-20"],
+        }
+    )
+
+
+def test_write_and_read_dataset_round_trip(tmp_path: Path) -> None:
+    input_df = _create_sample_df()
+    dataset_file = str(tmp_path / "deaths" / "AllDeaths.arrow")
+
+    write_dataset(input_df, dataset_file)
+    actual_df = read_dataset(dataset_file)
+
+    pd.testing.assert_frame_equal(actual_df, input_df)
+    assert not Path(dataset_file + ".tmp").exists()
+
+
+def test_read_dataset_preserves_non_default_index(tmp_path: Path) -> None:
+    input_df = _create_sample_df().set_index("Registration_Week")
+    dataset_file = str(tmp_path / "indexed.arrow")
+
+    write_dataset(input_df, dataset_file)
+
+    pd.testing.assert_frame_equal(read_dataset(dataset_file), input_df)
+
+
+def test_read_dataset_memory_mapped_columns_are_not_copied(tmp_path: Path) -> None:
+    input_df = pd.DataFrame({"count": np.arange(1000, dtype=np.int64)})
+    dataset_file = str(tmp_path / "counts.arrow")
+    write_dataset(input_df, dataset_file)
+
+    actual_df = read_dataset(dataset_file)
+
+    assert not actual_df["count"].to_numpy().flags.owndata
+
+
+def test_read_dataset_without_memory_map(tmp_path: Path) -> None:
+    input_df = _create_sample_df()
+    dataset_file = str(tmp_path / "AllDeaths.arrow")
+    write_dataset(input_df, dataset_file)
+
+    pd.testing.assert_frame_equal(
+        read_dataset(dataset_file, memory_map=False), input_df
+    )
+
+
+def test_read_missing_dataset(tmp_path: Path) -> None:
+    with pytest.raises(FileNotFoundError):
+        read_dataset(str(tmp_path / "missing.arrow"))
+
+
+def test_dataset_path_for() -> None:
+    assert (
+        dataset_path_for("data/deaths/AllDeaths.pkl") == "data/deaths/AllDeaths.arrow"
+    )
+
+
+def test_convert_pickle_to_dataset(tmp_path: Path) -> None:
+    input_df = _create_sample_df()
+    pickle_file = str(tmp_path / "AllDeaths.pkl")
+    input_df.to_pickle(pickle_file)
+
+    dataset_file = convert_pickle_to_dataset(pickle_file)
+
+    assert dataset_file == str(tmp_path / "AllDeaths.arrow")
+    pd.testing.assert_frame_equal(read_dataset(dataset_file), input_df)
+
+
+def test_convert_pickle_to_dataset_optimised(tmp_path: Path) -> None:
+    input_df = _create_sample_df()
+    pickle_file = str(tmp_path / "AllDeaths.pkl")
+    input_df.to_pickle(pickle_file)
+
+    dataset_file = convert_pickle_to_dataset(pickle_file, optimise=True)
+
+    actual_df = read_dataset(dataset_file)
+    assert actual_df.dtypes.astype(str).to_list() == [
+        "int32",
+        "Int32",
+        "float64",
+        "object",
+    ]
+    pd.testing.assert_frame_equal(actual_df.astype(input_df.dtypes.to_dict()), input_df)
+
+
+def test_convert_pickle_to_dataset_logs_retyped_columns(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    input_df = pd.DataFrame(
+        {"Mean": pd.Series([301.2, pd.NA], dtype=object), "Week": [1, 2]}
+    )
+    pickle_file = str(tmp_path / "AllDeaths.pkl")
+    input_df.to_pickle(pickle_file)
+
+    with caplog.at_level(logging.WARNING, logger="util_lib.store"):
+        dataset_file = convert_pickle_to_dataset(pickle_file)
+
+    assert read_dataset(dataset_file)["Mean"].dtype == np.float64
+    assert "Column 'Mean': object -> float64" in caplog.text
+    assert "Week" not in caplog.text
+
+
+def test_write_dataset_optimised_categorical_round_trip(tmp_path: Path) -> None:
+    input_df = pd.DataFrame({"Year": ["2023", "2024"] * 3, "Week": range(6)})
+    dataset_file = str(tmp_path / "Years.arrow")
+
+    write_dataset(input_df, dataset_file, optimise=True)
+    actual_df = read_dataset(dataset_file)
+
+    assert actual_df["Year"].dtype == "category"
+    assert actual_df["Week"].dtype == np.int32
+    assert actual_df["Year"].tolist() == input_df["Year"].tolist()
+
+
+def test_convert_pickle_that_is_not_a_dataframe(tmp_path: Path) -> None:
+    pickle_file = str(tmp_path / "series.pkl")
+    pd.Series([1, 2, 3]).to_pickle(pickle_file)
+
+    with pytest.raises(ValueError) as value_error:
+        convert_pickle_to_dataset(pickle_file)
+    assert "does not contain a dataframe" in str(value_error.value)
+
+
+def test_convert_pickle_directory(tmp_path: Path) -> None:
+    (tmp_path / "births").mkdir()
+    _create_sample_df().to_pickle(tmp_path / "AllDeaths.pkl")
+    _create_sample_df().to_pickle(tmp_path / "births" / "AllBirths.pkl")
+
+    dataset_files = convert_pickle_directory(str(tmp_path))
+
+    assert dataset_files == [
+        str(tmp_path / "AllDeaths.arrow"),
+        str(tmp_path / "births" / "AllBirths.arrow"),
+    ]
@@ -0,0 +1,163 @@
+"""
+Tests for the workbook module.
+"""
+
+from pathlib import Path
+from typing import Iterator
+from unittest.mock import patch
+
+import pandas as pd
+import pytest
+
+from util_lib.workbook import (
+    WorkbookSession,
+    available_excel_engines,
+    column_range_to_indices,
+    select_excel_engine,
+)
+
+resources_dir = Path(__file__).parent / "resources"
+valid_workbook = resources_dir / "dataframe_test" / "valid_workbook.xlsx"
+
+
+@pytest.fixture(scope="module", params=[8, 0], ids=["cached", "streamed"])
+def workbook(request: pytest.FixtureRequest) -> Iterator[WorkbookSession]:
+    with WorkbookSession(str(valid_workbook), cache_size=request.param) as workbook:
+        yield workbook
+
+
+@pytest.mark.parametrize(
+    "sheet_name, skiprows, nrows, usecols",
+    [
+        ("Table 3", 3, 29, "A:C"),
+        ("Table 3", 3, None, None),
+        ("Table 3", 0, 5, "A,C"),
+        ("Table 6", 3, 0, None),
+        ("Table 6", 5, 10, "B:D"),
+        ("Table 1a", 1, 500, None),
+        ("Contents", 0, None, None),
+    ],
+)
+def test_read_matches_read_excel(
+    workbook: WorkbookSession,
+    sheet_name: str,
+    skiprows: int,
+    nrows: int | None,
+    usecols: str | None,
+) -> None:
+    expected_df = pd.read_excel(
+        valid_workbook,
+        sheet_name=sheet_name,
+        skiprows=skiprows,
+        header=0,
+        nrows=nrows,
+        usecols=usecols,
+    )
+
+    pd.testing.assert_frame_equal(
+        workbook.read(sheet_name, skiprows, nrows, usecols), expected_df
+    )
+
+
+def test_workbook_is_parsed_once() -> None:
+    with patch("util_lib.workbook.pd.ExcelFile", wraps=pd.ExcelFile) as mock_open:
+        with WorkbookSession(str(valid_workbook)) as workbook:
+            workbook.read("Table 3", 3, 29, "A:C")
+            workbook.read("Table 3", 3, 10, "A:B")
+            workbook.read("Table 6", 3)
+
+    mock_open.assert_called_once()
+
+
+def test_read_worksheet_from_file_specification(workbook: WorkbookSession) -> None:
+    worksheet_df = workbook.read_worksheet(
+        {
+            "worksheet_name": "Table 3",
+            "num_rows_from_top_to_ignore": 3,
+            "num_rows_to_read": 29,
+            "column_range_to_read": "A:C",
+        }
+    )
+
+    assert worksheet_df.shape == (29, 3)
+
+
+def test_least_recently_read_sheet_is_evicted() -> None:
+    with WorkbookSession(str(valid_workbook), cache_size=2) as workbook:
+        workbook.read("Table 3", 3)
+        workbook.read("Table 6", 3)
+        workbook.read("Table 3", 3)
+        workbook.read("Table 1a", 1)
+
+        assert workbook.cached_sheets() == ["Table 3", "Table 1a"]
+
+
+def test_read_missing_sheet(workbook: WorkbookSession) -> None:
+    with pytest.raises(ValueError):
+        workbook.read("Table 99")
+
+
+def test_close_forgets_cached_sheets() -> None:
+    workbook = WorkbookSession(str(valid_workbook))
+    workbook.read("Table 3", 3)
+
+    workbook.close()
+
+    assert workbook.cached_sheets() == []
+
+
+@pytest.mark.parametrize(
+    "column_range, expected_indices",
+    [("A", [0]), ("A:C", [0, 1, 2]), ("b:c, E", [1, 2, 4]), ("AA", [26])],
+)
+def test_column_range_to_indices(column_range: str, expected_indices: list) -> None:
+    assert column_range_to_indices(column_range) == expected_indices
+
+
+def test_invalid_column_range() -> None:
+    with pytest.raises(ValueError):
+        column_range_to_indices("1:3")
+
+
+def test_streamed_reads_keep_nothing() -> None:
+    with WorkbookSession(str(valid_workbook), cache_size=0) as workbook:
+        workbook.read("Table 3", 3, 29, "A:C")
+
+        assert workbook.cached_sheets() == []
+
+
+def test_openpyxl_engine_is_available() -> None:
+    assert "openpyxl" in available_excel_engines()
+
+
+def test_fastest_available_engine_is_selected() -> None:
+    with patch("util_lib.workbook.importlib.util.find_spec", return_value=object()):
+        assert select_excel_engine() == "calamine"
+
+    with patch(
+        "util_lib.workbook.importlib.util.find_spec",
+        side_effect=lambda package: None if package == "python_calamine" else object(),
+    ):
+        assert select_excel_engine() == "openpyxl"
+
+
+def test_selected_engine_reads_workbook() -> None:
+    with WorkbookSession(str(valid_workbook), engine="openpyxl") as workbook:
+        assert workbook.engine == "openpyxl"
+        assert workbook.read("Table 3", 3, 29, "A:C").shape == (29, 3)
+
+
+@pytest.mark.parametrize("engine", ["xlrd2", "calamine"])
+def test_unavailable_engine(engine: str) -> None:
+    with patch(
+        "util_lib.workbook.importlib.util.find_spec",
+        side_effect=lambda package: None if package == "python_calamine" else object(),
+    ):
+        with pytest.raises(ValueError):
+            select_excel_engine(engine)
+
+
+def test_no_engine_installed() -> None:
+    with patch("util_lib.workbook.importlib.util.find_spec", return_value=None):
+        with pytest.raises(ValueError):
+            select_excel_engine()
@@ -0,0 +1,151 @@
+"""
+Tests for the worksheet_cache module.
+"""
+
+import datetime
+import os
+from pathlib import Path
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from util_lib.dataframe import read_worksheet_into_df
+from util_lib.worksheet_cache import WorksheetCache
+
+resources_dir = Path(__file__).parent / "resources"
+
+
+def _write_workbook(path: Path, deaths: list) -> None:
+    pd.DataFrame(
+        {
+            "Registration Week": [1, 2, 3],
+            2023: deaths,
+            "Notes": ["a", np.nan, "c"],
+            "Week Ending": pd.to_datetime(["2023-01-06", "2023-01-13", "2023-01-20"]),
+        }
+    ).to_excel(path, sheet_name="Table 1", index=False)
+
+
+@pytest.fixture
+def workbook_path(tmp_path: Path) -> Path:
+    workbook_path = tmp_path / "weekly.xlsx"
+    _write_workbook(workbook_path, [300, "301 [Note 1]", 302])
+    return workbook_path
+
+
+@pytest.fixture
+def worksheet_cache(tmp_path: Path) -> WorksheetCache:
+    return WorksheetCache(str(tmp_path / "cache"))
+
+
+def test_cached_worksheet_is_the_worksheet_read(
+    workbook_path: Path, worksheet_cache: WorksheetCache
+) -> None:
+    file_spec = {"dest_filepath": str(workbook_path), "worksheet_name": "Table 1"}
+    read_df = read_worksheet_into_df(file_spec, cache=worksheet_cache)
+
+    cached_df = worksheet_cache.get(file_spec)
+
+    assert cached_df is not None
+    pd.testing.assert_frame_equal(cached_df, read_df, check_exact=True)
+    assert cached_df.columns.tolist() == [
+        "Registration Week",
+        2023,
+        "Notes",
+        "Week Ending",
+    ]
+    assert isinstance(cached_df["Notes"][1], float)
+    assert [type(deaths) for deaths in cached_df[2023]] == [int, str, int]
+
+
+def test_cached_worksheet_is_not_parsed_again(
+    workbook_path: Path, worksheet_cache: WorksheetCache
+) -> None:
+    file_spec = {"dest_filepath": str(workbook_path), "worksheet_name": "Table 1"}
+    read_worksheet_into_df(file_spec, cache=worksheet_cache)
+
+    with patch("util_lib.dataframe.WorkbookSession") as mock_workbook_session:
+        cached_df = read_worksheet_into_df(
+            file_spec, cache=WorksheetCache(worksheet_cache.directory)
+        )
+
+    mock_workbook_session.assert_not_called()
+    assert cached_df.shape == (3, 4)
+
+
+def test_changed_workbook_is_read_again(
+    workbook_path: Path, worksheet_cache: WorksheetCache
+) -> None:
+    file_spec = {"dest_filepath": str(workbook_path), "worksheet_name": "Table 1"}
+    read_worksheet_into_df(file_spec, cache=worksheet_cache)
+
+    _write_workbook(workbook_path, [310, 311, 312])
+    os.utime(workbook_path, ns=(0, os.stat(workbook_path).st_mtime_ns + 1))
+
+    assert worksheet_cache.get(file_spec) is None
+    assert read_worksheet_into_df(file_spec, cache=worksheet_cache)[2023].tolist() == [
+        310,
+        311,
+        312,
+    ]
+    assert len(os.listdir(worksheet_cache.directory)) == 1
+
+
+def test_each_worksheet_specification_is_cached_separately(
+    worksheet_cache: WorksheetCache,
+) -> None:
+    file_spec = {
+        "dest_filepath": str(resources_dir / "dataframe_test" / "valid_workbook.xlsx"),
+        "worksheet_name": "Table 3",
+        "num_rows_from_top_to_ignore": 3,
+        "num_rows_to_read": 29,
+        "column_range_to_read": "A:C",
+    }
+    read_worksheet_into_df(file_spec, cache=worksheet_cache)
+    read_worksheet_into_df({**file_spec, "num_rows_to_read": 10}, cache=worksheet_cache)
+
+    cached_df = worksheet_cache.get(file_spec)
+    assert cached_df is not None
+    assert cached_df.shape == (29, 3)
+    cached_df = worksheet_cache.get({**file_spec, "num_rows_to_read": 10})
+    assert cached_df is not None
+    assert cached_df.shape == (10, 3)
+    assert worksheet_cache.get({**file_spec, "column_range_to_read": "A:B"}) is None
+
+
+def test_workbook_hash_is_calculated_once(
+    workbook_path: Path, worksheet_cache: WorksheetCache
+) -> None:
+    with patch(
+        "util_lib.worksheet_cache.calculate_file_hash", return_value="hash"
+    ) as mock_calculate_file_hash:
+        worksheet_cache.file_hash(str(workbook_path))
+        worksheet_cache.file_hash(str(workbook_path))
+
+    mock_calculate_file_hash.assert_called_once()
+
+
+def test_cached_worksheet_of_missing_workbook(worksheet_cache: WorksheetCache) -> None:
+    with pytest.raises(FileNotFoundError):
+        read_worksheet_into_df(
+            {"dest_filepath": "missing.xlsx", "worksheet_name": "Table 1"},
+            cache=worksheet_cache,
+        )
+
+
+def test_worksheet_with_dates_in_header(
+    tmp_path: Path, worksheet_cache: WorksheetCache
+) -> None:
+    workbook_path = tmp_path / "monthly.xlsx"
+    pd.DataFrame({datetime.datetime(2023, 1, 1): [1.5, np.nan]}).to_excel(
+        workbook_path, index=False
+    )
+    file_spec = {"dest_filepath": str(workbook_path), "worksheet_name": "Sheet1"}
+
+    read_df = read_worksheet_into_df(file_spec, cache=worksheet_cache)
+
+    cached_df = worksheet_cache.get(file_spec)
+    assert cached_df is not None
+    pd.testing.assert_frame_equal(cached_df, read_df)
@@ -1,6 +1,14 @@
 import streamlit as st
 import os
+import pandas as pd
 
+from util_lib.catalog import DatasetCatalog, MANIFEST_FILE_NAME
+from util_lib.checksum import verify_checksum_manifest
+
+# Every page imports this module before loading any data, so Copy-on-Write is
+# enabled for the whole Streamlit process whichever page is opened first. This
+# is the one place the app sets it: util_lib leaves pandas options alone.
+pd.set_option("mode.copy_on_write", True)
 
 
 def show_footer_caption(footer_caption):
@@ -53,4 +61,31 @@ def initialize_session_state() -> None:
         st.session_state['parent_resource_path'] = 'web-ui/'
     else:
         print("not cloud")
-        st.session_state['parent_resource_path'] = './'
\ No newline at end of file
+        st.session_state['parent_resource_path'] = './'
+
+
+@st.cache_resource
+def verify_data_bundle():
+    """
+    Check the deployed data files against their checksum manifest once per
+    process, and report any that are missing or corrupt.
+    """
+    failed_paths = verify_checksum_manifest(
+        f"{st.session_state['parent_resource_path']}resources/data"
+    )
+    if failed_paths:
+        st.error(f"These data files are missing or corrupt: {', '.join(failed_paths)}")
+    return failed_paths
+
+
+@st.cache_resource
+def get_dataset_catalog():
+    """
+    Load the manifest of dataset snapshots once per process so pages can
+    resolve datasets by name rather than by file name. The data files are
+    verified first.
+    """
+    verify_data_bundle()
+    return DatasetCatalog(
+        f"{st.session_state['parent_resource_path']}resources/data/{MANIFEST_FILE_NAME}"
+    )
@@ -9,6 +9,7 @@ from plotly.subplots import make_subplots
 import matplotlib.pyplot as plt
 from matplotlib.ticker import MultipleLocator
 from lib.page_utils import *
+from util_lib.dataframe import mutate_safely
 
 st.set_page_config(layout="wide")
 
@@ -16,27 +17,6 @@ st.set_page_config(layout="wide")
 #     st.markdown(f"<style>{f.read()}</style>", unsafe_allow_html=True)
 
 
-def mutate_safely(function):
-    """
-    There are a limited number of pandas transformations that mutate the dataframe
-    in place.  These are limited to modifying a column of data (insert, delete or update);
-    assigning to the index or column attributes and modifying the values directly in the dataframe.
-
-    The purpose of this function is to perform the mutating functions idempotently by mutating
-    local deep copies of dataframes and returning new copies back to the caller.
-
-    We use Python decorators to adopt this pattern without polluting our core functions. We
-    decorate any function with @mutate_safely and write a function that mutates the given
-    dataframe directly without returning it.
-    """
-    def mutate(df, **params):
-        df = df.copy()
-        function(df, **params)
-        return df
-
-    return mutate
-
-
 @mutate_safely
 def rename_index_with_labels(df, labels):
     df.rename(index=labels, inplace=True)
@@ -59,13 +39,13 @@ def generate_sequence_labels(prefix, label_range):
     return {i: f"{prefix} {i + 1}" for i in range(label_range)}
 
 
-@st.cache_data
+@st.cache_resource
 def load_data():
     """
     Load the input data from the local filesystem.
     :return: Pandas dataframe
     """
-    dataframe = pd.read_pickle(f"{st.session_state['parent_resource_path']}resources/data/deaths/AllDeathsUpAndStatsTo2024Week34.pkl")
+    dataframe = get_dataset_catalog().load("weekly_deaths_and_stats")
     return dataframe
 
 
@@ -12,19 +12,20 @@ import matplotlib.pyplot as plt
 import matplotlib as mpl
 from matplotlib.ticker import MaxNLocator
 from lib.page_utils import *
+from util_lib.store import read_dataset
 
 st.set_page_config(layout="wide")
 
 LATEST_MONTHLY_DATAPOINT_POSITION = 50  # March 2023 = 39
 
 
-@st.cache_data
+@st.cache_resource
 def load_data(data_file):
     """
-    Load the serialised pickle file into a dataframe.
+    Load the memory-mapped dataset file into a dataframe.
     :return: Pandas dataframe.
     """
-    dataframe = pd.read_pickle(data_file)
+    dataframe = read_dataset(data_file)
     return dataframe
 
 
@@ -46,8 +47,8 @@ def main():
     st.title("NI Monthly Births")
     print(os.getcwd())
     monthly_delta_births_df = load_data(
-        f"{st.session_state['parent_resource_path']}resources/data/births/MeanBirthDifference2020to20204_2.pkl"
-        # "resources/data/births/MeanBirthDifference2020to20204_2.pkl"
+        f"{st.session_state['parent_resource_path']}resources/data/births/MeanBirthDifference2020to20204_2.arrow"
+        # "resources/data/births/MeanBirthDifference2020to20204_2.arrow"
     )[0:LATEST_MONTHLY_DATAPOINT_POSITION]
 
     # Create the figure and axes objects, specify the size and the dots per inches
@@ -166,7 +167,7 @@ def main():
     st.pyplot(fig)
     st.markdown("---")
 
-    all_monthly_births_df = load_data(f"{st.session_state['parent_resource_path']}resources/data/births/AllBirthsUpToMonth22024.pkl") #"web-ui/resources/data/births/AllBirthsUpToMonth22024.pkl"
+    all_monthly_births_df = load_data(get_dataset_catalog().resolve("monthly_births").path)
     csv = convert_df(all_monthly_births_df)
 
     range_2006_to_2023 = [
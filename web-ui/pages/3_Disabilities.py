@@ -11,15 +11,13 @@ from lib.page_utils import *
 st.set_page_config(layout="wide")
 
 
-@st.cache_data
+@st.cache_resource
 def load_data():
     """
     Load serialised data into dataframe.
     :return: Pandas dataframe.
     """
-    dataframe = pd.read_pickle(
-        f"{st.session_state['parent_resource_path']}resources/data/disabilities/MonthlyDisabilityRegistrationsNov2022.pkl"
-    )
+    dataframe = get_dataset_catalog().load("monthly_disability_registrations")
     return dataframe
 
 
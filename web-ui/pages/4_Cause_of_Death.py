@@ -15,9 +15,9 @@ def main():
     """
     st.title("NI Cause of Death")
 
-    @st.cache_data
+    @st.cache_resource
     def load_data():
-        dataframe = pd.read_pickle(f"{st.session_state['parent_resource_path']}resources/data/deaths/DeathsByCauseUpToQ42022.pkl")
+        dataframe = get_dataset_catalog().load("deaths_by_cause")
         return dataframe
 
     @st.cache_data
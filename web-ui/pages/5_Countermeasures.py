@@ -7,18 +7,19 @@ import streamlit as st
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 from lib.page_utils import *
+from util_lib.store import read_dataset
 
 st.set_page_config(layout="wide")
 
 
-@st.cache_data
+@st.cache_resource
 def load_data(path):
     """
     Load serialised data into dataframe.
     :param path: Location on local filesystem.
     :return: Pandas dataframe.
     """
-    dataframe = pd.read_pickle(path)
+    dataframe = read_dataset(path)
     return dataframe
 
 
@@ -56,7 +57,7 @@ def main():
     :return:
     """
     st.title("NI Countermeasures")
-    injections_cumulative_df = load_data(f"{st.session_state['parent_resource_path']}resources/data/injections/CumulativeInjectionsUpToApril2024.pkl")#"web-ui/resources/data/injections/CumulativeInjectionsUpToApril2024.pkl")
+    injections_cumulative_df = load_data(get_dataset_catalog().resolve("cumulative_injections").path)
 
     with st.sidebar:
         st.markdown("### Access underlying data")
@@ -139,7 +140,7 @@ def main():
         )
 
         trials_deaths_total = load_data(
-            f"{st.session_state['parent_resource_path']}resources/data/injections/pfizer-biontech/CombinedClinicalTrialDeathsTotalOnly.pkl"
+            f"{st.session_state['parent_resource_path']}resources/data/injections/pfizer-biontech/CombinedClinicalTrialDeathsTotalOnly.arrow"
         )
         fig2 = go.Figure()
 
@@ -176,11 +177,11 @@ def main():
         st.plotly_chart(fig2, use_container_width=True, theme=None)
 
         trials_deaths_breakdown = load_data(
-            f"{st.session_state['parent_resource_path']}resources/data/injections/pfizer-biontech/CombinedClinicalTrialDeathsBreakdown.pkl"
+            f"{st.session_state['parent_resource_path']}resources/data/injections/pfizer-biontech/CombinedClinicalTrialDeathsBreakdown.arrow"
         )
 
         arms = ["BNT162b2", "Placebo"]
-        trials_deaths_breakdown.sort_values("BNT162b2", ascending=False, inplace=True)
+        trials_deaths_breakdown = trials_deaths_breakdown.sort_values("BNT162b2", ascending=False)
 
         def calculate_color(var):
             return "salmon" if var == "BNT162b2" else "lightskyblue"
@@ -6,18 +6,19 @@ import plotly.graph_objects as go
 import streamlit as st
 from plotly.subplots import make_subplots
 from lib.page_utils import *
+from util_lib.store import read_dataset
 
 st.set_page_config(layout="wide")
 
 
-@st.cache_data
+@st.cache_resource
 def load_data(source):
     """
     Read serialised data and return dataframe.
     :param source: Path to file on local filesystem.
     :return: Pandas dataframe.
     """
-    dataframe = pd.read_pickle(source)
+    dataframe = read_dataset(source)
     return dataframe
 
 
@@ -42,7 +43,7 @@ def main():
     tab1, tab2 = st.tabs(["Deaths", "Disabilities"])
 
     with tab1:
-        all_deaths_and_injections_df = load_data(f"{st.session_state['parent_resource_path']}resources/data/AllDeathsInjections.pkl")
+        all_deaths_and_injections_df = load_data(f"{st.session_state['parent_resource_path']}resources/data/AllDeathsInjections.arrow")
         csv = convert_df(all_deaths_and_injections_df)
 
         label_five_year_average_2015_to_2019 = "2015 - 2019"
@@ -327,7 +328,7 @@ def main():
 
     with tab2:
         df_pip_and_injections = load_data(
-            f"{st.session_state['parent_resource_path']}resources/data/MonthlyDisabilityRegistrationsAndInjectionsNov2022.pkl"
+            f"{st.session_state['parent_resource_path']}resources/data/MonthlyDisabilityRegistrationsAndInjectionsNov2022.arrow"
         )
         csv = convert_df(df_pip_and_injections)
 